@@ -0,0 +1,375 @@
+"""
+Module Benchmarks - Mesures de performance des chemins critiques.
+Chaque benchmark est execute plusieurs fois et la meilleure mesure est
+retenue (ns par operation). Les resultats sont ecrits en JSON avec les
+informations de la machine, et compares a une baseline enregistree : le
+programme se termine en erreur si un benchmark ralentit au-dela du seuil.
+
+Une boucle de calcul fixe (benchmark "etalon") est mesuree a chaque
+execution ; les ratios sont corriges par celui de l'etalon, pour qu'un
+ralentissement general de la machine ne soit pas pris pour une regression
+(--sans-normalisation pour comparer les temps bruts).
+
+    python benchmarks.py --enregistrer-baseline     # sur la machine de reference
+    python benchmarks.py --sortie resultats.json    # compare a la baseline
+    python benchmarks.py --exiger-baseline          # idem, erreur si pas de baseline
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from capture import Capture
+from catalogue import Catalogue
+from combat import Combat
+from experience import Experience
+from inventaire import Inventaire, POKE_BALL, SUPER_BALL, HYPER_BALL
+from pokedex import Pokedex
+from pokemon import Pokemon
+from rng import FluxAleatoire
+from type_chart import TypeChart
+
+
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DEFAUT = os.path.join(DOSSIER, "benchmarks_baseline.json")
+SEUIL_DEFAUT = 0.20
+REPETITIONS_DEFAUT = 7
+
+
+# =====================================================
+# BENCHMARKS
+# =====================================================
+# Chaque benchmark recoit une echelle (1.0 = taille normale) et retourne
+# (nombre d'operations, fonction qui execute ces operations), suivis
+# eventuellement d'une fonction de nettoyage appelee apres les mesures.
+
+def bench_etalon(echelle):
+    """Boucle de calcul pur Python, independante du code du projet."""
+    nombre = max(1, int(200000 * echelle))
+
+    def executer():
+        total = 0
+        for i in range(nombre):
+            total = (total + i * i) % 1000003
+        return total
+    return nombre, executer
+
+
+def bench_chargement_catalogue(echelle):
+    """Lecture et indexation de pokemon.json (un Catalogue neuf par operation)."""
+    chemin = os.path.join(DOSSIER, "data", "pokemon.json")
+    nombre = max(1, int(20 * echelle))
+
+    def executer():
+        for _ in range(nombre):
+            Catalogue(chemin)._verifier()
+    return nombre, executer
+
+
+def bench_depuis_json(echelle):
+    """Pokemon.depuis_json sur toutes les especes."""
+    especes = Catalogue.get().get_especes()
+    nombre = max(1, int(len(especes) * 5 * echelle))
+    sequence = [especes[i % len(especes)] for i in range(nombre)]
+
+    def executer():
+        for donnees in sequence:
+            Pokemon.depuis_json(donnees, niveau=50)
+    return nombre, executer
+
+
+def bench_multiplicateur(echelle):
+    """TypeChart.get_multiplicateur sur toutes les paires attaquant / double type."""
+    types = TypeChart.TYPES
+    combinaisons = [
+        (attaquant, [t1] if t1 == t2 else [t1, t2])
+        for attaquant in types for t1 in types for t2 in types
+    ]
+    repetitions = max(1, int(20 * echelle))
+    nombre = len(combinaisons) * repetitions
+
+    def executer():
+        get_multiplicateur = TypeChart.get_multiplicateur
+        for _ in range(repetitions):
+            for attaquant, defenseur in combinaisons:
+                get_multiplicateur(attaquant, defenseur)
+    return nombre, executer
+
+
+def _duel(niveau=30):
+    catalogue = Catalogue.get()
+    joueur = Pokemon.depuis_json(catalogue.get_par_nom("Pikachu"), niveau=niveau)
+    adverse = Pokemon.depuis_json(catalogue.get_par_nom("Salameche"), niveau=niveau)
+    return joueur, adverse
+
+
+def bench_combats_silencieux(echelle):
+    """Combats complets en mode silencieux (comme simulation.simuler_lot)."""
+    joueur, adverse = _duel()
+    etats = (joueur.capturer_etat(), adverse.capturer_etat())
+    nombre = max(1, int(5000 * echelle))
+
+    def executer():
+        flux = FluxAleatoire(0)
+        for _ in range(nombre):
+            joueur.restaurer_etat(etats[0])
+            adverse.restaurer_etat(etats[1])
+            Combat(joueur, adverse, silencieux=True, capacite_journal=0, rng=flux).simuler_jusqu_a_fin()
+    return nombre, executer
+
+
+def bench_combats_messages(echelle):
+    """Combats complets avec messages et journal, tour par tour."""
+    joueur, adverse = _duel()
+    etats = (joueur.capturer_etat(), adverse.capturer_etat())
+    nombre = max(1, int(1000 * echelle))
+
+    def executer():
+        flux = FluxAleatoire(0)
+        for _ in range(nombre):
+            joueur.restaurer_etat(etats[0])
+            adverse.restaurer_etat(etats[1])
+            combat = Combat(joueur, adverse, rng=flux)
+            while not combat.termine:
+                combat.tour_attaque()
+    return nombre, executer
+
+
+def bench_tenter_capture(echelle):
+    """Capture.tenter_capture (messages compris) avec differentes balls."""
+    _, adverse = _duel()
+    adverse.pv = adverse.pv_max // 2
+    inventaire = Inventaire()
+    balls = [POKE_BALL, SUPER_BALL, HYPER_BALL]
+    nombre = max(1, int(20000 * echelle))
+
+    def executer():
+        flux = FluxAleatoire(0)
+        for i in range(nombre):
+            Capture.tenter_capture(adverse, balls[i % 3], inventaire, rng=flux)
+    return nombre, executer
+
+
+def bench_pokedex(echelle):
+    """Pokedex.sauvegarder puis charger avec les 1025 especes enregistrees."""
+    especes = Catalogue.get().get_especes()
+    dossier = tempfile.TemporaryDirectory()
+    chemin = os.path.join(dossier.name, "pokedex.json")
+    pokedex = Pokedex(chemin)
+    for i, donnees in enumerate(especes[:Pokedex.TOTAL_POKEMON]):
+        pokemon = Pokemon.depuis_json(donnees, niveau=5)
+        if i % 2:
+            pokedex.enregistrer_capture(pokemon)
+        else:
+            pokedex.enregistrer_vu(pokemon)
+    nombre = max(1, int(10 * echelle))
+
+    def executer():
+        for _ in range(nombre):
+            pokedex.sauvegarder()
+            Pokedex(chemin).charger()
+    return nombre, executer, dossier.cleanup
+
+
+def bench_montee_niveau(echelle):
+    """Chaines de montee de niveau 1 -> 100 par petits gains d'XP (gagner_xp)."""
+    donnees = Catalogue.get().get_par_nom("Pikachu")
+    gains = []
+    xp = Experience.xp_pour_niveau(1)
+    # Des gains croissants : environ 3 gains par niveau
+    while xp < Experience.xp_pour_niveau(Experience.NIVEAU_MAX):
+        gain = max(1, Experience.xp_pour_niveau(min(Experience.NIVEAU_MAX, 1 + len(gains) // 3 + 1)) // 30)
+        gains.append(gain)
+        xp += gain
+    nombre = max(1, int(50 * echelle))
+
+    def executer():
+        for _ in range(nombre):
+            pokemon = Pokemon.depuis_json(donnees, niveau=1)
+            for gain in gains:
+                pokemon.gagner_xp(gain)
+    return nombre, executer
+
+
+ETALON = "etalon"
+
+BENCHMARKS = {
+    ETALON: bench_etalon,
+    "chargement_catalogue": bench_chargement_catalogue,
+    "depuis_json": bench_depuis_json,
+    "multiplicateur_type": bench_multiplicateur,
+    "combats_silencieux": bench_combats_silencieux,
+    "combats_messages": bench_combats_messages,
+    "tenter_capture": bench_tenter_capture,
+    "pokedex_sauvegarder_charger": bench_pokedex,
+    "montee_niveau": bench_montee_niveau,
+}
+
+
+# =====================================================
+# EXECUTION ET COMPARAISON
+# =====================================================
+
+def infos_machine():
+    """Informations sur la machine et l'environnement d'execution."""
+    infos = {
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "plateforme": platform.platform(),
+        "processeur": platform.processor() or platform.machine(),
+        "coeurs": os.cpu_count(),
+    }
+    try:
+        import numpy
+        infos["numpy"] = numpy.__version__
+    except ImportError:
+        infos["numpy"] = None
+    try:
+        infos["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=DOSSIER,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        infos["commit"] = None
+    return infos
+
+
+def executer_benchmarks(noms=None, repetitions=REPETITIONS_DEFAUT, echelle=1.0):
+    """
+    Execute les benchmarks (tous par defaut ; l'etalon toujours).
+    Retourne {nom: {"operations", "ns_par_operation", "operations_par_seconde"}},
+    avec la meilleure des `repetitions` mesures. Les repetitions des
+    differents benchmarks sont alternees : un ralentissement passager de la
+    machine ne touche pas toutes les mesures d'un meme benchmark.
+    """
+    noms = list(noms or BENCHMARKS)
+    if ETALON not in noms:
+        noms.insert(0, ETALON)
+    preparations = {}
+    meilleurs = {}
+    try:
+        for nom in noms:
+            preparations[nom] = BENCHMARKS[nom](echelle)
+        for _ in range(repetitions):
+            for nom in noms:
+                executer = preparations[nom][1]
+                debut = time.perf_counter_ns()
+                executer()
+                duree = time.perf_counter_ns() - debut
+                if nom not in meilleurs or duree < meilleurs[nom]:
+                    meilleurs[nom] = duree
+    finally:
+        for preparation in preparations.values():
+            for nettoyer in preparation[2:]:
+                nettoyer()
+
+    resultats = {}
+    for nom in noms:
+        nombre = preparations[nom][0]
+        ns = meilleurs[nom] / nombre
+        resultats[nom] = {
+            "operations": nombre,
+            "ns_par_operation": ns,
+            "operations_par_seconde": 1e9 / ns if ns > 0 else 0.0,
+        }
+    return resultats
+
+
+def comparer(resultats, baseline, seuil=SEUIL_DEFAUT, normaliser=True):
+    """
+    Compare des resultats a une baseline (memes structures).
+    Retourne une liste de (nom, ratio, regression) ; ratio = temps actuel /
+    temps de reference, divise par celui de l'etalon si `normaliser` et si
+    les deux le contiennent ; regression si ratio > 1 + seuil.
+    """
+    correction = 1.0
+    if normaliser and ETALON in resultats and ETALON in baseline:
+        correction = resultats[ETALON]["ns_par_operation"] / baseline[ETALON]["ns_par_operation"]
+    comparaison = []
+    for nom, mesure in resultats.items():
+        reference = baseline.get(nom)
+        if reference is None or (nom == ETALON and correction != 1.0):
+            continue
+        ratio = mesure["ns_par_operation"] / reference["ns_par_operation"] / correction
+        comparaison.append((nom, ratio, ratio > 1 + seuil))
+    return comparaison
+
+
+def _principal(arguments):
+    noms = arguments.benchmarks or None
+    inconnus = [nom for nom in noms or () if nom not in BENCHMARKS]
+    if inconnus:
+        print(f"Benchmarks inconnus : {', '.join(inconnus)} (disponibles : {', '.join(BENCHMARKS)})")
+        return 2
+
+    resultats = executer_benchmarks(noms, arguments.repetitions, arguments.echelle)
+    document = {"machine": infos_machine(), "resultats": resultats}
+
+    baseline = None
+    if not arguments.enregistrer_baseline and os.path.exists(arguments.baseline):
+        with open(arguments.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    comparaison = comparer(
+        resultats, baseline["resultats"], arguments.seuil, not arguments.sans_normalisation
+    ) if baseline else []
+    ratios = {nom: (ratio, regression) for nom, ratio, regression in comparaison}
+
+    print(f"{'Benchmark':30s} {'ns/op':>12s} {'op/s':>12s} {'vs baseline':>12s}")
+    for nom, mesure in resultats.items():
+        colonne = ""
+        if nom in ratios:
+            ratio, regression = ratios[nom]
+            colonne = f"{ratio - 1:+.1%}" + (" !" if regression else "")
+        elif nom == ETALON and baseline and ETALON in baseline["resultats"]:
+            # Etalon non compare (il sert de correction) : ratio brut, entre crochets
+            brut = mesure["ns_par_operation"] / baseline["resultats"][ETALON]["ns_par_operation"]
+            colonne = f"[{brut - 1:+.1%}]"
+        print(f"{nom:30s} {mesure['ns_par_operation']:12.0f} "
+              f"{mesure['operations_par_seconde']:12.0f} {colonne:>12s}")
+
+    if arguments.sortie:
+        with open(arguments.sortie, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+    if arguments.enregistrer_baseline:
+        with open(arguments.baseline, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"\nBaseline enregistree dans {arguments.baseline}")
+        return 0
+    if baseline is None:
+        print(f"\nPas de baseline ({arguments.baseline}) : utiliser --enregistrer-baseline")
+        return 1 if arguments.exiger_baseline else 0
+    if baseline["machine"].get("plateforme") != document["machine"]["plateforme"]:
+        print("\nAttention : baseline mesuree sur une autre machine.")
+
+    regressions = [nom for nom, _, regression in comparaison if regression]
+    if regressions:
+        print(f"\nRegression de plus de {arguments.seuil:.0%} : {', '.join(regressions)}")
+        return 1
+    print(f"\nAucune regression au-dela de {arguments.seuil:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    parseur = argparse.ArgumentParser(description="Benchmarks du projet Pokemon")
+    parseur.add_argument("benchmarks", nargs="*", help="benchmarks a executer (defaut : tous)")
+    parseur.add_argument("--sortie", help="fichier JSON des resultats")
+    parseur.add_argument("--baseline", default=BASELINE_DEFAUT, help="fichier JSON de reference")
+    parseur.add_argument("--enregistrer-baseline", action="store_true",
+                         help="enregistre les resultats comme nouvelle baseline")
+    parseur.add_argument("--exiger-baseline", action="store_true",
+                         help="termine en erreur s'il n'y a pas de baseline (integration continue)")
+    parseur.add_argument("--seuil", type=float, default=SEUIL_DEFAUT,
+                         help="ralentissement tolere (0.20 = +20%%)")
+    parseur.add_argument("--sans-normalisation", action="store_true",
+                         help="compare les temps bruts, sans correction par l'etalon")
+    parseur.add_argument("--repetitions", type=int, default=REPETITIONS_DEFAUT)
+    parseur.add_argument("--echelle", type=float, default=1.0,
+                         help="facteur sur le nombre d'operations de chaque benchmark")
+    sys.exit(_principal(parseur.parse_args()))
@@ -0,0 +1,160 @@
+"""
+Module CalculDegats - Distribution exacte des degats d'une attaque.
+Reprend la formule de Pokemon.resoudre_attaque (puissance 80, STAB, type,
+critique 1/24, brulure, facteur 0.85-1.0 puis troncature int()) et l'attaque
+ratee a 10% de Combat.jouer_tour_attaque. Les probabilites sont calculees en
+arithmetique rationnelle (Fraction) puis memorisees par (niveau, stats, ...).
+"""
+
+import math
+from fractions import Fraction
+from functools import lru_cache
+
+from statut import Statut
+from type_chart import TypeChart
+
+
+PUISSANCE = 80
+STAB = Fraction(3, 2)
+CRITIQUE = Fraction(1, 24)
+RATE = Fraction(1, 10)
+FACTEUR_MIN = Fraction(85, 100)
+
+
+class CalculDegats:
+    """Calculateur de distribution de degats et de probabilites de KO."""
+
+    @staticmethod
+    def probabilite_agir(statut):
+        """
+        Probabilite que Statut.peut_agir() laisse le Pokemon attaquer ce tour
+        (en excluant l'auto-attaque de confusion, qui ne touche pas l'adversaire).
+        """
+        # Reveil et degel : peut_agir retourne aussitot, sans jet de confusion
+        if statut.statut_principal == Statut.SOMMEIL and statut.tours_restants > 0:
+            # Se reveille (et agit) seulement si c'est le dernier tour de sommeil
+            return Fraction(1) if statut.tours_restants == 1 else Fraction(0)
+        if statut.statut_principal == Statut.GEL:
+            return Fraction(20, 100)
+        p = Fraction(1)
+        if statut.statut_principal == Statut.PARALYSIE:
+            p = Fraction(75, 100)
+        if statut.confusion and statut.tours_confusion > 1:
+            p *= Fraction(67, 100)
+        return p
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _distribution_touche(niveau, attaque, defense, multiplicateur, critique):
+        """
+        Loi des degats d'une attaque qui touche, pour un critique donne.
+        Retourne un dict {degats: Fraction}.
+        """
+        if multiplicateur == 0:
+            return {1: Fraction(1)}
+        base = (Fraction(2 * niveau, 5) + 2) * PUISSANCE * attaque / defense / 50 + 2
+        facteur = Fraction(multiplicateur) * STAB * (Fraction(3, 2) if critique else 1)
+        # degats = int(base * facteur * r), r uniforme sur [0.85, 1.0)
+        bas = base * facteur * FACTEUR_MIN
+        haut = base * facteur
+        largeur = haut - bas
+        loi = {}
+        for k in range(math.floor(bas), math.ceil(haut)):
+            longueur = min(haut, k + 1) - max(bas, k)
+            if longueur > 0:
+                degats = max(1, k)
+                loi[degats] = loi.get(degats, 0) + longueur / largeur
+        return loi
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def distribution_touche(niveau, attaque, defense, multiplicateur, brule=False):
+        """
+        Loi des degats d'une attaque qui touche (critique compris), sans
+        l'attaque ratee ni le statut. Retourne un dict {degats: Fraction}.
+        """
+        if brule:
+            attaque = int(attaque * 0.5)
+        loi = {}
+        for critique, p_critique in ((False, 1 - CRITIQUE), (True, CRITIQUE)):
+            partielle = CalculDegats._distribution_touche(
+                niveau, attaque, defense, multiplicateur, critique
+            )
+            for degats, p in partielle.items():
+                loi[degats] = loi.get(degats, 0) + p_critique * p
+        return loi
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def distribution(niveau, attaque, defense, multiplicateur, brule=False, p_agir=Fraction(1)):
+        """
+        Distribution exacte des degats infliges par un tour d'attaque.
+
+        Args:
+            niveau, attaque: niveau et attaque de l'attaquant
+            defense: defense du defenseur
+            multiplicateur: multiplicateur de type (TypeChart.get_multiplicateur_attaque)
+            brule: l'attaquant est brule (attaque divisee par 2, tronquee)
+            p_agir: probabilite que le statut laisse agir (voir probabilite_agir)
+
+        Retourne un tuple trie de (degats, probabilite) ; 0 = attaque ratee
+        ou Pokemon empeche d'agir.
+        """
+        p_touche = (1 - RATE) * Fraction(p_agir)
+        loi = {0: 1 - p_touche} if p_touche < 1 else {}
+        touche = CalculDegats.distribution_touche(niveau, attaque, defense, multiplicateur, brule)
+        for degats, p in touche.items():
+            loi[degats] = loi.get(degats, 0) + p_touche * p
+        return tuple((degats, float(p)) for degats, p in sorted(loi.items()) if p > 0)
+
+    @staticmethod
+    def distribution_attaque(attaquant, defenseur):
+        """Distribution des degats de `attaquant` sur `defenseur` (objets Pokemon)."""
+        return CalculDegats.distribution(
+            attaquant.niveau,
+            attaquant.attaque,
+            defenseur.defense,
+            TypeChart.get_multiplicateur_attaque(attaquant.types, defenseur.types),
+            attaquant.statut.statut_principal == Statut.BRULURE,
+            CalculDegats.probabilite_agir(attaquant.statut),
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _probabilites_ko(distribution, pv, nb_coups):
+        """
+        Probabilite de KO en au plus 1..nb_coups attaques (degats cumules >= pv).
+        Convolution des degats plafonnee a pv.
+        """
+        loi = {0: 1.0}
+        cumul = []
+        for _ in range(nb_coups):
+            suivante = {}
+            for total, p in loi.items():
+                for degats, q in distribution:
+                    cle = min(pv, total + degats)
+                    suivante[cle] = suivante.get(cle, 0.0) + p * q
+            loi = suivante
+            cumul.append(loi.get(pv, 0.0))
+        return tuple(cumul)
+
+    @staticmethod
+    def probabilite_ko(attaquant, defenseur, nb_coups=1, pv=None):
+        """
+        Probabilite que `attaquant` mette `defenseur` KO en au plus `nb_coups`
+        attaques (statuts supposes constants, pas de degats de fin de tour).
+
+        Args:
+            pv: PV restants du defenseur (defaut : ses PV actuels)
+        """
+        return CalculDegats.probabilites_ko(attaquant, defenseur, nb_coups, pv)[-1]
+
+    @staticmethod
+    def probabilites_ko(attaquant, defenseur, nb_coups_max, pv=None):
+        """Liste des probabilites de KO en au plus 1, 2, ..., nb_coups_max attaques."""
+        if pv is None:
+            pv = defenseur.pv
+        if pv <= 0:
+            return [1.0] * nb_coups_max
+        distribution = CalculDegats.distribution_attaque(attaquant, defenseur)
+        return list(CalculDegats._probabilites_ko(distribution, pv, nb_coups_max))
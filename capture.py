@@ -1,33 +1,38 @@
 """
 Module Capture - Systeme de capture de Pokemon.
 Formule officielle avec Pokeballs, statuts, et secousses.
+
+Chaque secousse reussit si un entier uniforme de [0, 65535] est inferieur au
+seuil b : la loi du nombre de secousses est donc connue exactement. Elle est
+calculee une fois par (taux de capture, multiplicateur de ball, bonus de
+statut, ratio de PV), et le nombre de secousses est tire en un seul appel au
+generateur.
 """
 
+import math
 import random
+from bisect import bisect_right
+from fractions import Fraction
+from functools import lru_cache
+
+
+NB_SECOUSSES = 4
 
 
 class Capture:
     """Gere la logique de capture d'un Pokemon sauvage."""
 
     @staticmethod
-    def tenter_capture(pokemon_cible, ball, inventaire,
-                       types_pokemon=None, tour_combat=1, contexte=None):
+    def resoudre_capture(pokemon_cible, ball, inventaire,
+                         types_pokemon=None, tour_combat=1, contexte=None, rng=random):
         """
-        Tente de capturer un Pokemon sauvage.
-
-        Args:
-            pokemon_cible: Le Pokemon sauvage a capturer
-            ball: L'objet Pokeball utilise
-            inventaire: L'inventaire du joueur (pour calculer le mult ball)
-            types_pokemon: Les types du Pokemon cible (pour Filet Ball)
-            tour_combat: Numero du tour actuel (pour Rapide Ball)
-            contexte: "nuit_grotte" ou None (pour Sombre Ball)
+        Meme calcul que tenter_capture, sans construire de message.
+        `rng` : source des tirages (module random par defaut, ou FluxAleatoire).
 
         Returns:
-            (capture: bool, nb_secousses: int, messages: list[str])
+            (capture: bool, nb_secousses: int) ; une capture garantie
+            (Master Ball ou taux >= 255) renvoie (True, 3).
         """
-        messages = []
-
         if types_pokemon is None:
             types_pokemon = pokemon_cible.types
 
@@ -38,44 +43,60 @@ class Capture:
 
         # Master Ball = capture garantie
         if mult_ball >= 255:
-            messages.append(f"Lancer de {ball.nom}...")
-            messages.append("La Master Ball ne rate jamais !")
-            messages.append(f"{pokemon_cible.nom} est capture !")
-            return True, 3, messages
-
-        # Taux de capture de l'espece (3 a 255)
-        taux_espece = pokemon_cible.taux_capture
-
-        # Bonus statut
-        bonus_statut = pokemon_cible.statut.get_bonus_capture()
+            return True, 3
 
         # Ratio PV : plus les PV sont bas, plus c'est facile
         ratio_pv = (3 * pokemon_cible.pv_max - 2 * pokemon_cible.pv) / (3 * pokemon_cible.pv_max)
 
-        # Calcul du taux a
-        a = ratio_pv * taux_espece * mult_ball * bonus_statut
-
-        messages.append(f"Lancer de {ball.nom}...")
+        _, seuils = Capture._loi_secousses(
+            pokemon_cible.taux_capture, mult_ball,
+            pokemon_cible.statut.get_bonus_capture(), ratio_pv,
+        )
 
         # Si a >= 255, capture garantie
-        if a >= 255:
-            messages.append(f"{pokemon_cible.nom} est capture !")
-            return True, 3, messages
+        if seuils is None:
+            return True, 3
 
-        # Calcul du seuil de secousse (b)
-        # b = 65536 / (255 / a)^0.25
-        if a <= 0:
-            a = 1
-        b = 65536 / ((255 / a) ** 0.1875)
+        # Nombre de secousses reussies, d'un seul tirage uniforme
+        nb_secousses = bisect_right(seuils, rng.random())
+        return nb_secousses >= NB_SECOUSSES, nb_secousses
 
-        # 4 checks de secousse
-        nb_secousses = 0
-        for i in range(4):
-            check = random.randint(0, 65535)
-            if check < b:
-                nb_secousses += 1
-            else:
-                break
+    @staticmethod
+    def tenter_capture(pokemon_cible, ball, inventaire,
+                       types_pokemon=None, tour_combat=1, contexte=None, rng=random):
+        """
+        Tente de capturer un Pokemon sauvage.
+
+        Args:
+            pokemon_cible: Le Pokemon sauvage a capturer
+            ball: L'objet Pokeball utilise
+            inventaire: L'inventaire du joueur (pour calculer le mult ball)
+            types_pokemon: Les types du Pokemon cible (pour Filet Ball)
+            tour_combat: Numero du tour actuel (pour Rapide Ball)
+            contexte: "nuit_grotte" ou None (pour Sombre Ball)
+
+        Returns:
+            (capture: bool, nb_secousses: int, messages: list[str])
+        """
+        capture, nb_secousses = Capture.resoudre_capture(
+            pokemon_cible, ball, inventaire, types_pokemon, tour_combat, contexte, rng
+        )
+        messages = Capture.messages(
+            pokemon_cible.nom, ball.nom, capture, nb_secousses, ball.valeur >= 255
+        )
+        return capture, nb_secousses, messages
+
+    @staticmethod
+    def messages(nom_pokemon, nom_ball, capture, nb_secousses, master_ball=False):
+        """Messages d'une tentative de capture (aussi utilises par le journal)."""
+        messages = [f"Lancer de {nom_ball}..."]
+
+        # Capture garantie (Master Ball ou taux a >= 255)
+        if capture and nb_secousses == 3:
+            if master_ball:
+                messages.append("La Master Ball ne rate jamais !")
+            messages.append(f"{nom_pokemon} est capture !")
+            return messages
 
         # Messages de secousses
         secousse_msgs = [
@@ -87,30 +108,61 @@ class Capture:
         for i in range(min(nb_secousses, 3)):
             messages.append(secousse_msgs[i])
 
-        if nb_secousses >= 4:
-            messages.append(f"Gotcha ! {pokemon_cible.nom} est capture !")
-            return True, nb_secousses, messages
+        if capture:
+            messages.append(f"Gotcha ! {nom_pokemon} est capture !")
         else:
-            messages.append(f"Mince ! {pokemon_cible.nom} s'est echappe !")
-            return False, nb_secousses, messages
+            messages.append(f"Mince ! {nom_pokemon} s'est echappe !")
+        return messages
 
     @staticmethod
-    def calculer_probabilite(pokemon_cible, mult_ball, bonus_statut=1.0):
+    @lru_cache(maxsize=4096)
+    def _loi_secousses(taux_espece, mult_ball, bonus_statut, ratio_pv):
         """
-        Calcule la probabilite approximative de capture (pour affichage).
-        Retourne un pourcentage (0-100).
+        Loi exacte du nombre de secousses (les ratios de PV egaux, meme avec
+        des PV differents, donnent le meme float et partagent l'entree du cache).
+
+        Returns:
+            (probabilite de capture, seuils) ; seuils[k] = P(nb_secousses <= k)
+            pour k = 0..3, ou None si la capture est garantie.
         """
-        taux_espece = pokemon_cible.taux_capture
-        ratio_pv = (3 * pokemon_cible.pv_max - 2 * pokemon_cible.pv) / (3 * pokemon_cible.pv_max)
+        # Master Ball = capture garantie
+        if mult_ball >= 255:
+            return 1.0, None
 
+        # Calcul du taux a
         a = ratio_pv * taux_espece * mult_ball * bonus_statut
 
+        # Si a >= 255, capture garantie
         if a >= 255:
-            return 100.0
+            return 1.0, None
 
+        # Calcul du seuil de secousse (b)
+        # b = 65536 / (255 / a)^0.1875
         if a <= 0:
-            return 0.0
+            a = 1
+        b = 65536 / ((255 / a) ** 0.1875)
+
+        # randint(0, 65535) < b : ceil(b) valeurs sur 65536
+        p_secousse = Fraction(min(65536, math.ceil(b)), 65536)
+        seuils = tuple(float(1 - p_secousse ** (k + 1)) for k in range(NB_SECOUSSES))
+        return float(p_secousse ** NB_SECOUSSES), seuils
 
-        # Probabilite approximative = (a/255)^0.75 * 100
-        prob = ((a / 255) ** 0.75) * 100
-        return min(100.0, max(0.1, round(prob, 1)))
+    @staticmethod
+    def probabilite_capture(taux_espece, mult_ball, bonus_statut=1.0, ratio_pv=1.0):
+        """
+        Probabilite exacte de capture (0 a 1), identique aux tirages de
+        resoudre_capture. ratio_pv = (3 * pv_max - 2 * pv) / (3 * pv_max).
+        """
+        return Capture._loi_secousses(taux_espece, mult_ball, bonus_statut, ratio_pv)[0]
+
+    @staticmethod
+    def calculer_probabilite(pokemon_cible, mult_ball, bonus_statut=1.0):
+        """
+        Calcule la probabilite de capture (pour affichage).
+        Retourne un pourcentage (0-100), arrondi au dixieme.
+        """
+        ratio_pv = (3 * pokemon_cible.pv_max - 2 * pokemon_cible.pv) / (3 * pokemon_cible.pv_max)
+        prob = Capture.probabilite_capture(
+            pokemon_cible.taux_capture, mult_ball, bonus_statut, ratio_pv
+        )
+        return round(prob * 100, 1)
@@ -0,0 +1,113 @@
+"""
+Module Catalogue - Cache des especes de pokemon.json partage par tout le processus.
+Recherche en O(1) par numero et par nom, rechargement automatique si le
+fichier change (date de modification ou taille).
+"""
+
+import json
+import os
+import unicodedata
+
+
+def normaliser_nom(nom):
+    """Normalise un nom pour la recherche : sans accents, insensible a la casse."""
+    decompose = unicodedata.normalize("NFKD", nom)
+    return "".join(c for c in decompose if not unicodedata.combining(c)).casefold()
+
+
+class Catalogue:
+    """Catalogue des especes d'un fichier pokemon.json, avec index et compteurs."""
+
+    # Un catalogue par chemin de fichier
+    _instances = {}
+
+    def __init__(self, chemin_json):
+        self._chemin = chemin_json
+        self._signature = None  # (mtime_ns, taille) du fichier charge
+        self._especes = []
+        self._par_numero = {}
+        self._par_nom = {}
+        self.version = 0
+        # Fonctions appelees (avec le catalogue) apres chaque rechargement
+        self._au_rechargement = []
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def get(cls, chemin_json=None):
+        """Retourne le catalogue (a jour) associe a un fichier pokemon.json."""
+        if chemin_json is None:
+            chemin_json = os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), "data", "pokemon.json"
+            )
+        chemin_json = os.path.abspath(chemin_json)
+        catalogue = cls._instances.get(chemin_json)
+        if catalogue is None:
+            catalogue = cls(chemin_json)
+            cls._instances[chemin_json] = catalogue
+        catalogue._verifier()
+        return catalogue
+
+    def _verifier(self):
+        """Recharge le fichier si sa date de modification ou sa taille a change."""
+        infos = os.stat(self._chemin)
+        signature = (infos.st_mtime_ns, infos.st_size)
+        if signature == self._signature:
+            self.hits += 1
+            return
+        self.misses += 1
+        self._charger(signature)
+
+    def _charger(self, signature):
+        """Lit le fichier JSON et reconstruit les index."""
+        with open(self._chemin, "r", encoding="utf-8") as f:
+            especes = json.load(f)["pokemons"]
+
+        self._especes = especes
+        self._par_numero = {donnees["numero"]: donnees for donnees in especes}
+        self._par_nom = {}
+        for donnees in especes:
+            self._par_nom[donnees["nom"]] = donnees
+            self._par_nom.setdefault(normaliser_nom(donnees["nom"]), donnees)
+        self._signature = signature
+        self.version += 1
+        for fonction in self._au_rechargement:
+            fonction(self)
+
+    def au_rechargement(self, fonction):
+        """
+        Enregistre fonction(catalogue), appelee apres chaque rechargement du
+        fichier : les caches construits depuis le catalogue s'y invalident.
+        """
+        if fonction not in self._au_rechargement:
+            self._au_rechargement.append(fonction)
+
+    def get_especes(self):
+        """
+        Retourne la liste des especes (dicts pokemon.json).
+        La liste et les dicts sont partages : ne pas les modifier.
+        """
+        return self._especes
+
+    def get_par_numero(self, numero):
+        """Retourne l'espece d'un numero de Pokedex, ou None."""
+        return self._par_numero.get(numero)
+
+    def get_par_nom(self, nom):
+        """Retourne l'espece d'un nom (exact, ou sans accents ni casse), ou None."""
+        donnees = self._par_nom.get(nom)
+        if donnees is None:
+            donnees = self._par_nom.get(normaliser_nom(nom))
+        return donnees
+
+    def get_statistiques(self):
+        """Retourne les compteurs du cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "version": self.version,
+            "nombre_especes": len(self._especes),
+        }
+
+    def __len__(self):
+        return len(self._especes)
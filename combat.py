@@ -4,16 +4,52 @@ Tour par tour avec vitesse, statuts, capture, objets et XP.
 """
 
 import random
+from collections import namedtuple
 
 from type_chart import TypeChart
 from capture import Capture
 from experience import Experience
+from journal import JournalCombat
+from rng import FluxAleatoire
+
+
+# Instantane d'un combat complet (voir Combat.capturer_etat)
+EtatCombat = namedtuple("EtatCombat", [
+    "tour", "termine", "vainqueur", "capture_reussie", "abandon",
+    "joueur", "adverse", "inventaire",
+])
+
+
+# Issue structuree d'une action en mode silencieux (aucun message construit)
+# degats_joueur / degats_adverse : degats d'attaque infliges par chaque camp ce tour
+ResultatTour = namedtuple("ResultatTour", [
+    "succes", "degats_joueur", "degats_adverse", "nb_secousses", "termine",
+])
 
 
 class Combat:
     """Gere un combat entre le Pokemon du joueur et un Pokemon sauvage/adverse."""
 
-    def __init__(self, pokemon_joueur, pokemon_adverse, inventaire=None, pokedex=None):
+    # Actions du joueur (voir jouer_action)
+    ACTION_ATTAQUE = "attaque"
+    ACTION_CAPTURE = "capture"
+    ACTION_OBJET = "objet"
+    ACTION_FUITE = "fuite"
+
+    def __init__(self, pokemon_joueur, pokemon_adverse, inventaire=None, pokedex=None,
+                 silencieux=False, capacite_journal=JournalCombat.CAPACITE_DEFAUT,
+                 rng=None, graine=None):
+        """
+        Args:
+            silencieux: si True, les actions ne construisent aucun message,
+                n'alimentent pas le journal et retournent un ResultatTour.
+            capacite_journal: nombre d'evenements conserves dans self.log
+                (les plus anciens sont ecrases ; 0 desactive le journal).
+            rng: source de tous les tirages du combat (FluxAleatoire ou tout
+                objet avec random/uniform/randint). Par defaut, un
+                FluxAleatoire(graine) si une graine est donnee, sinon le
+                module random global.
+        """
         self.pokemon_joueur = pokemon_joueur
         self.pokemon_adverse = pokemon_adverse
         self.inventaire = inventaire
@@ -23,20 +59,36 @@ class Combat:
         self.vainqueur = None
         self.capture_reussie = False
         self.abandon = False
-        self.log = []
+        self.silencieux = silencieux
+        if rng is None:
+            rng = FluxAleatoire(graine) if graine is not None else random
+        self.rng = rng
+        self.log = JournalCombat(capacite_journal)
 
         # Enregistrer le Pokemon adverse comme "vu" dans le Pokedex
         if self.pokedex:
             self.pokedex.enregistrer_vu(pokemon_adverse)
 
-    def _ajouter_log(self, message):
-        """Ajoute un message au journal de combat."""
-        self.log.append(message)
-
-    def _ajouter_logs(self, messages):
-        """Ajoute plusieurs messages au journal."""
-        for msg in messages:
-            self.log.append(msg)
+    def _journaliser(self, type_evenement, acteur=None, cible=None, valeur=None):
+        """Ajoute un evenement au journal de combat (texte rendu a l'affichage)."""
+        self.log.ajouter(type_evenement, self.tour, acteur, cible, valeur)
+
+    def _journaliser_attaque(self, attaquant, defenseur, resultat):
+        """Decompose un ResultatAttaque en evenements du journal."""
+        nom = attaquant.nom
+        if resultat.msg_statut:
+            self._journaliser(JournalCombat.ETAT, nom, valeur=resultat.msg_statut)
+        if not resultat.a_agi:
+            if resultat.degats_confusion:
+                self._journaliser(JournalCombat.CONFUSION, nom, valeur=resultat.degats_confusion)
+            return
+        if resultat.critique:
+            self._journaliser(JournalCombat.CRITIQUE, nom, defenseur.nom)
+        if resultat.multiplicateur != 1.0:
+            self._journaliser(JournalCombat.EFFICACITE, nom, defenseur.nom, resultat.multiplicateur)
+        self._journaliser(JournalCombat.DEGATS, nom, defenseur.nom, resultat.degats)
+        if defenseur.est_ko():
+            self._journaliser(JournalCombat.KO, nom, defenseur.nom)
 
     def get_ordre_tour(self):
         """
@@ -52,7 +104,7 @@ class Combat:
             return "adverse", "joueur"
         else:
             # Egalite : aleatoire
-            if random.random() < 0.5:
+            if self.rng.random() < 0.5:
                 return "joueur", "adverse"
             return "adverse", "joueur"
 
@@ -65,37 +117,59 @@ class Combat:
         messages.append(f"\n--- Tour de {attaquant.nom} ---")
 
         # Attaque ratee (10% de chance)
-        if random.random() < 0.10:
+        if self.rng.random() < 0.10:
             messages.append(f"{attaquant.nom} rate son attaque !")
+            self._journaliser(JournalCombat.RATE, attaquant.nom, defenseur.nom)
             return messages
 
         # Executer l'attaque
-        degats, msgs_attaque = attaquant.attaquer(defenseur)
-        messages.extend(msgs_attaque)
+        resultat = attaquant.resoudre_attaque(defenseur, rng=self.rng)
+        self._journaliser_attaque(attaquant, defenseur, resultat)
+        messages.extend(attaquant.decrire_attaque(resultat, defenseur))
 
         return messages
 
+    def _attaque_silencieuse(self, attaquant, defenseur):
+        """Equivalent de jouer_tour_attaque sans message. Retourne les degats infliges."""
+        # Attaque ratee (10% de chance)
+        if self.rng.random() < 0.10:
+            return 0
+        return attaquant.resoudre_attaque(defenseur, rng=self.rng).degats
+
+    def _fin_tour_silencieuse(self, pokemon):
+        """Equivalent de appliquer_effets_fin_tour sans message."""
+        degats = pokemon.statut.get_degats_fin_tour(pokemon.pv_max)
+        if degats > 0:
+            pokemon.subir_degats(degats)
+
     def appliquer_effets_fin_tour(self, pokemon, nom):
         """Applique les effets de statut en fin de tour."""
         messages = []
+        statut = pokemon.statut.statut_principal
         degats, msg = pokemon.statut.appliquer_degats_fin_tour(pokemon.pv_max)
         if degats > 0:
             pokemon.subir_degats(degats)
             messages.append(msg)
+            self._journaliser(JournalCombat.DEGATS_STATUT, pokemon.nom, valeur=(statut, degats))
             if pokemon.est_ko():
                 messages.append(f"{pokemon.nom} est KO a cause de son statut !")
+                self._journaliser(JournalCombat.KO_STATUT, pokemon.nom)
         return messages
 
     def tour_attaque(self):
         """
         Execute un tour de combat complet (les deux Pokemon attaquent).
-        Retourne les messages du tour.
+        Retourne les messages du tour (un ResultatTour en mode silencieux).
         """
+        if self.silencieux:
+            return self._tour_attaque_silencieux()
+
         if self.termine:
             return ["Le combat est deja termine."]
 
         self.tour += 1
         messages = [f"\n{'='*40}\nTour {self.tour}\n{'='*40}"]
+        self._journaliser(JournalCombat.DEBUT_TOUR)
 
         premier, second = self.get_ordre_tour()
 
@@ -113,7 +187,6 @@ class Combat:
         # Verifier KO
         if poke_2.est_ko():
             self._fin_combat(poke_1)
-            self._ajouter_logs(messages)
             return messages
 
         # Effets fin de tour pour le premier
@@ -121,7 +194,6 @@ class Combat:
         messages.extend(msgs)
         if poke_1.est_ko():
             self._fin_combat(poke_2)
-            self._ajouter_logs(messages)
             return messages
 
         # Second Pokemon attaque
@@ -131,7 +203,6 @@ class Combat:
         # Verifier KO
         if poke_1.est_ko():
             self._fin_combat(poke_2)
-            self._ajouter_logs(messages)
             return messages
 
         # Effets fin de tour pour le second
@@ -139,22 +210,59 @@ class Combat:
         messages.extend(msgs)
         if poke_2.est_ko():
             self._fin_combat(poke_1)
-            self._ajouter_logs(messages)
             return messages
 
         # Afficher les PV
         messages.append(f"\n{self.pokemon_joueur.nom}: {self.pokemon_joueur.pv}/{self.pokemon_joueur.pv_max} PV")
         messages.append(f"{self.pokemon_adverse.nom}: {self.pokemon_adverse.pv}/{self.pokemon_adverse.pv_max} PV")
+        for pokemon in (self.pokemon_joueur, self.pokemon_adverse):
+            self._journaliser(JournalCombat.PV, pokemon.nom, valeur=(pokemon.pv, pokemon.pv_max))
 
-        self._ajouter_logs(messages)
         return messages
 
+    def _tour_attaque_silencieux(self):
+        """tour_attaque sans aucun message : retourne un ResultatTour."""
+        if self.termine:
+            return ResultatTour(False, 0, 0, 0, True)
+
+        self.tour += 1
+        premier, second = self.get_ordre_tour()
+
+        if premier == "joueur":
+            poke_1, poke_2 = self.pokemon_joueur, self.pokemon_adverse
+        else:
+            poke_1, poke_2 = self.pokemon_adverse, self.pokemon_joueur
+
+        degats_1 = self._attaque_silencieuse(poke_1, poke_2)
+        degats_2 = 0
+        if poke_2.est_ko():
+            self._fin_combat(poke_1)
+        else:
+            self._fin_tour_silencieuse(poke_1)
+            if poke_1.est_ko():
+                self._fin_combat(poke_2)
+            else:
+                degats_2 = self._attaque_silencieuse(poke_2, poke_1)
+                if poke_1.est_ko():
+                    self._fin_combat(poke_2)
+                else:
+                    self._fin_tour_silencieuse(poke_2)
+                    if poke_2.est_ko():
+                        self._fin_combat(poke_1)
+
+        if premier == "joueur":
+            return ResultatTour(True, degats_1, degats_2, 0, self.termine)
+        return ResultatTour(True, degats_2, degats_1, 0, self.termine)
+
     def tenter_capture(self, ball):
         """
         Le joueur tente de capturer le Pokemon adverse.
         Consomme la ball de l'inventaire.
-        Retourne les messages.
+        Retourne les messages (un ResultatTour en mode silencieux).
         """
+        if self.silencieux:
+            return self._tenter_capture_silencieux(ball)
+
         if self.termine:
             return ["Le combat est deja termine."]
 
@@ -174,8 +282,13 @@ class Combat:
             self.inventaire,
             types_pokemon=self.pokemon_adverse.types,
             tour_combat=self.tour,
+            rng=self.rng,
         )
         messages.extend(msgs_capture)
+        self._journaliser(
+            JournalCombat.CAPTURE, ball.nom, self.pokemon_adverse.nom,
+            (capture, nb_secousses, ball.valeur >= 255),
+        )
 
         if capture:
             self.capture_reussie = True
@@ -191,8 +304,10 @@ class Combat:
                 self.pokemon_adverse.base_xp,
                 self.pokemon_adverse.niveau
             )
+            ancien_niveau = self.pokemon_joueur.niveau
             msgs_xp = self.pokemon_joueur.gagner_xp(xp)
             messages.extend(msgs_xp)
+            self._journaliser_xp(xp, ancien_niveau)
         else:
             # Le Pokemon adverse attaque apres une capture ratee
             messages.append(f"\n{self.pokemon_adverse.nom} contre-attaque !")
@@ -208,14 +323,57 @@ class Combat:
             msgs = self.appliquer_effets_fin_tour(self.pokemon_adverse, "adverse")
             messages.extend(msgs)
 
-        self._ajouter_logs(messages)
         return messages
 
+    def _tenter_capture_silencieux(self, ball):
+        """tenter_capture sans aucun message : retourne un ResultatTour."""
+        if self.termine:
+            return ResultatTour(False, 0, 0, 0, True)
+
+        self.tour += 1
+
+        # Retirer la ball de l'inventaire
+        ball_utilisee = self.inventaire.retirer(ball.nom) if self.inventaire else None
+        if ball_utilisee is None:
+            return ResultatTour(False, 0, 0, 0, self.termine)
+
+        capture, nb_secousses = Capture.resoudre_capture(
+            self.pokemon_adverse,
+            ball,
+            self.inventaire,
+            types_pokemon=self.pokemon_adverse.types,
+            tour_combat=self.tour,
+            rng=self.rng,
+        )
+
+        degats_adverse = 0
+        if capture:
+            self.capture_reussie = True
+            self.termine = True
+            if self.pokedex:
+                self.pokedex.enregistrer_capture(self.pokemon_adverse)
+            xp = Experience.xp_gagnee(
+                self.pokemon_adverse.base_xp,
+                self.pokemon_adverse.niveau
+            )
+            self.pokemon_joueur.ajouter_xp(xp)
+        else:
+            # Le Pokemon adverse attaque apres une capture ratee
+            degats_adverse = self._attaque_silencieuse(self.pokemon_adverse, self.pokemon_joueur)
+            if self.pokemon_joueur.est_ko():
+                self._fin_combat(self.pokemon_adverse)
+            self._fin_tour_silencieuse(self.pokemon_adverse)
+
+        return ResultatTour(capture, 0, degats_adverse, nb_secousses, self.termine)
+
     def utiliser_objet(self, objet, pokemon_cible=None):
         """
         Le joueur utilise un objet pendant le combat.
-        Retourne les messages.
+        Retourne les messages (un ResultatTour en mode silencieux).
         """
+        if self.silencieux:
+            return self._utiliser_objet_silencieux(objet, pokemon_cible)
+
         if self.termine:
             return ["Le combat est deja termine."]
 
@@ -236,6 +394,7 @@ class Combat:
             msg = "Cet objet ne peut pas etre utilise en combat."
 
         messages.append(msg)
+        self._journaliser(JournalCombat.OBJET, objet.nom, pokemon_cible.nom, msg)
 
         if succes:
             # Le Pokemon adverse attaque apres utilisation d'un objet
@@ -254,16 +413,46 @@ class Combat:
             msgs = self.appliquer_effets_fin_tour(self.pokemon_adverse, "adverse")
             messages.extend(msgs)
 
-        self._ajouter_logs(messages)
         return messages
 
+    def _utiliser_objet_silencieux(self, objet, pokemon_cible=None):
+        """utiliser_objet sans aucun message : retourne un ResultatTour."""
+        if self.termine:
+            return ResultatTour(False, 0, 0, 0, True)
+
+        self.tour += 1
+
+        if pokemon_cible is None:
+            pokemon_cible = self.pokemon_joueur
+
+        if objet.categorie == "soin_pv":
+            succes, _ = self.inventaire.utiliser_potion(objet, pokemon_cible, silencieux=True)
+        elif objet.categorie == "soin_statut":
+            succes, _ = self.inventaire.utiliser_soin_statut(objet, pokemon_cible, silencieux=True)
+        elif objet.categorie == "revive":
+            succes, _ = self.inventaire.utiliser_rappel(objet, pokemon_cible, silencieux=True)
+        else:
+            succes = False
+
+        degats_adverse = 0
+        if succes:
+            # Le Pokemon adverse attaque apres utilisation d'un objet
+            degats_adverse = self._attaque_silencieuse(self.pokemon_adverse, self.pokemon_joueur)
+            if self.pokemon_joueur.est_ko():
+                self._fin_combat(self.pokemon_adverse)
+            self._fin_tour_silencieuse(self.pokemon_joueur)
+            self._fin_tour_silencieuse(self.pokemon_adverse)
+
+        return ResultatTour(succes, 0, degats_adverse, 0, self.termine)
+
     def abandonner(self):
         """Le joueur abandonne le combat."""
         self.termine = True
         self.abandon = True
-        msg = "Vous avez fui le combat !"
-        self._ajouter_log(msg)
-        return [msg]
+        if self.silencieux:
+            return ResultatTour(True, 0, 0, 0, True)
+        self._journaliser(JournalCombat.FUITE, self.pokemon_joueur.nom)
+        return ["Vous avez fui le combat !"]
 
     def _fin_combat(self, vainqueur_pokemon):
         """Termine le combat et distribue l'XP."""
@@ -276,8 +465,97 @@ class Combat:
                 self.pokemon_adverse.base_xp,
                 self.pokemon_adverse.niveau
             )
-            msgs_xp = self.pokemon_joueur.gagner_xp(xp)
-            self._ajouter_logs(msgs_xp)
+            if self.silencieux:
+                self.pokemon_joueur.ajouter_xp(xp)
+                return
+            ancien_niveau = self.pokemon_joueur.niveau
+            self.pokemon_joueur.gagner_xp(xp)
+            self._journaliser_xp(xp, ancien_niveau)
+
+    def _journaliser_xp(self, xp, ancien_niveau):
+        """
+        Journalise un gain d'XP, avec le nouveau niveau s'il y a eu montee et
+        l'evolution alors possible (memes informations que Pokemon.gagner_xp).
+        """
+        pokemon = self.pokemon_joueur
+        niveau = evolution = None
+        if pokemon.niveau != ancien_niveau:
+            niveau = pokemon.niveau
+            if pokemon.peut_evoluer():
+                evolution = pokemon.evolution_nom
+        self._journaliser(JournalCombat.XP, pokemon.nom, valeur=(xp, niveau, evolution))
+
+    def jouer_action(self, action=None, argument=None):
+        """
+        Joue une action du joueur : ACTION_ATTAQUE (ou None), ACTION_CAPTURE
+        (argument = ball), ACTION_OBJET (argument = objet) ou ACTION_FUITE.
+        Retourne le resultat de la methode correspondante.
+        """
+        if action is None or action == self.ACTION_ATTAQUE:
+            return self.tour_attaque()
+        if action == self.ACTION_CAPTURE:
+            return self.tenter_capture(argument)
+        if action == self.ACTION_OBJET:
+            return self.utiliser_objet(argument)
+        if action == self.ACTION_FUITE:
+            return self.abandonner()
+        raise ValueError(f"Action inconnue : {action}")
+
+    def simuler_jusqu_a_fin(self, policy=None, tours_max=1000):
+        """
+        Joue le combat jusqu'a la fin en mode silencieux.
+
+        Args:
+            policy: fonction (combat) -> None (attaque), une action, ou un
+                    tuple (action, argument). Par defaut, attaque a chaque tour.
+            tours_max: nombre de tours au-dela duquel la simulation s'arrete
+
+        Retourne le Pokemon vainqueur (None si capture, fuite ou tours_max atteint).
+        """
+        silencieux = self.silencieux
+        self.silencieux = True
+        try:
+            while not self.termine and self.tour < tours_max:
+                if policy is None:
+                    self._tour_attaque_silencieux()
+                    continue
+                choix = policy(self)
+                if choix is None or isinstance(choix, str):
+                    self.jouer_action(choix)
+                else:
+                    self.jouer_action(*choix)
+        finally:
+            self.silencieux = silencieux
+        return self.vainqueur
+
+    def capturer_etat(self):
+        """
+        Capture l'etat du combat (tour, fin, vainqueur, les deux Pokemon et
+        l'inventaire) dans un EtatCombat immuable. Le journal n'est pas inclus :
+        restaurer_etat() en efface les tours posterieurs a l'etat restaure.
+        """
+        return EtatCombat(
+            self.tour, self.termine, self.vainqueur, self.capture_reussie, self.abandon,
+            self.pokemon_joueur.capturer_etat(),
+            self.pokemon_adverse.capturer_etat(),
+            self.inventaire.capturer_etat() if self.inventaire else None,
+        )
+
+    def restaurer_etat(self, etat):
+        """
+        Restaure en place un etat retourne par capturer_etat(). Les evenements
+        du journal des tours suivants (branche abandonnee) sont effaces.
+        """
+        self.log.tronquer(etat.tour)
+        self.tour = etat.tour
+        self.termine = etat.termine
+        self.vainqueur = etat.vainqueur
+        self.capture_reussie = etat.capture_reussie
+        self.abandon = etat.abandon
+        self.pokemon_joueur.restaurer_etat(etat.joueur)
+        self.pokemon_adverse.restaurer_etat(etat.adverse)
+        if self.inventaire and etat.inventaire is not None:
+            self.inventaire.restaurer_etat(etat.inventaire)
 
     def get_vainqueur(self):
         """Retourne le Pokemon vainqueur ou None."""
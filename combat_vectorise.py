@@ -0,0 +1,177 @@
+"""
+Module CombatVectorise - Moteur de combats 1 contre 1 par lots, avec NumPy.
+Fait avancer des milliers de combats a la fois, avec les memes regles que
+Combat.tour_attaque et Pokemon.attaquer : ordre par vitesse (egalite tiree au
+sort), 10% d'attaques ratees, 1/24 de coups critiques, facteur aleatoire
+0.85-1.0, puissance fixe 80 avec STAB et multiplicateur de type, degats de
+poison et de brulure en fin de tour.
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from population import PokemonArray, CODES_STATUT
+from statut import Statut
+from type_chart import TypeChart
+
+
+# Resultat de simuler_combats : un element par combat
+# vainqueur : AUCUN (tours_max atteint), JOUEUR ou ADVERSE
+ResultatCombats = namedtuple("ResultatCombats", [
+    "vainqueur", "tours", "pv_joueur", "pv_adverse",
+])
+
+AUCUN = 0
+JOUEUR = 1
+ADVERSE = 2
+
+# Statuts geres (les autres empechent d'agir : non supportes ici)
+STATUTS_SUPPORTES = (0, CODES_STATUT[Statut.POISON], CODES_STATUT[Statut.BRULURE])
+
+PUISSANCE = 80
+STAB = 1.5
+
+
+def _degats_de_base(attaquants, defenseurs):
+    """
+    Partie deterministe de la formule de degats (meme ordre d'operations
+    que Pokemon.resoudre_attaque, brulure comprise).
+    """
+    att_stat = attaquants.attaque.astype(np.int64)
+    brule = attaquants.statut == CODES_STATUT[Statut.BRULURE]
+    att_stat = np.where(brule, (att_stat * 0.5).astype(np.int64), att_stat)
+    niveau = attaquants.niveau.astype(np.int64)
+    return (2 * niveau / 5 + 2) * PUISSANCE * att_stat / defenseurs.defense / 50 + 2
+
+
+def _multiplicateurs(attaquants, defenseurs):
+    """Multiplicateur de type (premier type non neutre) multiplie par le STAB."""
+    ids_att = np.stack([attaquants.type1, attaquants.type2], axis=1)
+    ids_def = np.stack([defenseurs.type1, defenseurs.type2], axis=1)
+    combis = TypeChart.get_combinaisons_numpy(ids_def)
+    return TypeChart._multiplicateurs_numpy(ids_att, combis) * STAB
+
+
+def _degats_fin_tour(population):
+    """Degats de statut de fin de tour (meme calcul que Statut.get_degats_fin_tour)."""
+    pv_max = population.pv_max.astype(np.int64)
+    degats = np.zeros(len(population), dtype=np.int64)
+    poison = population.statut == CODES_STATUT[Statut.POISON]
+    brulure = population.statut == CODES_STATUT[Statut.BRULURE]
+    degats[poison] = np.maximum(1, pv_max[poison] // 8)
+    degats[brulure] = np.maximum(1, pv_max[brulure] // 16)
+    return degats
+
+
+def _attaquer(pv, base, mult, idx, attaquant, rng):
+    """
+    Demi-tour : les Pokemon du camp `attaquant` (0 ou 1, par combat) attaquent
+    le camp oppose dans les combats `idx`. Modifie `pv` en place.
+    """
+    defenseur = 1 - attaquant
+    tirages = rng.random((3, idx.size))
+    touche = tirages[0] >= 0.10
+    critique = np.where(tirages[1] < (1 / 24), 1.5, 1.0)
+    facteur = 0.85 + (1.0 - 0.85) * tirages[2]
+    degats_bruts = base[attaquant, idx] * (mult[attaquant, idx] * critique * facteur)
+    degats = np.maximum(1, degats_bruts.astype(np.int64))
+    degats = np.where(touche, degats, 0)
+    pv[defenseur, idx] = np.maximum(0, pv[defenseur, idx] - degats)
+
+
+def simuler_combats(joueurs, adverses, tours_max=1000, graine=None):
+    """
+    Joue len(joueurs) combats independants joueurs[i] contre adverses[i]
+    (attaques uniquement, comme Combat.simuler_jusqu_a_fin sans policy).
+    Les PokemonArray d'entree ne sont pas modifies.
+
+    Args:
+        joueurs, adverses: PokemonArray de meme taille
+        tours_max: nombre de tours au-dela duquel un combat est declare nul
+        graine: graine du generateur NumPy (ou un np.random.Generator)
+
+    Retourne un ResultatCombats (tableaux de taille N).
+    """
+    if len(joueurs) != len(adverses):
+        raise ValueError("Les deux populations doivent avoir la meme taille.")
+    for population in (joueurs, adverses):
+        if not np.isin(population.statut, STATUTS_SUPPORTES).all():
+            raise ValueError("Seuls le poison et la brulure sont geres par le moteur vectorise.")
+
+    rng = graine if isinstance(graine, np.random.Generator) else np.random.default_rng(graine)
+    n = len(joueurs)
+
+    # Camp 0 = joueur, camp 1 = adverse
+    pv = np.stack([joueurs.pv, adverses.pv]).astype(np.int64)
+    vitesse = np.stack([joueurs.vitesse, adverses.vitesse])
+    base = np.stack([_degats_de_base(joueurs, adverses), _degats_de_base(adverses, joueurs)])
+    mult = np.stack([_multiplicateurs(joueurs, adverses), _multiplicateurs(adverses, joueurs)])
+    fin_tour = np.stack([_degats_fin_tour(joueurs), _degats_fin_tour(adverses)])
+
+    vainqueur = np.zeros(n, dtype=np.int8)
+    tours = np.zeros(n, dtype=np.int32)
+
+    idx = np.arange(n)
+    tour = 0
+    while idx.size and tour < tours_max:
+        tour += 1
+        tours[idx] = tour
+
+        # Ordre du tour : le plus rapide d'abord, egalite tiree au sort
+        vj = vitesse[0, idx]
+        va = vitesse[1, idx]
+        pile = rng.random(idx.size) < 0.5
+        premier = np.where(vj > va, 0, np.where(va > vj, 1, np.where(pile, 0, 1)))
+
+        for etape in range(4):
+            # 0 : premier attaque, 1 : fin de tour du premier,
+            # 2 : second attaque, 3 : fin de tour du second
+            acteur = premier if etape < 2 else 1 - premier
+            if etape % 2 == 0:
+                _attaquer(pv, base, mult, idx, acteur, rng)
+                ko_camp = 1 - acteur
+            else:
+                pv[acteur, idx] = np.maximum(0, pv[acteur, idx] - fin_tour[acteur, idx])
+                ko_camp = acteur
+            ko = pv[ko_camp, idx] <= 0
+            vainqueur[idx[ko]] = np.where(ko_camp[ko] == 0, ADVERSE, JOUEUR)
+            reste = ~ko
+            idx = idx[reste]
+            premier = premier[reste]
+
+    return ResultatCombats(vainqueur, tours, pv[0].astype(np.int32), pv[1].astype(np.int32))
+
+
+if __name__ == "__main__":
+    import random
+
+    from catalogue import Catalogue
+    from combat import Combat
+    from pokemon import Pokemon
+
+    catalogue = Catalogue.get()
+    pikachu, salameche = catalogue.get_par_nom("Pikachu"), catalogue.get_par_nom("Salameche")
+    n = 100000
+
+    joueurs = PokemonArray.depuis_especes([pikachu] * n, 10)
+    adverses = PokemonArray.depuis_especes([salameche] * n, 10)
+    debut = time.perf_counter()
+    resultat = simuler_combats(joueurs, adverses, graine=0)
+    duree_vecto = time.perf_counter() - debut
+
+    random.seed(0)
+    n_scalaire = 10000
+    victoires = 0
+    debut = time.perf_counter()
+    for _ in range(n_scalaire):
+        joueur = Pokemon.depuis_json(pikachu, niveau=10)
+        combat = Combat(joueur, Pokemon.depuis_json(salameche, niveau=10), silencieux=True)
+        victoires += combat.simuler_jusqu_a_fin() is joueur
+    duree_scalaire = time.perf_counter() - debut
+
+    print(f"Vectorise : {n / duree_vecto:10.0f} combats/s, "
+          f"{np.mean(resultat.vainqueur == JOUEUR):.1%} de victoires")
+    print(f"Scalaire  : {n_scalaire / duree_scalaire:10.0f} combats/s, "
+          f"{victoires / n_scalaire:.1%} de victoires")
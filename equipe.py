@@ -0,0 +1,178 @@
+"""
+Module Equipe - Optimisation de la couverture de types d'une equipe.
+Cherche l'equipe qui couvre le plus de types en super efficace
+tout en partageant le moins de faiblesses possible.
+"""
+
+from pokemon import Pokemon
+from type_chart import TypeChart
+
+
+def _nb_bits(masque):
+    """Retourne le nombre de bits a 1 d'un masque."""
+    return bin(masque).count("1")
+
+
+class OptimiseurEquipe:
+    """
+    Recherche exacte (separation et evaluation) de la meilleure equipe.
+
+    Chaque espece est resumee par deux masques de 18 bits (un bit par type) :
+    - couverture : types defenseurs touches en super efficace par un de ses types
+    - faiblesses : types attaquants contre lesquels elle subit plus de x1
+
+    Les especes ayant les memes masques sont regroupees, puis les signatures
+    dominees (couverture incluse et faiblesses englobantes) sont ecartees.
+    """
+
+    def __init__(self, especes=None):
+        """
+        Args:
+            especes: liste de dicts (format pokemon.json) des candidats.
+                     Par defaut, les 1025 especes de pokemon.json.
+        """
+        if especes is None:
+            especes = Pokemon.charger_tous()
+        self._especes = especes
+
+        # Signature (couverture, faiblesses) -> especes, des plus fortes aux plus faibles
+        self._signatures = {}
+        for donnees in especes:
+            signature = self.calculer_signature(donnees["types"])
+            self._signatures.setdefault(signature, []).append(donnees)
+        for groupe in self._signatures.values():
+            groupe.sort(key=self._total_stats, reverse=True)
+
+    @staticmethod
+    def calculer_signature(types):
+        """Retourne (masque_couverture, masque_faiblesses) pour une liste de types."""
+        couverture = 0
+        for type_att in types:
+            idx_att = TypeChart.get_index(type_att)
+            if idx_att < 0:
+                continue
+            for idx_def, mult in enumerate(TypeChart.CHART[idx_att]):
+                if mult == 2:
+                    couverture |= 1 << idx_def
+
+        faiblesses = 0
+        id_combi = TypeChart.get_combinaison_id(types)
+        if id_combi >= 0:
+            for idx_att in range(len(TypeChart.TYPES)):
+                if TypeChart.MULTIPLICATEURS[idx_att][id_combi] > 1:
+                    faiblesses |= 1 << idx_att
+
+        return couverture, faiblesses
+
+    @staticmethod
+    def masque_vers_types(masque):
+        """Convertit un masque de 18 bits en liste de noms de types."""
+        return [t for i, t in enumerate(TypeChart.TYPES) if masque >> i & 1]
+
+    @staticmethod
+    def _total_stats(donnees):
+        """Somme des stats de base d'une espece (departage les especes equivalentes)."""
+        return (donnees["pv"] + donnees["attaque"] + donnees["defense"]
+                + donnees["attaque_speciale"] + donnees["defense_speciale"]
+                + donnees["vitesse"])
+
+    def _candidats(self, taille):
+        """
+        Retourne les signatures utiles [(couverture, faiblesses, nb_max)].
+        Une signature est ecartee si au moins `taille` especes la dominent :
+        dans toute equipe, l'une d'elles est libre et la remplace sans perte.
+        """
+        signatures = [(sig, min(len(groupe), taille))
+                      for sig, groupe in self._signatures.items()]
+        candidats = []
+        for (couv, faib), nb in signatures:
+            nb_dominants = 0
+            for (couv2, faib2), nb2 in signatures:
+                if (couv2, faib2) != (couv, faib) and couv2 | couv == couv2 and faib2 & faib == faib2:
+                    nb_dominants += nb2
+            if nb_dominants < taille:
+                candidats.append((couv, faib, nb))
+
+        # Les meilleures signatures d'abord : bonnes solutions trouvees tot
+        candidats.sort(key=lambda c: (-_nb_bits(c[0]), _nb_bits(c[1])))
+        return candidats
+
+    def meilleure_equipe(self, taille=6):
+        """
+        Cherche l'equipe de `taille` especes qui maximise la couverture
+        offensive, puis minimise le nombre de faiblesses partagees
+        (types auxquels au moins deux membres sont faibles).
+
+        Retourne un dict :
+            {"equipe": [dicts especes], "couverture": [types],
+             "faiblesses_communes": [types]}
+        ou None si le pool contient moins de `taille` especes.
+        """
+        if taille <= 0 or len(self._especes) < taille:
+            return None
+
+        candidats = self._candidats(taille)
+        couvertures = [c[0] for c in candidats]
+        faiblesses = [c[1] for c in candidats]
+        nb_max = [c[2] for c in candidats]
+        nb_candidats = len(candidats)
+        nb_types = len(TypeChart.TYPES)
+
+        # meilleur = [couverture, nb faiblesses communes, choix]
+        meilleur = [-1, nb_types + 1, None]
+        choix = []
+
+        def explorer(debut, restants, couv, faib_vues, faib_communes):
+            if restants == 0:
+                score_couv = _nb_bits(couv)
+                score_faib = _nb_bits(faib_communes)
+                if score_couv > meilleur[0] or (score_couv == meilleur[0] and score_faib < meilleur[1]):
+                    meilleur[0], meilleur[1], meilleur[2] = score_couv, score_faib, list(choix)
+                return
+
+            # Borne : couverture actuelle + les `restants` meilleurs gains possibles.
+            # Les faiblesses communes ne peuvent que croitre.
+            gains = sorted((_nb_bits(couvertures[j] & ~couv) for j in range(debut, nb_candidats)),
+                           reverse=True)
+            borne = min(nb_types, _nb_bits(couv) + sum(gains[:restants]))
+            score_faib = _nb_bits(faib_communes)
+            if borne < meilleur[0] or (borne == meilleur[0] and score_faib >= meilleur[1]):
+                return
+
+            for j in range(debut, nb_candidats):
+                deja = choix.count(j)
+                if deja >= nb_max[j]:
+                    continue
+                choix.append(j)
+                explorer(
+                    j if deja + 1 < nb_max[j] else j + 1,
+                    restants - 1,
+                    couv | couvertures[j],
+                    faib_vues | faiblesses[j],
+                    faib_communes | (faib_vues & faiblesses[j]),
+                )
+                choix.pop()
+
+        explorer(0, taille, 0, 0, 0)
+        if meilleur[2] is None:
+            return None
+
+        # Pour chaque signature retenue, prendre les especes les plus fortes
+        equipe = []
+        couv_totale = 0
+        faib_vues = 0
+        faib_communes = 0
+        for j in sorted(set(meilleur[2])):
+            signature = (couvertures[j], faiblesses[j])
+            equipe.extend(self._signatures[signature][:meilleur[2].count(j)])
+        for donnees in equipe:
+            couv, faib = self.calculer_signature(donnees["types"])
+            couv_totale |= couv
+            faib_communes |= faib_vues & faib
+            faib_vues |= faib
+
+        return {
+            "equipe": equipe,
+            "couverture": self.masque_vers_types(couv_totale),
+            "faiblesses_communes": self.masque_vers_types(faib_communes),
+        }
@@ -0,0 +1,100 @@
+"""
+Module Evolution - Graphe des evolutions construit depuis pokemon.json.
+Acces en O(1) a la forme suivante, a la forme de base et a la chaine
+complete de chaque espece, et requetes groupees par niveau d'evolution.
+"""
+
+from bisect import bisect_right
+
+from catalogue import Catalogue
+
+
+class GrapheEvolution:
+    """Index precalcule des liens evolution_id entre especes."""
+
+    _defaut = None
+
+    def __init__(self, especes):
+        """
+        Args:
+            especes: liste de dicts (format pokemon.json)
+        """
+        self._suivant = {}
+        self._niveau = {}
+        precedents = {}
+        for donnees in especes:
+            numero = donnees["numero"]
+            self._suivant[numero] = None
+            precedents.setdefault(numero, [])
+        for donnees in especes:
+            numero = donnees["numero"]
+            cible = donnees.get("evolution_id")
+            if cible is not None and cible in self._suivant:
+                self._suivant[numero] = cible
+                self._niveau[numero] = donnees.get("evolution_niveau")
+                precedents[cible].append(numero)
+        self._precedents = {numero: tuple(sorted(p)) for numero, p in precedents.items()}
+
+        # Forme de base (en remontant les pre-evolutions) et chaine complete
+        self._racine = {}
+        self._chaine = {}
+        for numero in self._suivant:
+            racine = numero
+            vus = {racine}
+            while self._precedents[racine] and self._precedents[racine][0] not in vus:
+                racine = self._precedents[racine][0]
+                vus.add(racine)
+            self._racine[numero] = racine
+        for numero in self._suivant:
+            racine = self._racine[numero]
+            if racine not in self._chaine:
+                self._chaine[racine] = self._construire_chaine(racine)
+            self._chaine[numero] = self._chaine[racine]
+
+        # Especes evoluant par niveau, triees par niveau d'evolution
+        par_niveau = sorted(
+            (niveau, numero) for numero, niveau in self._niveau.items() if niveau is not None
+        )
+        self._niveaux_tries = [niveau for niveau, _ in par_niveau]
+        self._numeros_tries = [numero for _, numero in par_niveau]
+
+    def _construire_chaine(self, racine):
+        """Suit les evolutions depuis la forme de base."""
+        chaine = [racine]
+        suivant = self._suivant[racine]
+        while suivant is not None and suivant not in chaine:
+            chaine.append(suivant)
+            suivant = self._suivant[suivant]
+        return tuple(chaine)
+
+    @classmethod
+    def par_defaut(cls):
+        """Retourne le graphe du Catalogue par defaut, reconstruit si pokemon.json change."""
+        catalogue = Catalogue.get()
+        if cls._defaut is None or cls._defaut[0] != catalogue.version:
+            cls._defaut = (catalogue.version, cls(catalogue.get_especes()))
+        return cls._defaut[1]
+
+    def get_suivant(self, numero):
+        """Retourne le numero de la forme suivante, ou None."""
+        return self._suivant.get(numero)
+
+    def get_niveau_evolution(self, numero):
+        """Retourne le niveau d'evolution de l'espece, ou None."""
+        return self._niveau.get(numero)
+
+    def get_precedents(self, numero):
+        """Retourne les numeros des pre-evolutions directes."""
+        return self._precedents.get(numero, ())
+
+    def get_racine(self, numero):
+        """Retourne le numero de la forme de base de la famille."""
+        return self._racine.get(numero)
+
+    def get_chaine(self, numero):
+        """Retourne la chaine d'evolution complete (tuple de numeros)."""
+        return self._chaine.get(numero, ())
+
+    def especes_evoluant_avant(self, niveau):
+        """Retourne les numeros des especes qui evoluent au niveau `niveau` ou avant."""
+        return self._numeros_tries[:bisect_right(self._niveaux_tries, niveau)]
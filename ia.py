@@ -0,0 +1,368 @@
+"""
+Module IA - Choix des actions du joueur par recherche expectimax.
+Les noeuds de decision sont les actions du joueur (attaque, objets de soin,
+balls) ; l'adversaire attaque toujours (comme dans Combat). Les noeuds de
+hasard reprennent les transitions exactes de SolveurCombat (ordre par
+vitesse, attaque ratee, critique, Statut.peut_agir, degats de fin de tour),
+avec le jet de degats 0.85-1.0 resume en quelques classes de meme
+probabilite. Approfondissement iteratif sous un budget de temps par decision
+et table de transposition conservee d'une decision a l'autre.
+"""
+
+import math
+import time
+
+from calcul_degats import CalculDegats, CRITIQUE
+from capture import Capture
+from combat import Combat
+from solveur import SolveurCombat, VICTOIRE_JOUEUR, VICTOIRE_ADVERSE
+from statut import Statut
+from type_chart import TypeChart
+
+
+BUDGET_DEFAUT = 0.050
+PROFONDEUR_MAX = 12
+# Branches de hasard plus improbables : evaluees sans etre developpees
+PROBABILITE_MIN = 1e-3
+
+
+class _TempsEcoule(Exception):
+    """Budget de temps epuise pendant une iteration de l'approfondissement."""
+
+
+class ModeleCombat(SolveurCombat):
+    """
+    Transitions de SolveurCombat avec un jet de degats resume : les degats
+    sans critique en `nb_classes` valeurs, les critiques en une seule.
+    """
+
+    def __init__(self, pokemon_joueur, pokemon_adverse, nb_classes=3):
+        self.nb_classes = nb_classes
+        super().__init__(pokemon_joueur, pokemon_adverse)
+
+    def _loi_degats(self, camp, brule):
+        loi = self._lois[camp].get(brule)
+        if loi is None:
+            attaquant = self.pokemons[camp]
+            defenseur = self.pokemons[1 - camp]
+            attaque = int(attaquant.attaque * 0.5) if brule else attaquant.attaque
+            multiplicateur = TypeChart.get_multiplicateur_attaque(attaquant.types, defenseur.types)
+            p_critique = float(CRITIQUE)
+            cumul = {}
+            for critique, poids, nb in ((False, 1 - p_critique, self.nb_classes), (True, p_critique, 1)):
+                partielle = CalculDegats._distribution_touche(
+                    attaquant.niveau, attaque, defenseur.defense, multiplicateur, critique
+                )
+                for degats in self._quantiles(partielle, nb):
+                    cumul[degats] = cumul.get(degats, 0.0) + poids / nb
+            loi = sorted(cumul.items())
+            self._lois[camp][brule] = loi
+        return loi
+
+    @staticmethod
+    def _quantiles(loi, nb):
+        """Degats aux quantiles (i + 1/2) / nb d'une loi {degats: p}."""
+        valeurs = sorted(loi.items())
+        resultat = []
+        cumul = 0.0
+        i = 0
+        for degats, p in valeurs:
+            cumul += float(p)
+            while i < nb and cumul >= (i + 0.5) / nb:
+                resultat.append(degats)
+                i += 1
+        resultat.extend([valeurs[-1][0]] * (nb - len(resultat)))
+        return resultat
+
+    def degats_moyens(self, camp, statut):
+        """Degats moyens infliges par un tour d'attaque du camp `camp`."""
+        p_agir = sum(p for action, _, p in self._branches_agir(statut) if action is True)
+        loi = self._loi_degats(camp, statut[0] == Statut.BRULURE)
+        return 0.90 * p_agir * sum(degats * p for degats, p in loi)
+
+
+class IACombat:
+    """
+    IA du joueur. S'utilise comme policy de Combat.simuler_jusqu_a_fin ou
+    directement : combat.jouer_action(*ia.choisir_action(combat)).
+    """
+
+    def __init__(self, budget=BUDGET_DEFAUT, profondeur_max=PROFONDEUR_MAX,
+                 valeur_capture=1.0, nb_classes=3):
+        """
+        Args:
+            budget: temps de reflexion par decision (secondes)
+            profondeur_max: nombre maximal d'actions du joueur anticipees
+            valeur_capture: valeur d'une capture (une victoire vaut 1, une defaite 0)
+            nb_classes: nombre de valeurs retenues pour le jet de degats
+        """
+        self.budget = budget
+        self.profondeur_max = profondeur_max
+        self.valeur_capture = valeur_capture
+        self.nb_classes = nb_classes
+        self.modele = None
+        self._cle_modele = None
+        # Table de transposition : etat -> (profondeur, valeur, meilleure action)
+        self.table = {}
+        # Statistiques de la derniere decision
+        self.profondeur_atteinte = 0
+        self.noeuds = 0
+
+    # --- Interface -----------------------------------------------------
+
+    def __call__(self, combat):
+        return self.choisir_action(combat)
+
+    def choisir_action(self, combat):
+        """Retourne (action, argument) pour Combat.jouer_action."""
+        self._preparer(combat)
+        etat = self._etat(combat)
+        actions = self._actions(etat)
+        if len(actions) == 1:
+            self.profondeur_atteinte = 0
+            return self._vers_combat(actions[0])
+
+        self._limite = time.perf_counter() + self.budget
+        self.noeuds = 0
+        meilleure = actions[0]
+        self.profondeur_atteinte = 0
+        for profondeur in range(1, self.profondeur_max + 1):
+            try:
+                _, action = self._decision(etat, profondeur, 1.0)
+            except _TempsEcoule:
+                break
+            meilleure = action
+            self.profondeur_atteinte = profondeur
+        return self._vers_combat(meilleure)
+
+    def evaluer_actions(self, combat, profondeur):
+        """Valeur de chaque action a une profondeur donnee (sans limite de temps)."""
+        self._preparer(combat)
+        self._limite = math.inf
+        etat = self._etat(combat)
+        return {
+            self._vers_combat(action): self._valeur_action(etat, action, profondeur, 1.0)
+            for action in self._actions(etat)
+        }
+
+    # --- Etat ----------------------------------------------------------
+
+    def _preparer(self, combat):
+        """Construit le modele du duel (et vide la table si le duel change)."""
+        joueur, adverse = combat.pokemon_joueur, combat.pokemon_adverse
+        cle = tuple(
+            (p.numero, p.niveau, p.pv_max, p.attaque, p.defense, p.vitesse)
+            for p in (joueur, adverse)
+        )
+        if cle != self._cle_modele:
+            self.modele = ModeleCombat(joueur, adverse, self.nb_classes)
+            self._cle_modele = cle
+            self.table.clear()
+        self.inventaire = combat.inventaire
+        self.objets = {}
+        if combat.inventaire is not None:
+            self.objets = {nom: objet for nom, (objet, _) in combat.inventaire.capturer_etat()}
+
+    def _etat(self, combat):
+        """
+        Etat compact : (pv_joueur, pv_adverse, statut_joueur, statut_adverse,
+        stock, premier_tour) ; stock = tuple trie de (nom, quantite).
+        """
+        joueur, adverse = combat.pokemon_joueur, combat.pokemon_adverse
+        stock = ()
+        if combat.inventaire is not None:
+            stock = tuple(sorted(
+                (nom, quantite) for nom, (objet, quantite) in combat.inventaire.capturer_etat()
+                if quantite > 0 and objet.categorie in ("ball", "soin_pv", "soin_statut")
+            ))
+        return (joueur.pv, adverse.pv, joueur.statut.capturer_etat(),
+                adverse.statut.capturer_etat(), stock, combat.tour == 0)
+
+    def _vers_combat(self, action):
+        if action is None:
+            return Combat.ACTION_ATTAQUE, None
+        objet = self.objets[action]
+        if objet.categorie == "ball":
+            return Combat.ACTION_CAPTURE, objet
+        return Combat.ACTION_OBJET, objet
+
+    def _actions(self, etat):
+        """Actions utiles : None (attaque) ou nom d'un objet de l'inventaire."""
+        pv_joueur, _, statut_joueur, _, stock, _ = etat
+        pv_max = self.modele.pokemons[0].pv_max
+        actions = [None]
+        for nom, _ in stock:
+            objet = self.objets[nom]
+            if objet.categorie == "ball":
+                actions.append(nom)
+            elif objet.categorie == "soin_pv":
+                if pv_joueur < pv_max:
+                    actions.append(nom)
+            else:
+                cible = objet.condition.get("statut") if objet.condition else None
+                if cible == "tous":
+                    if statut_joueur[0] is not None or statut_joueur[2]:
+                        actions.append(nom)
+                elif statut_joueur[0] is not None and statut_joueur[0] == cible:
+                    actions.append(nom)
+        return actions
+
+    # --- Recherche -----------------------------------------------------
+
+    def _decision(self, etat, profondeur, probabilite):
+        """Noeud de decision : retourne (valeur, meilleure action)."""
+        connu = self.table.get(etat)
+        if connu is not None and connu[0] >= profondeur:
+            return connu[1], connu[2]
+        self.noeuds += 1
+        # Un noeud coute plus de 100 us : l'horloge peut etre lue a chaque fois
+        if time.perf_counter() > self._limite:
+            raise _TempsEcoule
+
+        actions = self._actions(etat)
+        if connu is not None:
+            # Essayer d'abord la meilleure action de l'iteration precedente
+            actions.remove(connu[2])
+            actions.insert(0, connu[2])
+        meilleure_valeur = -1.0
+        meilleure_action = actions[0]
+        for action in actions:
+            valeur = self._valeur_action(etat, action, profondeur, probabilite)
+            if valeur > meilleure_valeur:
+                meilleure_valeur, meilleure_action = valeur, action
+        self.table[etat] = (profondeur, meilleure_valeur, meilleure_action)
+        return meilleure_valeur, meilleure_action
+
+    def _suite(self, issue, profondeur, probabilite):
+        """Valeur d'une issue de hasard (valeur terminale ou etat)."""
+        if not isinstance(issue, tuple):
+            return issue
+        if profondeur <= 0 or probabilite < PROBABILITE_MIN:
+            return self.evaluer(issue)
+        return self._decision(issue, profondeur, probabilite)[0]
+
+    def _valeur_action(self, etat, action, profondeur, probabilite):
+        """Noeud de hasard : esperance de la valeur apres `action`."""
+        pv_joueur, pv_adverse, statut_joueur, statut_adverse, stock, _ = etat
+        suivant = profondeur - 1
+        modele = self.modele
+
+        if action is None:
+            valeur = 0.0
+            combat_etat = (pv_joueur, pv_adverse, statut_joueur, statut_adverse)
+            for premier, p_ordre in modele._ordres(combat_etat):
+                for milieu, p1 in modele._demi_tour(premier, combat_etat).items():
+                    if not isinstance(milieu, tuple):
+                        valeur += p_ordre * p1 * milieu
+                        continue
+                    for fin, p2 in modele._demi_tour(1 - premier, milieu).items():
+                        p = p_ordre * p1 * p2
+                        valeur += p * self._suite(self._avec(fin, stock), suivant, probabilite * p)
+            return valeur
+
+        objet = self.objets[action]
+        stock = self._retirer(stock, action)
+        if objet.categorie == "ball":
+            p_capture = self._probabilite_capture(objet, pv_adverse, statut_adverse, etat[5])
+            valeur = p_capture * self.valeur_capture
+            if p_capture < 1.0:
+                echec = 1.0 - p_capture
+                combat_etat = (pv_joueur, pv_adverse, statut_joueur, statut_adverse)
+                for issue, p in modele._demi_tour(1, combat_etat).items():
+                    valeur += echec * p * self._suite(
+                        self._avec(issue, stock), suivant, probabilite * echec * p
+                    )
+            return valeur
+
+        # Objet de soin, puis attaque adverse et degats de fin de tour du joueur
+        if objet.categorie == "soin_pv":
+            pv_max = modele.pokemons[0].pv_max
+            pv_joueur = pv_max if objet.valeur == -1 else min(pv_max, pv_joueur + objet.valeur)
+        elif objet.condition.get("statut") == "tous":
+            statut_joueur = (None, 0, False, 0)
+        else:
+            statut_joueur = (None, 0) + statut_joueur[2:]
+        combat_etat = (pv_joueur, pv_adverse, statut_joueur, statut_adverse)
+        valeur = 0.0
+        for issue, p in modele._demi_tour(1, combat_etat).items():
+            if isinstance(issue, tuple):
+                degats = modele._fin_tour[0].get(issue[2][0], 0)
+                if issue[0] - degats <= 0:
+                    issue = VICTOIRE_ADVERSE
+                elif degats:
+                    issue = (issue[0] - degats,) + issue[1:]
+            valeur += p * self._suite(self._avec(issue, stock), suivant, probabilite * p)
+        return valeur
+
+    @staticmethod
+    def _avec(issue, stock):
+        """Etat de recherche apres une issue de SolveurCombat._demi_tour."""
+        if not isinstance(issue, tuple):
+            return issue
+        return issue + (stock, False)
+
+    @staticmethod
+    def _retirer(stock, nom):
+        return tuple(
+            (n, q - 1) if n == nom else (n, q)
+            for n, q in stock if n != nom or q > 1
+        )
+
+    def _probabilite_capture(self, ball, pv_adverse, statut_adverse, premier_tour):
+        """Probabilite exacte de Capture.resoudre_capture pour un etat."""
+        adverse = self.modele.pokemons[1]
+        mult_ball = self.inventaire.get_multiplicateur_ball(
+            ball, adverse.types, 1 if premier_tour else 2
+        )
+        bonus_statut = Statut.BONUS_CAPTURE.get(statut_adverse[0], 1.0) if statut_adverse[0] else 1.0
+        ratio_pv = (3 * adverse.pv_max - 2 * pv_adverse) / (3 * adverse.pv_max)
+        return Capture.probabilite_capture(adverse.taux_capture, mult_ball, bonus_statut, ratio_pv)
+
+    def evaluer(self, etat):
+        """
+        Estimation rapide de la valeur d'un etat (feuilles de la recherche) :
+        comparaison du nombre de tours necessaires a chaque camp pour mettre
+        l'autre KO, d'apres les degats moyens et les degats de fin de tour.
+        """
+        pv_joueur, pv_adverse, statut_joueur, statut_adverse = etat[:4]
+        modele = self.modele
+        rythme_joueur = modele.degats_moyens(0, statut_joueur) + \
+            modele._fin_tour[1].get(statut_adverse[0], 0)
+        rythme_adverse = modele.degats_moyens(1, statut_adverse) + \
+            modele._fin_tour[0].get(statut_joueur[0], 0)
+        if rythme_joueur <= 0:
+            return VICTOIRE_ADVERSE if rythme_adverse > 0 else 0.5
+        if rythme_adverse <= 0:
+            return VICTOIRE_JOUEUR
+        tours_joueur = pv_adverse / rythme_joueur
+        tours_adverse = pv_joueur / rythme_adverse
+        ecart = (tours_adverse - tours_joueur) / math.sqrt(tours_adverse + tours_joueur)
+        return 1.0 / (1.0 + math.exp(-2.0 * ecart))
+
+
+if __name__ == "__main__":
+    from catalogue import Catalogue
+    from inventaire import Inventaire
+    from pokemon import Pokemon
+
+    catalogue = Catalogue.get()
+    victoires = {"ia": 0, "attaque": 0}
+    profondeurs = []
+    for graine in range(50):
+        for mode in victoires:
+            joueur = Pokemon.depuis_json(catalogue.get_par_nom("Carapuce"), niveau=30)
+            adverse = Pokemon.depuis_json(catalogue.get_par_numero(8), niveau=31)
+            inventaire = Inventaire()
+            inventaire.creer_inventaire_depart()
+            combat = Combat(joueur, adverse, inventaire, silencieux=True, graine=graine)
+            ia = IACombat(valeur_capture=0.0) if mode == "ia" else None
+            while not combat.termine:
+                if ia is None:
+                    combat.jouer_action()
+                else:
+                    combat.jouer_action(*ia.choisir_action(combat))
+                    profondeurs.append(ia.profondeur_atteinte)
+            victoires[mode] += combat.vainqueur is joueur
+    print(f"Victoires sur 50 combats : IA {victoires['ia']}, attaque seule {victoires['attaque']}")
+    print(f"Profondeur moyenne atteinte en {BUDGET_DEFAUT * 1000:.0f} ms : "
+          f"{sum(profondeurs) / len(profondeurs):.1f}")
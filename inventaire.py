@@ -119,6 +119,15 @@ class Inventaire:
             self._stock[nom_objet] = (objet, qty - 1)
         return objet
 
+    def capturer_etat(self):
+        """Retourne le stock courant sous forme de tuple immuable."""
+        return tuple(self._stock.items())
+
+    def restaurer_etat(self, etat):
+        """Restaure un stock retourne par capturer_etat()."""
+        self._stock.clear()
+        self._stock.update(etat)
+
     def get_quantite(self, nom_objet):
         """Retourne la quantite d'un objet dans l'inventaire."""
         if nom_objet in self._stock:
@@ -141,23 +150,23 @@ class Inventaire:
                 objets.append((objet, qty))
         return objets
 
-    def utiliser_potion(self, objet, pokemon):
+    def utiliser_potion(self, objet, pokemon, silencieux=False):
         """
         Utilise une potion sur un Pokemon.
-        Retourne (succes: bool, message: str).
+        Retourne (succes: bool, message: str, ou None si silencieux).
         """
         if objet.categorie != "soin_pv":
             return False, "Cet objet n'est pas une potion."
 
         if pokemon.est_ko():
-            return False, f"{pokemon.nom} est KO ! Utilisez un Rappel."
+            return False, None if silencieux else f"{pokemon.nom} est KO ! Utilisez un Rappel."
 
         if pokemon.pv >= pokemon.pv_max:
-            return False, f"{pokemon.nom} a deja tous ses PV !"
+            return False, None if silencieux else f"{pokemon.nom} a deja tous ses PV !"
 
         # Retirer de l'inventaire
         if not self.retirer(objet.nom):
-            return False, f"Vous n'avez plus de {objet.nom} !"
+            return False, None if silencieux else f"Vous n'avez plus de {objet.nom} !"
 
         if objet.valeur == -1:
             # Potion Max : restaure tout
@@ -169,57 +178,59 @@ class Inventaire:
             pokemon.pv = min(pokemon.pv_max, pokemon.pv + objet.valeur)
             gain = pokemon.pv - pv_avant
 
+        if silencieux:
+            return True, None
         return True, f"{pokemon.nom} recupere {gain} PV ! ({pokemon.pv}/{pokemon.pv_max})"
 
-    def utiliser_soin_statut(self, objet, pokemon):
+    def utiliser_soin_statut(self, objet, pokemon, silencieux=False):
         """
         Utilise un soin de statut sur un Pokemon.
-        Retourne (succes: bool, message: str).
+        Retourne (succes: bool, message: str, ou None si silencieux).
         """
         if objet.categorie != "soin_statut":
             return False, "Cet objet ne soigne pas les statuts."
 
         if pokemon.est_ko():
-            return False, f"{pokemon.nom} est KO !"
+            return False, None if silencieux else f"{pokemon.nom} est KO !"
 
         statut_cible = objet.condition.get("statut") if objet.condition else None
 
         if statut_cible == "tous":
             if pokemon.statut.statut_principal is None and not pokemon.statut.confusion:
-                return False, f"{pokemon.nom} n'a aucune alteration."
+                return False, None if silencieux else f"{pokemon.nom} n'a aucune alteration."
             if not self.retirer(objet.nom):
-                return False, f"Vous n'avez plus de {objet.nom} !"
+                return False, None if silencieux else f"Vous n'avez plus de {objet.nom} !"
             pokemon.statut.retirer_tout()
-            return True, f"{pokemon.nom} est completement soigne !"
+            return True, None if silencieux else f"{pokemon.nom} est completement soigne !"
 
         if statut_cible and pokemon.statut.statut_principal != statut_cible:
-            return False, f"{pokemon.nom} n'est pas affecte par ce statut."
+            return False, None if silencieux else f"{pokemon.nom} n'est pas affecte par ce statut."
 
         if not self.retirer(objet.nom):
-            return False, f"Vous n'avez plus de {objet.nom} !"
+            return False, None if silencieux else f"Vous n'avez plus de {objet.nom} !"
 
         pokemon.statut.retirer_statut_principal()
-        return True, f"{pokemon.nom} est soigne !"
+        return True, None if silencieux else f"{pokemon.nom} est soigne !"
 
-    def utiliser_rappel(self, objet, pokemon):
+    def utiliser_rappel(self, objet, pokemon, silencieux=False):
         """
         Utilise un Rappel sur un Pokemon KO.
-        Retourne (succes: bool, message: str).
+        Retourne (succes: bool, message: str, ou None si silencieux).
         """
         if objet.categorie != "revive":
             return False, "Cet objet n'est pas un Rappel."
 
         if not pokemon.est_ko():
-            return False, f"{pokemon.nom} n'est pas KO !"
+            return False, None if silencieux else f"{pokemon.nom} n'est pas KO !"
 
         if not self.retirer(objet.nom):
-            return False, f"Vous n'avez plus de {objet.nom} !"
+            return False, None if silencieux else f"Vous n'avez plus de {objet.nom} !"
 
         pv_restaures = max(1, int(pokemon.pv_max * objet.valeur))
         pokemon.pv = pv_restaures
         pokemon.statut.retirer_tout()
 
-        return True, f"{pokemon.nom} est ranime avec {pv_restaures} PV !"
+        return True, None if silencieux else f"{pokemon.nom} est ranime avec {pv_restaures} PV !"
 
     def get_multiplicateur_ball(self, ball, types_pokemon=None, tour_combat=1, contexte=None):
         """
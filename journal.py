@@ -0,0 +1,133 @@
+"""
+Module Journal - Journal de combat structure et borne.
+Les evenements sont stockes sous forme de tuples dans un tampon circulaire
+de capacite fixe ; le texte n'est construit qu'a l'affichage.
+"""
+
+from collections import deque
+
+from capture import Capture
+from type_chart import TypeChart
+
+
+class JournalCombat:
+    """
+    Flux d'evenements types d'un combat.
+    Chaque evenement est un tuple (type, tour, acteur, cible, valeur) ;
+    acteur et cible sont des noms de Pokemon (ou None).
+    Iterer sur le journal donne les messages rendus en texte.
+    """
+
+    # Types d'evenements
+    DEBUT_TOUR = "debut_tour"
+    RATE = "rate"
+    ETAT = "etat"                    # valeur = message de Statut.peut_agir
+    CONFUSION = "confusion"          # valeur = degats subis
+    CRITIQUE = "critique"
+    EFFICACITE = "efficacite"        # valeur = multiplicateur
+    DEGATS = "degats"                # valeur = degats infliges a la cible
+    KO = "ko"
+    DEGATS_STATUT = "degats_statut"  # valeur = (statut, degats)
+    KO_STATUT = "ko_statut"
+    PV = "pv"                        # valeur = (pv, pv_max)
+    CAPTURE = "capture"              # acteur = ball, valeur = (capture, nb_secousses, master_ball)
+    OBJET = "objet"                  # acteur = objet, valeur = message de l'inventaire
+    XP = "xp"                        # valeur = (xp gagnee, nouveau niveau ou None,
+                                     #           evolution possible ou None)
+    FUITE = "fuite"
+
+    CAPACITE_DEFAUT = 256
+
+    def __init__(self, capacite=CAPACITE_DEFAUT):
+        """
+        Args:
+            capacite: nombre maximal d'evenements conserves (les plus anciens
+                      sont ecrases). 0 desactive le journal.
+        """
+        self.capacite = capacite
+        self._evenements = deque(maxlen=capacite)
+
+    def ajouter(self, type_evenement, tour, acteur=None, cible=None, valeur=None):
+        """Enregistre un evenement."""
+        self._evenements.append((type_evenement, tour, acteur, cible, valeur))
+
+    def evenements(self, type_evenement=None):
+        """Retourne les evenements bruts (eventuellement filtres par type)."""
+        if type_evenement is None:
+            return list(self._evenements)
+        return [e for e in self._evenements if e[0] == type_evenement]
+
+    def tronquer(self, tour):
+        """Efface les evenements des tours posterieurs a `tour`."""
+        evenements = self._evenements
+        while evenements and evenements[-1][1] > tour:
+            evenements.pop()
+
+    def vider(self):
+        """Efface tous les evenements."""
+        self._evenements.clear()
+
+    @classmethod
+    def rendre(cls, evenement):
+        """
+        Construit le texte d'un evenement : les memes lignes que les messages
+        retournes par le combat pour cet evenement (les messages sans
+        evenement, comme "contre-attaque !", ne sont pas journalises).
+        """
+        type_evenement, tour, acteur, cible, valeur = evenement
+
+        if type_evenement == cls.DEBUT_TOUR:
+            return f"\n{'='*40}\nTour {tour}\n{'='*40}"
+        if type_evenement == cls.RATE:
+            return f"{acteur} rate son attaque !"
+        if type_evenement == cls.ETAT:
+            return valeur
+        if type_evenement == cls.CONFUSION:
+            return f"{acteur} se blesse dans sa confusion ! (-{valeur} PV)"
+        if type_evenement == cls.CRITIQUE:
+            return "Coup critique !"
+        if type_evenement == cls.EFFICACITE:
+            return TypeChart.get_message_efficacite(valeur)
+        if type_evenement == cls.DEGATS:
+            return f"{acteur} inflige {valeur} degats a {cible} !"
+        if type_evenement == cls.KO:
+            return f"{cible} est KO !"
+        if type_evenement == cls.DEGATS_STATUT:
+            statut, degats = valeur
+            if statut == "poison":
+                return f"Le Pokemon souffre du poison ! (-{degats} PV)"
+            return f"Le Pokemon souffre de sa brulure ! (-{degats} PV)"
+        if type_evenement == cls.KO_STATUT:
+            return f"{acteur} est KO a cause de son statut !"
+        if type_evenement == cls.PV:
+            return f"{acteur}: {valeur[0]}/{valeur[1]} PV"
+        if type_evenement == cls.CAPTURE:
+            return "\n".join(Capture.messages(cible, acteur, *valeur))
+        if type_evenement == cls.OBJET:
+            return valeur
+        if type_evenement == cls.XP:
+            montant, niveau, evolution = valeur
+            texte = f"{acteur} gagne {montant} points d'experience !"
+            if niveau is not None:
+                texte += f"\n{acteur} monte au niveau {niveau} !"
+            if evolution is not None:
+                texte += f"\n{acteur} peut evoluer en {evolution} !"
+            return texte
+        if type_evenement == cls.FUITE:
+            return "Vous avez fui le combat !"
+        return str(valeur)
+
+    def __iter__(self):
+        for evenement in tuple(self._evenements):
+            yield self.rendre(evenement)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.rendre(evenement) for evenement in list(self._evenements)[index]]
+        return self.rendre(self._evenements[index])
+
+    def __len__(self):
+        return len(self._evenements)
+
+    def __str__(self):
+        return "\n".join(self)
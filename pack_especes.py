@@ -0,0 +1,214 @@
+"""
+Module PackEspeces - Version binaire compilee de pokemon.json, chargee par mmap.
+Enregistrements de taille fixe (colonnes numeriques) suivis d'une table de
+chaines UTF-8 pour les noms. Les processus qui ouvrent le meme pack partagent
+les memes pages memoire ; les especes sont decodees a la demande.
+pokemon.json reste la source de verite : le pack est recompile des que le
+JSON change (date de modification ou taille).
+"""
+
+import mmap
+import os
+import struct
+
+from catalogue import Catalogue
+from type_chart import TypeChart
+
+
+MAGIC = b"PKPK"
+VERSION = 1
+
+# magic, version, nb_especes, mtime_ns du JSON, taille du JSON
+ENTETE = struct.Struct("<4sHIqq")
+
+# numero, 6 stats, base_xp, taux_capture, type1, type2, evolution_id,
+# evolution_niveau, (offset, longueur) du nom, (offset, longueur) du nom d'evolution
+# 0 = absent pour evolution_id / evolution_niveau, -1 = absent pour les types
+ENREGISTREMENT = struct.Struct("<H6HHHbbHBIBIB")
+
+STATS = ("pv", "attaque", "defense", "attaque_speciale", "defense_speciale", "vitesse")
+
+
+def chemin_pack_par_defaut(chemin_json):
+    """Retourne le chemin du pack associe a un fichier JSON (meme nom, .pack)."""
+    return os.path.splitext(chemin_json)[0] + ".pack"
+
+
+def compiler_pack(chemin_json, chemin_pack=None):
+    """
+    Compile pokemon.json en pack binaire.
+    Le fichier est ecrit a cote puis renomme : un lecteur ne voit jamais
+    un pack a moitie ecrit.
+    """
+    if chemin_pack is None:
+        chemin_pack = chemin_pack_par_defaut(chemin_json)
+    infos = os.stat(chemin_json)
+    especes = sorted(Catalogue.get(chemin_json).get_especes(), key=lambda d: d["numero"])
+
+    chaines = bytearray()
+    positions = {}
+
+    def ajouter_chaine(texte):
+        if texte is None:
+            return 0, 0
+        if texte not in positions:
+            brut = texte.encode("utf-8")
+            positions[texte] = (len(chaines), len(brut))
+            chaines.extend(brut)
+        return positions[texte]
+
+    enregistrements = bytearray()
+    for donnees in especes:
+        types = donnees["types"]
+        type1 = TypeChart.get_index(types[0]) if len(types) > 0 else -1
+        type2 = TypeChart.get_index(types[1]) if len(types) > 1 else -1
+        enregistrements += ENREGISTREMENT.pack(
+            donnees["numero"],
+            *(donnees[s] for s in STATS),
+            donnees.get("base_xp", 64),
+            donnees.get("taux_capture", 45),
+            type1,
+            type2,
+            donnees.get("evolution_id") or 0,
+            donnees.get("evolution_niveau") or 0,
+            *ajouter_chaine(donnees["nom"]),
+            *ajouter_chaine(donnees.get("evolution_nom")),
+        )
+
+    entete = ENTETE.pack(MAGIC, VERSION, len(especes), infos.st_mtime_ns, infos.st_size)
+    chemin_tmp = f"{chemin_pack}.{os.getpid()}.tmp"
+    with open(chemin_tmp, "wb") as f:
+        f.write(entete)
+        f.write(enregistrements)
+        f.write(chaines)
+    os.replace(chemin_tmp, chemin_pack)
+    return chemin_pack
+
+
+class PackEspeces:
+    """Lecteur d'un pack binaire d'especes, projete en memoire (mmap)."""
+
+    def __init__(self, chemin_pack):
+        with open(chemin_pack, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, nb, mtime_ns, taille = ENTETE.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{chemin_pack} n'est pas un pack d'especes valide.")
+            if ENTETE.size + nb * ENREGISTREMENT.size > len(self._mmap):
+                raise ValueError(f"{chemin_pack} est tronque ({nb} especes annoncees).")
+        except struct.error as erreur:
+            self._mmap.close()
+            raise ValueError(f"{chemin_pack} n'est pas un pack d'especes valide.") from erreur
+        except BaseException:
+            self._mmap.close()
+            raise
+        self._nb = nb
+        self.signature_json = (mtime_ns, taille)
+        self._debut_chaines = ENTETE.size + nb * ENREGISTREMENT.size
+
+    @classmethod
+    def ouvrir(cls, chemin_json=None, chemin_pack=None):
+        """
+        Ouvre le pack associe a pokemon.json, en le (re)compilant s'il est
+        absent ou si le JSON a change depuis sa compilation.
+        """
+        if chemin_json is None:
+            chemin_json = os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), "data", "pokemon.json"
+            )
+        if chemin_pack is None:
+            chemin_pack = chemin_pack_par_defaut(chemin_json)
+
+        infos = os.stat(chemin_json)
+        signature = (infos.st_mtime_ns, infos.st_size)
+        if os.path.exists(chemin_pack):
+            try:
+                pack = cls(chemin_pack)
+                if pack.signature_json == signature:
+                    return pack
+                pack.fermer()
+            except ValueError:
+                pass
+        compiler_pack(chemin_json, chemin_pack)
+        return cls(chemin_pack)
+
+    def _chaine(self, offset, longueur):
+        if longueur == 0:
+            return None
+        debut = self._debut_chaines + offset
+        return self._mmap[debut:debut + longueur].decode("utf-8")
+
+    def _numero(self, index):
+        return struct.unpack_from("<H", self._mmap, ENTETE.size + index * ENREGISTREMENT.size)[0]
+
+    def __len__(self):
+        return self._nb
+
+    def __getitem__(self, index):
+        """Decode l'espece a la position `index` en dict (format pokemon.json)."""
+        if index < 0:
+            index += self._nb
+        if not 0 <= index < self._nb:
+            raise IndexError(index)
+        champs = ENREGISTREMENT.unpack_from(self._mmap, ENTETE.size + index * ENREGISTREMENT.size)
+        (numero, pv, attaque, defense, attaque_speciale, defense_speciale, vitesse,
+         base_xp, taux_capture, type1, type2, evolution_id, evolution_niveau,
+         nom_offset, nom_longueur, evo_offset, evo_longueur) = champs
+        types = [TypeChart.TYPES[t] for t in (type1, type2) if t >= 0]
+        return {
+            "numero": numero,
+            "nom": self._chaine(nom_offset, nom_longueur),
+            "types": types,
+            "pv": pv,
+            "attaque": attaque,
+            "defense": defense,
+            "attaque_speciale": attaque_speciale,
+            "defense_speciale": defense_speciale,
+            "vitesse": vitesse,
+            "base_xp": base_xp,
+            "taux_capture": taux_capture,
+            "evolution_id": evolution_id or None,
+            "evolution_niveau": evolution_niveau or None,
+            "evolution_nom": self._chaine(evo_offset, evo_longueur),
+        }
+
+    def __iter__(self):
+        for index in range(self._nb):
+            yield self[index]
+
+    def get_par_numero(self, numero):
+        """Recherche dichotomique d'une espece par numero (enregistrements tries)."""
+        bas, haut = 0, self._nb - 1
+        while bas <= haut:
+            milieu = (bas + haut) // 2
+            courant = self._numero(milieu)
+            if courant == numero:
+                return self[milieu]
+            if courant < numero:
+                bas = milieu + 1
+            else:
+                haut = milieu - 1
+        return None
+
+    def fermer(self):
+        """Libere la projection memoire."""
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python pack_especes.py [pokemon.json] : compile le pack (sinon fait a la premiere ouverture)
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "data", "pokemon.json"
+    )
+    chemin = compiler_pack(source)
+    with PackEspeces(chemin) as pack:
+        print(f"{chemin} : {len(pack)} especes, {os.path.getsize(chemin)} octets")
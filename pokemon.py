@@ -3,22 +3,39 @@ Module Pokemon - Classe de base pour tous les Pokemon.
 Gere les stats, statuts, XP, evolution et interactions de combat.
 """
 
-import json
-import os
 import random
+from collections import namedtuple
 
+from calcul_degats import CalculDegats
+from catalogue import Catalogue
 from statut import Statut
 from experience import Experience
+from registre import RegistreEspeces
 from type_chart import TypeChart
 
 
+# Instantane de l'etat mutable d'un Pokemon (voir Pokemon.capturer_etat)
+EtatPokemon = namedtuple("EtatPokemon", [
+    "pv", "pv_max", "attaque", "defense", "attaque_speciale", "defense_speciale",
+    "vitesse", "niveau", "xp",
+    "statut_principal", "tours_restants", "confusion", "tours_confusion",
+])
+
+
+# Issue d'une attaque (voir Pokemon.resoudre_attaque)
+ResultatAttaque = namedtuple("ResultatAttaque", [
+    "a_agi", "degats", "critique", "multiplicateur", "msg_statut", "degats_confusion",
+])
+
+
 class Pokemon:
     """Represente un Pokemon avec toutes ses caracteristiques."""
 
     def __init__(self, numero, nom, types, pv, attaque, defense,
                  attaque_speciale, defense_speciale, vitesse,
                  niveau=5, base_xp=64, taux_capture=45,
-                 evolution_id=None, evolution_niveau=None, evolution_nom=None):
+                 evolution_id=None, evolution_niveau=None, evolution_nom=None,
+                 id_registre=None, registre=None):
         # Identite
         self.numero = numero
         self.nom = nom
@@ -34,16 +51,19 @@ class Pokemon:
             "vitesse": vitesse,
         }
 
+        # Identifiant dans le RegistreEspeces (stats lues dans la table precalculee)
+        # et registre de cet identifiant (defaut : registre partage actuel)
+        self._id_registre = id_registre
+        if id_registre is not None and registre is None:
+            registre = RegistreEspeces.par_defaut()
+        self._registre = registre if id_registre is not None else None
+
         # Stats actuelles (calculees en fonction du niveau)
         self.niveau = niveau
-        stats = Experience.calculer_nouvelles_stats(self._stats_base, 1, niveau)
-        self.pv_max = stats["pv"]
+        self.pv_max = 0
+        self.pv = 0
+        self._recalculer_stats()
         self.pv = self.pv_max
-        self.attaque = stats["attaque"]
-        self.defense = stats["defense"]
-        self.attaque_speciale = stats["attaque_speciale"]
-        self.defense_speciale = stats["defense_speciale"]
-        self.vitesse = stats["vitesse"]
 
         # Experience
         self.base_xp = base_xp
@@ -60,26 +80,23 @@ class Pokemon:
         # Statut
         self.statut = Statut()
 
-    def attaquer(self, adversaire, est_special=False):
+    def resoudre_attaque(self, adversaire, est_special=False, rng=random):
         """
-        Attaque un adversaire.
-        Retourne (degats: int, messages: list[str]).
+        Resout une attaque contre un adversaire sans construire de message.
+        `rng` : source des tirages (module random par defaut, ou FluxAleatoire).
+        Retourne un ResultatAttaque (a_agi, degats, critique, multiplicateur,
+        msg_statut, degats_confusion).
         """
-        messages = []
-
         # Verifier si le Pokemon peut agir (statuts)
-        peut_agir, msg_statut = self.statut.peut_agir()
-        if msg_statut:
-            messages.append(msg_statut)
+        peut_agir, msg_statut = self.statut.peut_agir(rng)
 
         if not peut_agir:
             if msg_statut == "CONFUSION":
                 # Le Pokemon se frappe lui-meme
                 degats_confusion = max(1, self.attaque // 4)
                 self.subir_degats(degats_confusion)
-                messages.append(f"{self.nom} se blesse dans sa confusion ! (-{degats_confusion} PV)")
-                return 0, messages
-            return 0, messages
+                return ResultatAttaque(False, 0, False, 1.0, msg_statut, degats_confusion)
+            return ResultatAttaque(False, 0, False, 1.0, msg_statut, 0)
 
         # Calcul des degats
         if est_special:
@@ -94,12 +111,8 @@ class Pokemon:
             att_stat = int(att_stat * self.statut.get_modificateur_attaque())
 
         # Multiplicateur de type (STAB + efficacite)
-        mult_type = 1.0
-        for type_att in self.types:
-            m = TypeChart.get_multiplicateur(type_att, adversaire.types)
-            if m != 1.0:
-                mult_type = m
-                break  # On prend le premier type qui a un effet
+        # On prend le premier type qui a un effet (table precompilee)
+        mult_type = TypeChart.get_multiplicateur_attaque(self.types, adversaire.types)
 
         # STAB (Same Type Attack Bonus)
         stab = 1.0
@@ -108,15 +121,11 @@ class Pokemon:
         stab = 1.5  # On applique le STAB par defaut (l'attaque est du type du Pokemon)
 
         # Coup critique (4.17% de chance)
-        critique = False
-        if random.random() < (1 / 24):
-            critique = True
-            messages.append("Coup critique !")
-
+        critique = rng.random() < (1 / 24)
         mult_critique = 1.5 if critique else 1.0
 
-        # Random factor (0.85 - 1.0)
-        random_factor = random.uniform(0.85, 1.0)
+        # Random factor (0.85 - 1.0), meme calcul que random.uniform(0.85, 1.0)
+        random_factor = 0.85 + (1.0 - 0.85) * rng.random()
 
         # Formule de degats
         puissance = 80  # Puissance de base d'une attaque standard
@@ -125,19 +134,54 @@ class Pokemon:
 
         degats = max(1, int(degats_bruts))
 
+        # Appliquer les degats
+        adversaire.subir_degats(degats)
+
+        return ResultatAttaque(True, degats, critique, mult_type, msg_statut, 0)
+
+    def attaquer(self, adversaire, est_special=False, rng=random):
+        """
+        Attaque un adversaire.
+        Retourne (degats: int, messages: list[str]).
+        """
+        resultat = self.resoudre_attaque(adversaire, est_special, rng)
+        return resultat.degats, self.decrire_attaque(resultat, adversaire)
+
+    def distribution_degats(self, adversaire):
+        """
+        Distribution exacte des degats d'un tour d'attaque contre `adversaire`
+        (attaque ratee, critique, brulure et facteur aleatoire compris).
+        Retourne un tuple de (degats, probabilite), voir CalculDegats.
+        """
+        return CalculDegats.distribution_attaque(self, adversaire)
+
+    def decrire_attaque(self, resultat, adversaire):
+        """Construit les messages d'un ResultatAttaque."""
+        messages = []
+        if resultat.msg_statut:
+            messages.append(resultat.msg_statut)
+
+        if not resultat.a_agi:
+            if resultat.degats_confusion:
+                messages.append(
+                    f"{self.nom} se blesse dans sa confusion ! (-{resultat.degats_confusion} PV)"
+                )
+            return messages
+
+        if resultat.critique:
+            messages.append("Coup critique !")
+
         # Message d'efficacite
-        msg_eff = TypeChart.get_message_efficacite(mult_type)
+        msg_eff = TypeChart.get_message_efficacite(resultat.multiplicateur)
         if msg_eff:
             messages.append(msg_eff)
 
-        # Appliquer les degats
-        adversaire.subir_degats(degats)
-        messages.append(f"{self.nom} inflige {degats} degats a {adversaire.nom} !")
+        messages.append(f"{self.nom} inflige {resultat.degats} degats a {adversaire.nom} !")
 
         if adversaire.est_ko():
             messages.append(f"{adversaire.nom} est KO !")
 
-        return degats, messages
+        return messages
 
     def subir_degats(self, degats):
         """Reduit les PV du Pokemon."""
@@ -155,21 +199,27 @@ class Pokemon:
         """Retourne la vitesse effective (avec modificateur de paralysie)."""
         return int(self.vitesse * self.statut.get_modificateur_vitesse())
 
-    def gagner_xp(self, montant):
+    def ajouter_xp(self, montant):
         """
-        Ajoute de l'XP et gere les montees de niveau.
-        Retourne une liste de messages.
+        Ajoute de l'XP et gere les montees de niveau, sans message.
+        Retourne le nombre de niveaux gagnes.
         """
-        messages = []
         self.xp += montant
-        messages.append(f"{self.nom} gagne {montant} points d'experience !")
-
         ancien_niveau = self.niveau
         nouveau_niveau = Experience.calculer_niveaux_gagnes(self.xp, self.niveau)
-
         if nouveau_niveau > ancien_niveau:
             self.niveau = nouveau_niveau
             self._recalculer_stats()
+        return nouveau_niveau - ancien_niveau
+
+    def gagner_xp(self, montant):
+        """
+        Ajoute de l'XP et gere les montees de niveau.
+        Retourne une liste de messages.
+        """
+        messages = [f"{self.nom} gagne {montant} points d'experience !"]
+
+        if self.ajouter_xp(montant) > 0:
             messages.append(f"{self.nom} monte au niveau {self.niveau} !")
 
             # Verifier evolution
@@ -180,14 +230,21 @@ class Pokemon:
 
     def _recalculer_stats(self):
         """Recalcule les stats en fonction du niveau actuel."""
-        stats = Experience.calculer_nouvelles_stats(self._stats_base, 1, self.niveau)
         ancien_pv_max = self.pv_max
-        self.pv_max = stats["pv"]
-        self.attaque = stats["attaque"]
-        self.defense = stats["defense"]
-        self.attaque_speciale = stats["attaque_speciale"]
-        self.defense_speciale = stats["defense_speciale"]
-        self.vitesse = stats["vitesse"]
+        if self._id_registre is not None and 1 <= self.niveau <= Experience.NIVEAU_MAX:
+            # Lecture directe dans la table du registre
+            (self.pv_max, self.attaque, self.defense, self.attaque_speciale,
+             self.defense_speciale, self.vitesse) = self._registre.get_stats(
+                self._id_registre, self.niveau
+            )
+        else:
+            stats = Experience.calculer_nouvelles_stats(self._stats_base, 1, self.niveau)
+            self.pv_max = stats["pv"]
+            self.attaque = stats["attaque"]
+            self.defense = stats["defense"]
+            self.attaque_speciale = stats["attaque_speciale"]
+            self.defense_speciale = stats["defense_speciale"]
+            self.vitesse = stats["vitesse"]
         # Ajuster les PV actuels proportionnellement
         self.pv = min(self.pv_max, self.pv + (self.pv_max - ancien_pv_max))
 
@@ -199,21 +256,45 @@ class Pokemon:
             return self.niveau >= self.evolution_niveau
         return False
 
-    def evoluer(self, donnees_pokemon):
+    def evoluer(self, donnees_pokemon=None):
         """
         Fait evoluer le Pokemon.
 
         Args:
-            donnees_pokemon: dict des donnees du Pokemon evolue (depuis pokemon.json)
+            donnees_pokemon: dict des donnees du Pokemon evolue (depuis pokemon.json).
+                Si None, l'espece cible est resolue via evolution_id dans le
+                RegistreEspeces (sans parcourir le catalogue).
 
         Retourne (succes: bool, message: str).
         """
         if not self.peut_evoluer():
             return False, f"{self.nom} ne peut pas evoluer."
 
+        id_registre = registre = None
+        if donnees_pokemon is None:
+            registre = RegistreEspeces.par_defaut()
+            id_registre = registre.get_id(self.evolution_id)
+            if id_registre < 0:
+                return False, f"{self.nom} ne peut pas evoluer."
+            donnees_pokemon = registre.get_donnees(id_registre)
+
         ancien_nom = self.nom
 
         # Mettre a jour les infos
+        self._appliquer_espece(donnees_pokemon)
+        self._id_registre = id_registre
+        self._registre = registre
+
+        # Recalculer les stats
+        self._recalculer_stats()
+        self.pv = self.pv_max  # Full PV apres evolution
+
+        return True, f"{ancien_nom} evolue en {self.nom} !"
+
+    def _appliquer_espece(self, donnees_pokemon):
+        """Remplace les donnees d'espece (identite, types, stats de base...)."""
+        self._id_registre = None
+        self._registre = None
         self.numero = donnees_pokemon["numero"]
         self.nom = donnees_pokemon["nom"]
         self.types = donnees_pokemon["types"]
@@ -231,11 +312,27 @@ class Pokemon:
         self.evolution_niveau = donnees_pokemon.get("evolution_niveau")
         self.evolution_nom = donnees_pokemon.get("evolution_nom")
 
-        # Recalculer les stats
-        self._recalculer_stats()
-        self.pv = self.pv_max  # Full PV apres evolution
+    def capturer_etat(self):
+        """
+        Capture l'etat mutable du Pokemon (PV, stats, niveau, XP, statut)
+        dans un EtatPokemon immuable, pour explorer des variantes d'un combat.
+        """
+        statut = self.statut
+        return EtatPokemon(
+            self.pv, self.pv_max, self.attaque, self.defense,
+            self.attaque_speciale, self.defense_speciale, self.vitesse,
+            self.niveau, self.xp,
+            statut.statut_principal, statut.tours_restants,
+            statut.confusion, statut.tours_confusion,
+        )
 
-        return True, f"{ancien_nom} evolue en {self.nom} !"
+    def restaurer_etat(self, etat):
+        """Restaure en place (sans creer d'objet) un etat de capturer_etat()."""
+        (self.pv, self.pv_max, self.attaque, self.defense,
+         self.attaque_speciale, self.defense_speciale, self.vitesse,
+         self.niveau, self.xp,
+         self.statut.statut_principal, self.statut.tours_restants,
+         self.statut.confusion, self.statut.tours_confusion) = etat
 
     def get_pourcentage_pv(self):
         """Retourne le pourcentage de PV restants."""
@@ -278,9 +375,16 @@ class Pokemon:
     @staticmethod
     def depuis_json(donnees, niveau=None):
         """
-        Cree un Pokemon depuis un dictionnaire JSON (pokemon.json).
+        Cree un Pokemon depuis un dictionnaire JSON (pokemon.json),
+        ou depuis un identifiant du RegistreEspeces (int) : les stats sont
+        alors lues dans la table precalculee.
         """
         niv = niveau if niveau else random.randint(3, 10)
+        id_registre = registre = None
+        if isinstance(donnees, int):
+            id_registre = donnees
+            registre = RegistreEspeces.par_defaut()
+            donnees = registre.get_donnees(id_registre)
         return Pokemon(
             numero=donnees["numero"],
             nom=donnees["nom"],
@@ -297,15 +401,18 @@ class Pokemon:
             evolution_id=donnees.get("evolution_id"),
             evolution_niveau=donnees.get("evolution_niveau"),
             evolution_nom=donnees.get("evolution_nom"),
+            id_registre=id_registre,
+            registre=registre,
         )
 
     @staticmethod
     def charger_tous(chemin_json=None):
-        """Charge tous les Pokemon depuis le fichier pokemon.json."""
-        if chemin_json is None:
-            chemin_json = os.path.join(
-                os.path.dirname(os.path.abspath(__file__)), "data", "pokemon.json"
-            )
-        with open(chemin_json, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data["pokemons"]
+        """
+        Charge tous les Pokemon depuis le fichier pokemon.json.
+        Le fichier n'est relu que s'il a change (voir Catalogue). Retourne des
+        copies : les modifier ne touche pas le Catalogue partage.
+        """
+        return [
+            dict(espece, types=list(espece["types"]))
+            for espece in Catalogue.get(chemin_json).get_especes()
+        ]
@@ -0,0 +1,203 @@
+"""
+Module PokemonCompact - Variante compacte de Pokemon pour les simulations massives.
+Pas de __dict__ par instance : attributs en __slots__, stats de base et types
+stockes dans des tuples partages entre toutes les instances d'une meme espece.
+"""
+
+import random
+import tracemalloc
+
+from experience import Experience
+from pokemon import Pokemon
+from registre import RegistreEspeces
+from statut import Statut
+
+
+# Ordre des stats dans les tuples de stats de base
+STATS = ("pv", "attaque", "defense", "attaque_speciale", "defense_speciale", "vitesse")
+
+# Tuples partages : une seule instance par combinaison de types / de stats de base
+_TYPES_INTERNES = {}
+_STATS_INTERNES = {}
+
+
+def interner_types(types):
+    """Retourne le tuple de types partage correspondant a `types`."""
+    cle = tuple(types) if not isinstance(types, str) else (types,)
+    return _TYPES_INTERNES.setdefault(cle, cle)
+
+
+def interner_stats(stats_base):
+    """Retourne le tuple de stats de base partage (ordre de STATS)."""
+    return _STATS_INTERNES.setdefault(stats_base, stats_base)
+
+
+class PokemonCompact:
+    """
+    Meme API publique que Pokemon (attributs, combat, XP, evolution, to_dict),
+    avec une empreinte memoire reduite. `types` est un tuple partage.
+    """
+
+    __slots__ = (
+        "numero", "nom", "types", "_stats_base",
+        "niveau", "pv_max", "pv", "attaque", "defense",
+        "attaque_speciale", "defense_speciale", "vitesse",
+        "base_xp", "xp", "taux_capture",
+        "evolution_id", "evolution_niveau", "evolution_nom",
+        "statut", "_id_registre", "_registre",
+    )
+
+    def __init__(self, numero, nom, types, pv, attaque, defense,
+                 attaque_speciale, defense_speciale, vitesse,
+                 niveau=5, base_xp=64, taux_capture=45,
+                 evolution_id=None, evolution_niveau=None, evolution_nom=None,
+                 id_registre=None, registre=None):
+        # Identite
+        self.numero = numero
+        self.nom = nom
+        self.types = interner_types(types)
+
+        # Stats de base partagees par espece
+        self._stats_base = interner_stats(
+            (pv, attaque, defense, attaque_speciale, defense_speciale, vitesse)
+        )
+
+        # Identifiant dans le RegistreEspeces (stats lues dans la table precalculee)
+        # et registre de cet identifiant (defaut : registre partage actuel)
+        self._id_registre = id_registre
+        if id_registre is not None and registre is None:
+            registre = RegistreEspeces.par_defaut()
+        self._registre = registre if id_registre is not None else None
+
+        # Stats actuelles
+        self.niveau = niveau
+        self.pv_max = 0
+        self.pv = 0
+        self._recalculer_stats()
+        self.pv = self.pv_max
+
+        # Experience
+        self.base_xp = base_xp
+        self.xp = Experience.xp_pour_niveau(niveau)
+
+        # Capture
+        self.taux_capture = taux_capture
+
+        # Evolution
+        self.evolution_id = evolution_id
+        self.evolution_niveau = evolution_niveau
+        self.evolution_nom = evolution_nom
+
+        # Statut
+        self.statut = Statut()
+
+    # Comportement identique a Pokemon (les methodes ne dependent que des attributs)
+    resoudre_attaque = Pokemon.resoudre_attaque
+    attaquer = Pokemon.attaquer
+    decrire_attaque = Pokemon.decrire_attaque
+    distribution_degats = Pokemon.distribution_degats
+    subir_degats = Pokemon.subir_degats
+    soigner = Pokemon.soigner
+    est_ko = Pokemon.est_ko
+    get_vitesse_effective = Pokemon.get_vitesse_effective
+    ajouter_xp = Pokemon.ajouter_xp
+    gagner_xp = Pokemon.gagner_xp
+    peut_evoluer = Pokemon.peut_evoluer
+    evoluer = Pokemon.evoluer
+    get_pourcentage_pv = Pokemon.get_pourcentage_pv
+    capturer_etat = Pokemon.capturer_etat
+    restaurer_etat = Pokemon.restaurer_etat
+    __str__ = Pokemon.__str__
+
+    def _recalculer_stats(self):
+        """Recalcule les stats en fonction du niveau actuel."""
+        ancien_pv_max = self.pv_max
+        if self._id_registre is not None and 1 <= self.niveau <= Experience.NIVEAU_MAX:
+            stats = self._registre.get_stats(self._id_registre, self.niveau)
+        else:
+            stats = Experience.calculer_nouvelles_stats(
+                dict(zip(STATS, self._stats_base)), 1, self.niveau
+            )
+            stats = tuple(stats[s] for s in STATS)
+        (self.pv_max, self.attaque, self.defense, self.attaque_speciale,
+         self.defense_speciale, self.vitesse) = stats
+        # Ajuster les PV actuels proportionnellement
+        self.pv = min(self.pv_max, self.pv + (self.pv_max - ancien_pv_max))
+
+    def _appliquer_espece(self, donnees_pokemon):
+        """Remplace les donnees d'espece (identite, types, stats de base...)."""
+        self._id_registre = None
+        self._registre = None
+        self.numero = donnees_pokemon["numero"]
+        self.nom = donnees_pokemon["nom"]
+        self.types = interner_types(donnees_pokemon["types"])
+        self._stats_base = interner_stats(tuple(donnees_pokemon[s] for s in STATS))
+        self.base_xp = donnees_pokemon["base_xp"]
+        self.taux_capture = donnees_pokemon["taux_capture"]
+        self.evolution_id = donnees_pokemon.get("evolution_id")
+        self.evolution_niveau = donnees_pokemon.get("evolution_niveau")
+        self.evolution_nom = donnees_pokemon.get("evolution_nom")
+
+    def to_dict(self):
+        """Convertit le Pokemon en dictionnaire (meme format que Pokemon.to_dict)."""
+        donnees = Pokemon.to_dict(self)
+        donnees["types"] = list(self.types)
+        return donnees
+
+    @staticmethod
+    def depuis_json(donnees, niveau=None):
+        """
+        Cree un PokemonCompact depuis un dictionnaire JSON (pokemon.json)
+        ou depuis un identifiant du RegistreEspeces (int).
+        """
+        niv = niveau if niveau else random.randint(3, 10)
+        id_registre = registre = None
+        if isinstance(donnees, int):
+            id_registre = donnees
+            registre = RegistreEspeces.par_defaut()
+            donnees = registre.get_donnees(id_registre)
+        return PokemonCompact(
+            numero=donnees["numero"],
+            nom=donnees["nom"],
+            types=donnees["types"],
+            pv=donnees["pv"],
+            attaque=donnees["attaque"],
+            defense=donnees["defense"],
+            attaque_speciale=donnees["attaque_speciale"],
+            defense_speciale=donnees["defense_speciale"],
+            vitesse=donnees["vitesse"],
+            niveau=niv,
+            base_xp=donnees.get("base_xp", 64),
+            taux_capture=donnees.get("taux_capture", 45),
+            evolution_id=donnees.get("evolution_id"),
+            evolution_niveau=donnees.get("evolution_niveau"),
+            evolution_nom=donnees.get("evolution_nom"),
+            id_registre=id_registre,
+            registre=registre,
+        )
+
+
+def mesurer_octets_par_instance(classe, especes, nb_instances=10000):
+    """
+    Mesure (tracemalloc) la memoire allouee par instance de `classe`
+    (Pokemon ou PokemonCompact), especes parcourues en boucle.
+    """
+    tracemalloc.start()
+    try:
+        avant = tracemalloc.get_traced_memory()[0]
+        instances = [
+            classe.depuis_json(especes[i % len(especes)], niveau=50)
+            for i in range(nb_instances)
+        ]
+        apres = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    # Le tableau `instances` lui-meme coute 8 octets par element
+    return (apres - avant) / len(instances) - 8
+
+
+if __name__ == "__main__":
+    especes = Pokemon.charger_tous()
+    for classe in (Pokemon, PokemonCompact):
+        octets = mesurer_octets_par_instance(classe, especes)
+        print(f"{classe.__name__:15s} : {octets:7.1f} octets par instance")
@@ -0,0 +1,209 @@
+"""
+Module Population - Stockage en colonnes (struct-of-arrays) de nombreux Pokemon.
+Generation de populations sauvages, montee de niveau, degats et soins
+vectorises avec NumPy. Conversion vers/depuis Pokemon pour un Combat.
+"""
+
+import numpy as np
+
+from experience import Experience
+from pokemon import Pokemon
+from statut import Statut
+from type_chart import TypeChart
+
+
+# Ordre des stats dans `stats_base` (meme ordre que les attributs de Pokemon)
+STATS = ("pv", "attaque", "defense", "attaque_speciale", "defense_speciale", "vitesse")
+
+# Code de statut : 0 = aucun, puis index (+1) dans Statut.STATUTS_PRINCIPAUX
+CODES_STATUT = {statut: i + 1 for i, statut in enumerate(Statut.STATUTS_PRINCIPAUX)}
+
+
+class PokemonArray:
+    """
+    Population de Pokemon stockee colonne par colonne (tableaux NumPy).
+
+    Colonnes : numero, niveau, pv, pv_max, attaque, defense, attaque_speciale,
+    defense_speciale, vitesse, xp, statut (code), type1/type2 (identifiants
+    TypeChart, -1 si absent) et stats_base (N, 6).
+
+    Un decoupage par tranche (pop[10:20]) renvoie une vue sans copie :
+    les modifications sont visibles dans la population d'origine.
+    """
+
+    COLONNES = (
+        ("numero", np.int16), ("niveau", np.int16),
+        ("pv", np.int32), ("pv_max", np.int32),
+        ("attaque", np.int32), ("defense", np.int32),
+        ("attaque_speciale", np.int32), ("defense_speciale", np.int32),
+        ("vitesse", np.int32), ("xp", np.int32),
+        ("statut", np.int8), ("type1", np.int8), ("type2", np.int8),
+    )
+
+    def __init__(self, taille, especes=None):
+        """
+        Cree une population vide de `taille` Pokemon.
+
+        Args:
+            taille: nombre de Pokemon
+            especes: dict {numero: donnees pokemon.json} utilise par vers_pokemon()
+        """
+        for nom, dtype in self.COLONNES:
+            setattr(self, nom, np.zeros(taille, dtype=dtype))
+        self.stats_base = np.zeros((taille, len(STATS)), dtype=np.int16)
+        self.especes = especes if especes is not None else {}
+
+    @classmethod
+    def depuis_especes(cls, especes, niveaux):
+        """
+        Genere une population depuis une liste de dicts (pokemon.json).
+
+        Args:
+            especes: liste de dicts d'especes, un par Pokemon (peut se repeter)
+            niveaux: niveau commun (int) ou tableau de niveaux
+        """
+        population = cls(len(especes))
+        for i, donnees in enumerate(especes):
+            population.numero[i] = donnees["numero"]
+            population.stats_base[i] = [donnees[s] for s in STATS]
+            population.type1[i], population.type2[i] = cls._ids_types(donnees["types"])
+            population.especes.setdefault(donnees["numero"], donnees)
+
+        population.niveau[:] = niveaux
+        population.xp[:] = population.niveau.astype(np.int32) ** 3
+        population._recalculer_stats(reinitialiser_pv=True)
+        return population
+
+    @classmethod
+    def depuis_pokemon(cls, pokemons):
+        """Construit une population depuis des objets Pokemon (ou PokemonCompact)."""
+        population = cls(len(pokemons))
+        for i, pokemon in enumerate(pokemons):
+            stats_base = pokemon._stats_base
+            if isinstance(stats_base, dict):
+                stats_base = [stats_base[s] for s in STATS]
+            population.numero[i] = pokemon.numero
+            population.niveau[i] = pokemon.niveau
+            population.pv[i] = pokemon.pv
+            population.pv_max[i] = pokemon.pv_max
+            population.attaque[i] = pokemon.attaque
+            population.defense[i] = pokemon.defense
+            population.attaque_speciale[i] = pokemon.attaque_speciale
+            population.defense_speciale[i] = pokemon.defense_speciale
+            population.vitesse[i] = pokemon.vitesse
+            population.xp[i] = pokemon.xp
+            population.statut[i] = CODES_STATUT.get(pokemon.statut.statut_principal, 0)
+            population.type1[i], population.type2[i] = cls._ids_types(pokemon.types)
+            population.stats_base[i] = stats_base
+
+            if pokemon.numero not in population.especes:
+                donnees = dict(zip(STATS, stats_base))
+                donnees.update({
+                    "numero": pokemon.numero,
+                    "nom": pokemon.nom,
+                    "types": list(pokemon.types),
+                    "base_xp": pokemon.base_xp,
+                    "taux_capture": pokemon.taux_capture,
+                    "evolution_id": pokemon.evolution_id,
+                    "evolution_niveau": pokemon.evolution_niveau,
+                    "evolution_nom": pokemon.evolution_nom,
+                })
+                population.especes[pokemon.numero] = donnees
+        return population
+
+    @staticmethod
+    def _ids_types(types):
+        """Retourne (type1, type2) sous forme d'identifiants TypeChart."""
+        type1 = TypeChart.get_index(types[0]) if len(types) > 0 else -1
+        type2 = TypeChart.get_index(types[1]) if len(types) > 1 else -1
+        return type1, type2
+
+    def vers_pokemon(self, index, classe=Pokemon):
+        """
+        Reconstruit un Pokemon individuel (par exemple pour un Combat).
+        Seul le statut principal est conserve (pas la confusion ni les compteurs).
+        """
+        donnees = self.especes[int(self.numero[index])]
+        pokemon = classe.depuis_json(donnees, niveau=int(self.niveau[index]))
+        pokemon.pv_max = int(self.pv_max[index])
+        pokemon.pv = int(self.pv[index])
+        pokemon.attaque = int(self.attaque[index])
+        pokemon.defense = int(self.defense[index])
+        pokemon.attaque_speciale = int(self.attaque_speciale[index])
+        pokemon.defense_speciale = int(self.defense_speciale[index])
+        pokemon.vitesse = int(self.vitesse[index])
+        pokemon.xp = int(self.xp[index])
+        code = int(self.statut[index])
+        if code:
+            pokemon.statut.statut_principal = Statut.STATUTS_PRINCIPAUX[code - 1]
+        return pokemon
+
+    def __len__(self):
+        return len(self.numero)
+
+    def __getitem__(self, selection):
+        """
+        Retourne une sous-population. Une tranche donne une vue sans copie,
+        un masque ou une liste d'indices donne une copie (semantique NumPy).
+        """
+        if isinstance(selection, (int, np.integer)):
+            selection = slice(selection, selection + 1 if selection != -1 else None)
+        vue = PokemonArray.__new__(PokemonArray)
+        for nom, _ in self.COLONNES:
+            setattr(vue, nom, getattr(self, nom)[selection])
+        vue.stats_base = self.stats_base[selection]
+        vue.especes = self.especes
+        return vue
+
+    def _recalculer_stats(self, reinitialiser_pv=False):
+        """
+        Recalcule les stats au niveau actuel (memes formules que
+        Experience.calculer_nouvelles_stats) et ajuste les PV.
+        """
+        niveau = self.niveau.astype(np.int64)[:, None]
+        base = self.stats_base.astype(np.int64)
+        stats = base * 2 * niveau / 100
+        stats[:, 1:] += 5
+        stats[:, 0] += niveau[:, 0] + 10
+        stats = np.maximum(1, stats.astype(np.int64)).astype(np.int32)
+
+        ancien_pv_max = self.pv_max.copy()
+        self.pv_max[:] = stats[:, 0]
+        self.attaque[:] = stats[:, 1]
+        self.defense[:] = stats[:, 2]
+        self.attaque_speciale[:] = stats[:, 3]
+        self.defense_speciale[:] = stats[:, 4]
+        self.vitesse[:] = stats[:, 5]
+
+        if reinitialiser_pv:
+            self.pv[:] = self.pv_max
+        else:
+            # Ajuster les PV actuels comme Pokemon._recalculer_stats
+            self.pv[:] = np.minimum(self.pv_max, self.pv + (self.pv_max - ancien_pv_max))
+
+    def monter_niveau(self, nouveaux_niveaux):
+        """
+        Fait monter de niveau toute la population (niveau commun ou tableau).
+        Les niveaux ne baissent jamais et sont plafonnes a Experience.NIVEAU_MAX.
+        """
+        cibles = np.minimum(Experience.NIVEAU_MAX, np.asarray(nouveaux_niveaux))
+        self.niveau[:] = np.maximum(self.niveau, cibles)
+        self.xp[:] = np.maximum(self.xp, self.niveau.astype(np.int32) ** 3)
+        self._recalculer_stats()
+
+    def subir_degats(self, degats):
+        """Reduit les PV (degats communs ou tableau), sans descendre sous 0."""
+        self.pv[:] = np.maximum(0, self.pv - np.asarray(degats))
+
+    def soigner(self, montants):
+        """Restaure des PV (montant commun ou tableau), sans depasser pv_max."""
+        self.pv[:] = np.minimum(self.pv_max, self.pv + np.asarray(montants))
+
+    def soigner_tout(self):
+        """Soin complet : PV au maximum et statuts retires."""
+        self.pv[:] = self.pv_max
+        self.statut[:] = 0
+
+    def est_ko(self):
+        """Retourne un masque booleen des Pokemon KO."""
+        return self.pv <= 0
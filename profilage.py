@@ -0,0 +1,244 @@
+"""
+Module Profilage - Compteurs et chronometres par phase d'un combat.
+Instrumentation a la demande : Profileur.activer() remplace les methodes
+suivies (Combat, Pokemon, Statut, TypeChart, Capture, Experience, journal)
+par des enveloppes qui comptent les appels et mesurent le temps
+(perf_counter_ns), et desactiver() remet les originales. Desactive, le
+profileur ne coute donc rien.
+
+Le temps inclusif d'une methode comprend ses appels suivis ; son temps propre
+les exclut (le cout des enveloppes elles-memes reste compte dans l'appelant).
+Un seul profileur peut etre actif a la fois.
+"""
+
+from time import perf_counter_ns
+
+from capture import Capture
+from combat import Combat
+from experience import Experience
+from journal import JournalCombat
+from pokemon import Pokemon
+from pokemon_compact import PokemonCompact
+from statut import Statut
+from type_chart import TypeChart
+
+
+# Phases suivies : phase -> [(classe, methode)]
+PHASES = {
+    "combat": [
+        (Combat, "jouer_action"),
+        (Combat, "tour_attaque"),
+        (Combat, "_tour_attaque_silencieux"),
+        (Combat, "jouer_tour_attaque"),
+        (Combat, "_attaque_silencieuse"),
+        (Combat, "appliquer_effets_fin_tour"),
+        (Combat, "_fin_tour_silencieuse"),
+        (Combat, "utiliser_objet"),
+        (Combat, "_utiliser_objet_silencieux"),
+        (Combat, "_fin_combat"),
+        (Combat, "_journaliser"),
+        (Pokemon, "attaquer"),
+        (PokemonCompact, "attaquer"),
+    ],
+    "statut": [
+        (Statut, "peut_agir"),
+        (Statut, "appliquer_degats_fin_tour"),
+    ],
+    "type": [
+        (TypeChart, "get_multiplicateur_attaque"),
+    ],
+    "degats": [
+        (Pokemon, "resoudre_attaque"),
+        (PokemonCompact, "resoudre_attaque"),
+    ],
+    "messages": [
+        (Pokemon, "decrire_attaque"),
+        (PokemonCompact, "decrire_attaque"),
+        (TypeChart, "get_message_efficacite"),
+        (JournalCombat, "rendre"),
+    ],
+    "capture": [
+        (Combat, "tenter_capture"),
+        (Combat, "_tenter_capture_silencieux"),
+        (Capture, "tenter_capture"),
+        (Capture, "resoudre_capture"),
+    ],
+    "xp": [
+        (Pokemon, "gagner_xp"),
+        (Pokemon, "ajouter_xp"),
+        (PokemonCompact, "gagner_xp"),
+        (PokemonCompact, "ajouter_xp"),
+        (Experience, "xp_gagnee"),
+        (Experience, "calculer_niveaux_gagnes"),
+        (Experience, "calculer_nouvelles_stats"),
+    ],
+}
+
+
+class Profileur:
+    """Compteurs d'appels et temps (ns) par methode suivie, et piles d'appels."""
+
+    _actif = None
+
+    def __init__(self, phases=None):
+        """
+        Args:
+            phases: dict phase -> [(classe, methode)] (defaut : PHASES)
+        """
+        self.phases = PHASES if phases is None else phases
+        self._originales = []
+        self.vider()
+
+    def vider(self):
+        """Remet tous les compteurs a zero."""
+        # Nom ("Classe.methode") -> nombre d'appels, temps inclusif, temps propre
+        self.appels = {}
+        self.inclusif = {}
+        self.propre = {}
+        # Pile d'appels (tuple de noms) -> temps propre
+        self.piles = {}
+        self._pile = []
+        self._enfants = []
+
+    # --- Activation ----------------------------------------------------
+
+    def activer(self):
+        """Installe les enveloppes sur toutes les methodes suivies."""
+        if Profileur._actif is not None:
+            raise RuntimeError("Un profileur est deja actif.")
+        Profileur._actif = self
+        for classe, methode in self._cibles():
+            attribut = classe.__dict__[methode]
+            nom = f"{classe.__name__}.{methode}"
+            if isinstance(attribut, (staticmethod, classmethod)):
+                remplacement = type(attribut)(self._envelopper(nom, attribut.__func__))
+            else:
+                remplacement = self._envelopper(nom, attribut)
+            self._originales.append((classe, methode, attribut))
+            setattr(classe, methode, remplacement)
+        return self
+
+    def desactiver(self):
+        """Remet les methodes originales."""
+        for classe, methode, attribut in reversed(self._originales):
+            setattr(classe, methode, attribut)
+        self._originales.clear()
+        if Profileur._actif is self:
+            Profileur._actif = None
+
+    def __enter__(self):
+        return self.activer()
+
+    def __exit__(self, *exc):
+        self.desactiver()
+
+    def _cibles(self):
+        vues = set()
+        for cibles in self.phases.values():
+            for cible in cibles:
+                if cible not in vues:
+                    vues.add(cible)
+                    yield cible
+
+    def _envelopper(self, nom, fonction):
+        pile = self._pile
+        enfants = self._enfants
+        appels = self.appels
+        inclusif = self.inclusif
+        propre = self.propre
+        piles = self.piles
+
+        def enveloppe(*args, **kwargs):
+            recursif = nom in pile
+            pile.append(nom)
+            enfants.append(0)
+            debut = perf_counter_ns()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                duree = perf_counter_ns() - debut
+                duree_propre = duree - enfants.pop()
+                cle = tuple(pile)
+                pile.pop()
+                if enfants:
+                    enfants[-1] += duree
+                appels[nom] = appels.get(nom, 0) + 1
+                if not recursif:
+                    inclusif[nom] = inclusif.get(nom, 0) + duree
+                propre[nom] = propre.get(nom, 0) + duree_propre
+                piles[cle] = piles.get(cle, 0) + duree_propre
+
+        enveloppe.__wrapped__ = fonction
+        enveloppe.__name__ = fonction.__name__
+        enveloppe.__doc__ = fonction.__doc__
+        return enveloppe
+
+    # --- Resultats -----------------------------------------------------
+
+    def par_phase(self):
+        """Retourne {phase: (appels, temps propre en ns)}."""
+        resultat = {}
+        for phase, cibles in self.phases.items():
+            noms = {f"{classe.__name__}.{methode}" for classe, methode in cibles}
+            resultat[phase] = (
+                sum(self.appels.get(nom, 0) for nom in noms),
+                sum(self.propre.get(nom, 0) for nom in noms),
+            )
+        return resultat
+
+    def rapport(self):
+        """Rapport texte : methodes triees par temps propre, puis total par phase."""
+        total = sum(self.propre.values()) or 1
+        lignes = [
+            f"{'Methode':45s} {'Appels':>9s} {'Inclusif (ms)':>14s} "
+            f"{'Propre (ms)':>12s} {'ns/appel':>9s} {'%':>6s}"
+        ]
+        for nom in sorted(self.propre, key=self.propre.get, reverse=True):
+            appels = self.appels[nom]
+            propre = self.propre[nom]
+            lignes.append(
+                f"{nom:45s} {appels:9d} {self.inclusif.get(nom, 0) / 1e6:14.2f} "
+                f"{propre / 1e6:12.2f} {propre / appels:9.0f} {propre / total:6.1%}"
+            )
+        lignes.append("")
+        lignes.append(f"{'Phase':45s} {'Appels':>9s} {'Propre (ms)':>14s} {'%':>6s}")
+        phases = self.par_phase()
+        for phase in sorted(phases, key=lambda p: phases[p][1], reverse=True):
+            appels, propre = phases[phase]
+            lignes.append(f"{phase:45s} {appels:9d} {propre / 1e6:14.2f} {propre / total:6.1%}")
+        return "\n".join(lignes)
+
+    def piles_repliees(self):
+        """Lignes au format "a;b;c temps_propre_ns" (flamegraph.pl, speedscope)."""
+        return [f"{';'.join(pile)} {duree}" for pile, duree in sorted(self.piles.items())]
+
+    def ecrire_piles(self, chemin):
+        """Ecrit les piles repliees dans un fichier."""
+        with open(chemin, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.piles_repliees()) + "\n")
+
+
+if __name__ == "__main__":
+    import sys
+
+    from catalogue import Catalogue
+    from inventaire import Inventaire, POKE_BALL, POTION
+
+    catalogue = Catalogue.get()
+    profileur = Profileur()
+    with profileur:
+        for graine in range(2000):
+            joueur = Pokemon.depuis_json(catalogue.get_par_nom("Pikachu"), niveau=20)
+            adverse = Pokemon.depuis_json(catalogue.get_par_nom("Salameche"), niveau=20)
+            inventaire = Inventaire()
+            inventaire.creer_inventaire_depart()
+            combat = Combat(joueur, adverse, inventaire, graine=graine)
+            combat.jouer_action(Combat.ACTION_OBJET, POTION)
+            combat.jouer_action(Combat.ACTION_CAPTURE, POKE_BALL)
+            while not combat.termine:
+                combat.jouer_action()
+            list(combat.log)
+    print(profileur.rapport())
+    if len(sys.argv) > 1:
+        profileur.ecrire_piles(sys.argv[1])
+        print(f"\nPiles repliees ecrites dans {sys.argv[1]}")
@@ -0,0 +1,99 @@
+"""
+Module Registre - Registre des especes avec tables de stats precalculees.
+Pour chaque espece de pokemon.json, les 6 stats sont calculees une fois pour
+tous les niveaux de 1 a 100 : creer ou faire monter un Pokemon devient une
+simple lecture de table.
+"""
+
+from array import array
+
+from catalogue import Catalogue
+from experience import Experience
+
+
+# Ordre des stats dans la table
+STATS = ("pv", "attaque", "defense", "attaque_speciale", "defense_speciale", "vitesse")
+
+
+class RegistreEspeces:
+    """
+    Registre des especes indexe par identifiant (position dans pokemon.json).
+    Table de stats : nb_especes x NIVEAU_MAX x 6 entiers (array 'H').
+    """
+
+    _defaut = None
+
+    def __init__(self, especes):
+        """
+        Args:
+            especes: liste de dicts (format pokemon.json)
+        """
+        self._especes = list(especes)
+        self._ids = {donnees["numero"]: i for i, donnees in enumerate(self._especes)}
+        self._table = self._construire_table(self._especes)
+
+    @classmethod
+    def par_defaut(cls):
+        """
+        Retourne le registre partage construit depuis le Catalogue par defaut
+        (data/pokemon.json). Il est reconstruit au premier appel qui suit un
+        rechargement du Catalogue ; les Pokemon deja crees gardent le registre
+        (et donc la table) qui a servi a les creer.
+        """
+        if cls._defaut is None:
+            catalogue = Catalogue.get()
+            cls._defaut = cls(catalogue.get_especes())
+            catalogue.au_rechargement(cls._invalider_defaut)
+        return cls._defaut
+
+    @classmethod
+    def _invalider_defaut(cls, catalogue):
+        cls._defaut = None
+
+    @staticmethod
+    def _construire_table(especes):
+        """
+        Calcule les stats de chaque espece a chaque niveau.
+        Les formules ne dependent que de (stat de base, niveau) : on calcule
+        d'abord une ligne par valeur de base rencontree, puis on recopie.
+        """
+        niveaux = range(1, Experience.NIVEAU_MAX + 1)
+        lignes_pv = {}
+        lignes_autres = {}
+        for donnees in especes:
+            for stat_nom in STATS:
+                base = donnees[stat_nom]
+                lignes = lignes_pv if stat_nom == "pv" else lignes_autres
+                if base not in lignes:
+                    stats = [
+                        Experience.calculer_nouvelles_stats({stat_nom: base}, 1, niv)[stat_nom]
+                        for niv in niveaux
+                    ]
+                    lignes[base] = stats
+
+        table = array("H")
+        for donnees in especes:
+            colonnes = [lignes_pv[donnees["pv"]]]
+            colonnes += [lignes_autres[donnees[s]] for s in STATS[1:]]
+            for i in range(len(niveaux)):
+                table.extend(colonne[i] for colonne in colonnes)
+        return table
+
+    def __len__(self):
+        return len(self._especes)
+
+    def get_id(self, numero):
+        """Retourne l'identifiant de registre d'un numero de Pokedex, ou -1."""
+        return self._ids.get(numero, -1)
+
+    def get_donnees(self, id_espece):
+        """Retourne le dict pokemon.json de l'espece."""
+        return self._especes[id_espece]
+
+    def get_stats(self, id_espece, niveau):
+        """
+        Retourne les stats (pv, attaque, defense, attaque_speciale,
+        defense_speciale, vitesse) de l'espece au niveau donne.
+        """
+        debut = (id_espece * Experience.NIVEAU_MAX + niveau - 1) * len(STATS)
+        return tuple(self._table[debut:debut + len(STATS)])
@@ -0,0 +1,334 @@
+"""
+Module Replay - Enregistrement compact et deterministe des combats.
+Un combat joue avec sa propre graine (Combat(graine=...)) est entierement
+determine par les deux especes et niveaux, l'inventaire de depart, la graine
+et la suite des actions du joueur. Un enregistrement binaire ne stocke que
+cela (un octet par action) ; le journal texte est regenere a la demande.
+
+Chaque enregistrement porte la version des regles de combat et le
+generateur de tirages utilises : un replay d'une autre version est refuse
+plutot que rejoue differemment.
+
+Les enregistrements sont ajoutes a la suite dans un fichier de replays,
+accompagne d'un index (identifiant -> position) reconstruit si besoin.
+"""
+
+import os
+import struct
+from collections import namedtuple
+
+from catalogue import Catalogue
+from combat import Combat
+from inventaire import Inventaire, TOUTES_LES_BALLS, TOUS_LES_OBJETS
+from pokemon import Pokemon
+from rng import FluxAleatoire, np
+
+
+# Version des regles de combat et du format : un replay ne se rejoue a
+# l'identique qu'avec la meme version (a incrementer a chaque changement de
+# la facon dont un combat consomme ses tirages)
+# 1 : premiere version
+# 2 : capture tiree en un seul tirage (Capture.resoudre_capture)
+VERSION = 2
+# Generateur des tirages de FluxAleatoire : 0 = NumPy, 1 = module random
+GENERATEUR = 0 if np is not None else 1
+
+# Un enregistrement de combat
+# inventaire : tuple de (nom de l'objet, quantite) au debut du combat
+# actions : bytes, un octet par action du joueur (voir encoder_action)
+EnregistrementCombat = namedtuple("EnregistrementCombat", [
+    "identifiant", "graine", "numero_joueur", "niveau_joueur",
+    "numero_adverse", "niveau_adverse", "inventaire", "actions",
+    "version", "generateur",
+], defaults=(VERSION, GENERATEUR))
+
+
+# Codes des objets (ne jamais reordonner : les replays existants en dependent)
+OBJETS = TOUTES_LES_BALLS + TOUS_LES_OBJETS
+CODES_OBJETS = {objet.nom: code for code, objet in enumerate(OBJETS)}
+
+# Codes d'action : 0 attaque, 1 fuite, 2 + code de l'objet (ball ou objet)
+CODE_ATTAQUE = 0
+CODE_FUITE = 1
+CODE_PREMIER_OBJET = 2
+
+# version, generateur, identifiant, graine, numero et niveau du joueur puis
+# de l'adverse, nombre d'objets differents, nombre d'actions
+ENTETE = struct.Struct("<BBQQHBHBBI")
+OBJET_INVENTAIRE = struct.Struct("<BH")
+LONGUEUR = struct.Struct("<I")
+ENTREE_INDEX = struct.Struct("<QQ")
+
+
+def encoder_action(action=None, argument=None):
+    """Code (un octet) d'une action de Combat.jouer_action."""
+    if action is None or action == Combat.ACTION_ATTAQUE:
+        return CODE_ATTAQUE
+    if action == Combat.ACTION_FUITE:
+        return CODE_FUITE
+    if action in (Combat.ACTION_CAPTURE, Combat.ACTION_OBJET):
+        return CODE_PREMIER_OBJET + CODES_OBJETS[argument.nom]
+    raise ValueError(f"Action inconnue : {action}")
+
+
+def decoder_action(code):
+    """Retourne (action, argument) pour Combat.jouer_action."""
+    if code == CODE_ATTAQUE:
+        return Combat.ACTION_ATTAQUE, None
+    if code == CODE_FUITE:
+        return Combat.ACTION_FUITE, None
+    objet = OBJETS[code - CODE_PREMIER_OBJET]
+    if objet.categorie == "ball":
+        return Combat.ACTION_CAPTURE, objet
+    return Combat.ACTION_OBJET, objet
+
+
+def encoder(enregistrement):
+    """Serialise un EnregistrementCombat en bytes."""
+    morceaux = [ENTETE.pack(
+        enregistrement.version, enregistrement.generateur, enregistrement.identifiant, enregistrement.graine,
+        enregistrement.numero_joueur, enregistrement.niveau_joueur,
+        enregistrement.numero_adverse, enregistrement.niveau_adverse,
+        len(enregistrement.inventaire), len(enregistrement.actions),
+    )]
+    for nom, quantite in enregistrement.inventaire:
+        morceaux.append(OBJET_INVENTAIRE.pack(CODES_OBJETS[nom], quantite))
+    morceaux.append(bytes(enregistrement.actions))
+    return b"".join(morceaux)
+
+
+def verifier_version(identifiant, version, generateur):
+    """Leve ValueError si un replay vient d'autres regles ou d'un autre generateur."""
+    if (version, generateur) != (VERSION, GENERATEUR):
+        raise ValueError(
+            f"Replay {identifiant} : version {version}, generateur {generateur} "
+            f"(attendus : {VERSION}, {GENERATEUR})."
+        )
+
+
+def decoder(donnees):
+    """
+    Relit un EnregistrementCombat serialise par encoder().
+    Leve ValueError si sa version ou son generateur ne sont pas les actuels.
+    """
+    (version, generateur, identifiant, graine, numero_joueur, niveau_joueur,
+     numero_adverse, niveau_adverse, nb_objets, nb_actions) = ENTETE.unpack_from(donnees)
+    verifier_version(identifiant, version, generateur)
+    position = ENTETE.size
+    inventaire = []
+    for _ in range(nb_objets):
+        code, quantite = OBJET_INVENTAIRE.unpack_from(donnees, position)
+        inventaire.append((OBJETS[code].nom, quantite))
+        position += OBJET_INVENTAIRE.size
+    actions = bytes(donnees[position:position + nb_actions])
+    return EnregistrementCombat(
+        identifiant, graine, numero_joueur, niveau_joueur,
+        numero_adverse, niveau_adverse, tuple(inventaire), actions, version, generateur,
+    )
+
+
+# =====================================================
+# ENREGISTREMENT ET REJEU
+# =====================================================
+
+class Enregistreur:
+    """
+    Enregistre les actions jouees sur un combat. Le combat doit etre a son
+    debut, avec des Pokemon neufs (Pokemon.depuis_json) et un FluxAleatoire
+    de graine entiere (Combat(graine=...)).
+    """
+
+    def __init__(self, combat):
+        graine = getattr(combat.rng, "graine", None)
+        if not isinstance(graine, int):
+            raise ValueError("Le combat doit avoir une graine entiere (Combat(graine=...)).")
+        if combat.tour != 0:
+            raise ValueError("Le combat a deja commence.")
+        for pokemon in (combat.pokemon_joueur, combat.pokemon_adverse):
+            neuf = Pokemon.depuis_json(
+                Catalogue.get().get_par_numero(pokemon.numero), niveau=pokemon.niveau
+            )
+            if (pokemon.to_dict() != neuf.to_dict()
+                    or pokemon.capturer_etat() != neuf.capturer_etat()):
+                raise ValueError(f"{pokemon.nom} n'est pas dans son etat initial.")
+        self.combat = combat
+        self.graine = graine
+        # Le niveau du joueur peut changer en fin de combat (XP)
+        self.pokemons = tuple(
+            (pokemon.numero, pokemon.niveau)
+            for pokemon in (combat.pokemon_joueur, combat.pokemon_adverse)
+        )
+        self.inventaire = tuple(
+            (nom, quantite) for nom, (_, quantite) in combat.inventaire.capturer_etat()
+        ) if combat.inventaire else ()
+        self.actions = bytearray()
+
+    def jouer_action(self, action=None, argument=None):
+        """Joue et enregistre une action (voir Combat.jouer_action)."""
+        code = encoder_action(action, argument)
+        resultat = self.combat.jouer_action(action, argument)
+        self.actions.append(code)
+        return resultat
+
+    def enregistrement(self, identifiant):
+        """Retourne l'EnregistrementCombat des actions jouees jusqu'ici."""
+        (numero_joueur, niveau_joueur), (numero_adverse, niveau_adverse) = self.pokemons
+        return EnregistrementCombat(
+            identifiant, self.graine, numero_joueur, niveau_joueur,
+            numero_adverse, niveau_adverse, self.inventaire, bytes(self.actions),
+        )
+
+
+def creer_combat(enregistrement, silencieux=True):
+    """Reconstruit le combat d'un enregistrement, avant la premiere action."""
+    verifier_version(enregistrement.identifiant, enregistrement.version, enregistrement.generateur)
+    catalogue = Catalogue.get()
+    joueur = Pokemon.depuis_json(
+        catalogue.get_par_numero(enregistrement.numero_joueur), niveau=enregistrement.niveau_joueur
+    )
+    adverse = Pokemon.depuis_json(
+        catalogue.get_par_numero(enregistrement.numero_adverse), niveau=enregistrement.niveau_adverse
+    )
+    inventaire = None
+    if enregistrement.inventaire:
+        inventaire = Inventaire()
+        for nom, quantite in enregistrement.inventaire:
+            inventaire.ajouter(OBJETS[CODES_OBJETS[nom]], quantite)
+    return Combat(joueur, adverse, inventaire, silencieux=silencieux,
+                  rng=FluxAleatoire(enregistrement.graine))
+
+
+def avancer_jusqu_au_tour(enregistrement, tour):
+    """
+    Rejoue en mode silencieux (sans construire de messages) jusqu'a ce que le
+    combat atteigne `tour` ou que les actions soient epuisees.
+    Retourne (combat, nombre d'actions jouees) ; le combat est remis en mode
+    normal, pret a afficher les actions suivantes.
+    """
+    combat = creer_combat(enregistrement, silencieux=True)
+    jouees = 0
+    for code in enregistrement.actions:
+        if combat.tour >= tour or combat.termine:
+            break
+        combat.jouer_action(*decoder_action(code))
+        jouees += 1
+    combat.silencieux = False
+    return combat, jouees
+
+
+def rejouer(enregistrement, silencieux=True):
+    """
+    Rejoue toutes les actions d'un enregistrement et retourne le combat.
+    En mode non silencieux, le journal (combat.log) est regenere.
+    """
+    combat = creer_combat(enregistrement, silencieux=silencieux)
+    for code in enregistrement.actions:
+        combat.jouer_action(*decoder_action(code))
+    return combat
+
+
+# =====================================================
+# FICHIER DE REPLAYS
+# =====================================================
+
+class FichierReplays:
+    """
+    Fichier de replays en ajout seul : chaque enregistrement est precede de
+    sa longueur. L'index (chemin + ".idx", entrees (identifiant, position))
+    est ecrit apres les donnees ; s'il est incomplet, il est reconstruit en
+    relisant le fichier. Un enregistrement tronque en fin de fichier
+    (ecriture interrompue) est coupe a l'ouverture.
+    """
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.chemin_index = chemin + ".idx"
+        self.index = {}
+        self._charger_index()
+
+    def _charger_index(self):
+        taille = os.path.getsize(self.chemin) if os.path.exists(self.chemin) else 0
+        fin = 0
+        index_a_reecrire = False
+        if os.path.exists(self.chemin_index):
+            with open(self.chemin_index, "rb") as f:
+                donnees = f.read()
+            utile = len(donnees) - len(donnees) % ENTREE_INDEX.size
+            index_a_reecrire = utile < len(donnees)
+            for identifiant, position in ENTREE_INDEX.iter_unpack(donnees[:utile]):
+                if position >= taille:
+                    index_a_reecrire = True
+                    break
+                self.index[identifiant] = position
+                fin = max(fin, position)
+        fin_donnees = self._reconstruire_index(fin) if fin < taille else taille
+        if fin_donnees < taille:
+            # Enregistrement tronque (ecriture interrompue) : coupe le fichier
+            # pour que les ajouts suivants restent lisibles
+            os.truncate(self.chemin, fin_donnees)
+            for identifiant, position in list(self.index.items()):
+                if position >= fin_donnees:
+                    del self.index[identifiant]
+                    index_a_reecrire = True
+        if index_a_reecrire:
+            with open(self.chemin_index, "wb") as f:
+                f.write(b"".join(
+                    ENTREE_INDEX.pack(identifiant, position)
+                    for identifiant, position in sorted(self.index.items(), key=lambda e: e[1])
+                ))
+
+    def _reconstruire_index(self, debut):
+        """
+        Indexe les enregistrements a partir de la position `debut`.
+        Retourne la position de fin du dernier enregistrement complet.
+        """
+        nouvelles = []
+        with open(self.chemin, "rb") as f:
+            f.seek(debut)
+            position = debut
+            while True:
+                entete = f.read(LONGUEUR.size)
+                if len(entete) < LONGUEUR.size:
+                    break
+                (longueur,) = LONGUEUR.unpack(entete)
+                donnees = f.read(longueur)
+                if len(donnees) < longueur:
+                    break
+                identifiant = ENTETE.unpack_from(donnees)[2]
+                if self.index.get(identifiant) != position:
+                    self.index[identifiant] = position
+                    nouvelles.append(ENTREE_INDEX.pack(identifiant, position))
+                position += LONGUEUR.size + longueur
+        if nouvelles:
+            with open(self.chemin_index, "ab") as f:
+                f.write(b"".join(nouvelles))
+        return position
+
+    def ajouter(self, enregistrement):
+        """Ajoute un enregistrement a la fin du fichier et l'indexe."""
+        if enregistrement.identifiant in self.index:
+            raise ValueError(f"Replay {enregistrement.identifiant} deja enregistre.")
+        donnees = encoder(enregistrement)
+        with open(self.chemin, "ab") as f:
+            position = f.tell()
+            f.write(LONGUEUR.pack(len(donnees)) + donnees)
+        with open(self.chemin_index, "ab") as f:
+            f.write(ENTREE_INDEX.pack(enregistrement.identifiant, position))
+        self.index[enregistrement.identifiant] = position
+
+    def lire(self, identifiant):
+        """Retourne l'EnregistrementCombat d'un identifiant (KeyError si absent)."""
+        position = self.index[identifiant]
+        with open(self.chemin, "rb") as f:
+            f.seek(position)
+            (longueur,) = LONGUEUR.unpack(f.read(LONGUEUR.size))
+            return decoder(f.read(longueur))
+
+    def __contains__(self, identifiant):
+        return identifiant in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index)
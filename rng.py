@@ -0,0 +1,157 @@
+"""
+Module RNG - Flux de nombres aleatoires propre a chaque combat.
+Les tirages uniformes sont generes par blocs (NumPy si disponible) puis
+distribues un par un : pas d'etat partage entre combats, et une meme graine
+redonne exactement la meme suite de tirages.
+"""
+
+import os
+import random
+from itertools import chain, islice
+from operator import length_hint
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class FluxAleatoire:
+    """
+    Flux de tirages uniformes dans [0, 1), avec la meme interface que le
+    module random pour les fonctions utilisees par le jeu : random(),
+    uniform() et randint().
+    """
+
+    TAILLE_BLOC = 4096
+    # Premier bloc : un combat court n'utilise que quelques dizaines de tirages
+    TAILLE_PREMIER_BLOC = 64
+
+    def __init__(self, graine=None, taille_bloc=TAILLE_BLOC):
+        """
+        Args:
+            graine: graine du flux (None = graine imprevisible) ; une graine
+                    invalide leve une erreur des la construction
+            taille_bloc: nombre maximal de tirages generes a la fois (les
+                         blocs commencent petits et doublent jusqu'a cette taille)
+        """
+        self.graine = graine
+        self.taille_bloc = taille_bloc
+        # Graine effective : permet de reconstruire le flux (copie, pickle)
+        self._graine_flux = graine if graine is not None else int.from_bytes(os.urandom(16), "big")
+        self._demarrer(0)
+
+    def _demarrer(self, nb_tirages):
+        """Cree le generateur et saute les `nb_tirages` premiers tirages."""
+        if np is not None:
+            generateur = np.random.default_rng(self._graine_flux)
+        else:
+            generateur = random.Random(self._graine_flux)
+        self._nb_generes = 0
+        self._bloc = iter(())
+        flux = chain.from_iterable(self._blocs(generateur))
+        # random() est directement le __next__ (en C) d'un iterateur sur les blocs
+        self.random = flux.__next__
+        next(islice(flux, nb_tirages, nb_tirages), None)
+
+    def _blocs(self, generateur):
+        """
+        Genere indefiniment des blocs (iterateurs de listes de float) de tirages
+        uniformes. La suite des tirages ne depend pas de la taille des blocs.
+        """
+        taille = min(self.TAILLE_PREMIER_BLOC, self.taille_bloc)
+        while True:
+            if np is not None:
+                bloc = generateur.random(taille).tolist()
+            else:
+                tirage = generateur.random
+                bloc = [tirage() for _ in range(taille)]
+            self._nb_generes += taille
+            self._bloc = iter(bloc)
+            yield self._bloc
+            taille = min(2 * taille, self.taille_bloc)
+
+    @property
+    def nb_tirages(self):
+        """Nombre de tirages deja consommes."""
+        return self._nb_generes - length_hint(self._bloc)
+
+    def __reduce__(self):
+        # Le generateur n'est ni copiable ni picklable : on le reconstruit
+        # depuis la graine en sautant les tirages deja consommes
+        return (_restaurer_flux,
+                (self.graine, self._graine_flux, self.taille_bloc, self.nb_tirages))
+
+    def uniform(self, a, b):
+        """Tirage uniforme entre a et b (meme formule que random.uniform)."""
+        return a + (b - a) * self.random()
+
+    def randint(self, a, b):
+        """Entier uniforme entre a et b inclus."""
+        return a + int(self.random() * (b - a + 1))
+
+
+def _restaurer_flux(graine, graine_flux, taille_bloc, nb_tirages):
+    """Reconstruit un FluxAleatoire au meme point du flux (voir __reduce__)."""
+    flux = FluxAleatoire.__new__(FluxAleatoire)
+    flux.graine = graine
+    flux.taille_bloc = taille_bloc
+    flux._graine_flux = graine_flux
+    flux._demarrer(nb_tirages)
+    return flux
+
+
+def mesurer_debit(nb_combats=20000, graine=0, repetitions=5):
+    """
+    Compare le debit de combats silencieux (combats/s) avec le module random
+    global et avec un FluxAleatoire. Les deux variantes sont alternees et la
+    meilleure mesure de chacune est retenue.
+    Retourne (debit_global, debit_flux).
+    """
+    import time
+
+    from catalogue import Catalogue
+    from combat import Combat
+    from pokemon import Pokemon
+
+    catalogue = Catalogue.get()
+    donnees_joueur = catalogue.get_par_nom("Pikachu")
+    donnees_adverse = catalogue.get_par_nom("Salameche")
+    joueur = Pokemon.depuis_json(donnees_joueur, niveau=30)
+    adverse = Pokemon.depuis_json(donnees_adverse, niveau=30)
+    etats = (joueur.capturer_etat(), adverse.capturer_etat())
+
+    def jouer(creer_rng):
+        debut = time.perf_counter()
+        for i in range(nb_combats):
+            joueur.restaurer_etat(etats[0])
+            adverse.restaurer_etat(etats[1])
+            combat = Combat(joueur, adverse, silencieux=True, capacite_journal=0,
+                            rng=creer_rng(i))
+            combat.simuler_jusqu_a_fin()
+        return nb_combats / (time.perf_counter() - debut)
+
+    random.seed(graine)
+    # Un flux pour toute la serie de combats (comme simulation.simuler_lot)
+    flux = FluxAleatoire(graine)
+    debit_global = debit_flux = 0
+    for _ in range(repetitions):
+        debit_global = max(debit_global, jouer(lambda i: None))
+        debit_flux = max(debit_flux, jouer(lambda i: flux))
+    return debit_global, debit_flux
+
+
+if __name__ == "__main__":
+    import timeit
+
+    n = 1000000
+    flux = FluxAleatoire(0)
+    print(f"random.random()        : {timeit.timeit(random.random, number=n) / n * 1e9:6.1f} ns")
+    print(f"FluxAleatoire.random() : {timeit.timeit(flux.random, number=n) / n * 1e9:6.1f} ns")
+    print(f"random.randint()       : "
+          f"{timeit.timeit(lambda: random.randint(0, 65535), number=n) / n * 1e9:6.1f} ns")
+    print(f"FluxAleatoire.randint(): "
+          f"{timeit.timeit(lambda: flux.randint(0, 65535), number=n) / n * 1e9:6.1f} ns")
+    debit_global, debit_flux = mesurer_debit()
+    print(f"Combats silencieux : {debit_global:.0f}/s (random global), "
+          f"{debit_flux:.0f}/s (FluxAleatoire, {debit_flux / debit_global - 1:+.0%})")
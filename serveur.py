@@ -0,0 +1,415 @@
+"""
+Module Serveur - Serveur de combats asyncio pour de nombreux joueurs.
+Protocole : une requete JSON par ligne, une reponse JSON par ligne, sur TCP
+ou sur un socket Unix. Chaque joueur a une session (Inventaire, Pokedex et
+combat en cours) ; les sessions inactives sont expulsees et leur nombre est
+borne (la moins recemment utilisee est expulsee en premier).
+
+Requetes ({"id": ..., "joueur": ..., "action": ...}) :
+    combat  : espece, niveau, espece_adverse, niveau_adverse (niveaux 1 a 100),
+              graine (optionnelle, entier >= 0)
+    attaque, fuite
+    capture : objet = nom de la ball
+    objet   : objet = nom de l'objet
+    etat    : etat du combat, Pokedex et inventaire
+    suivre  : recevoir chaque nouvel etat du combat du joueur
+              ({"joueur": ..., "etat": ...}, sans "id")
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+from combat import Combat
+from inventaire import Inventaire, TOUTES_LES_BALLS, TOUS_LES_OBJETS
+from pokedex import Pokedex
+from pokemon import Pokemon
+from rng import FluxAleatoire
+from simulation import resoudre_espece
+
+
+OBJETS = {objet.nom: objet for objet in TOUTES_LES_BALLS + TOUS_LES_OBJETS}
+
+ACTIONS_COMBAT = {
+    "attaque": Combat.ACTION_ATTAQUE,
+    "capture": Combat.ACTION_CAPTURE,
+    "objet": Combat.ACTION_OBJET,
+    "fuite": Combat.ACTION_FUITE,
+}
+
+MAX_SESSIONS = 10000
+DELAI_INACTIVITE = 300.0
+CAPACITE_JOURNAL = 32
+TAILLE_FILE = 16
+# Petits blocs de tirages : un combat interactif en consomme peu, et chaque
+# session garde son bloc en memoire
+TAILLE_BLOC_RNG = 64
+TAILLE_LIGNE_MAX = 64 * 1024
+# File d'attente des connexions (le defaut d'asyncio, 100, refuse les pics)
+BACKLOG = 1024
+
+
+class ErreurRequete(Exception):
+    """Requete invalide (renvoyee au client, la connexion reste ouverte)."""
+
+
+class Session:
+    """Etat d'un joueur : inventaire, Pokedex, combat en cours et abonnes."""
+
+    def __init__(self, joueur):
+        self.joueur = joueur
+        self.inventaire = Inventaire()
+        self.inventaire.creer_inventaire_depart()
+        # Pokedex en memoire uniquement (jamais sauvegarde par le serveur)
+        self.pokedex = Pokedex()
+        self.combat = None
+        self.abonnes = set()
+        self.derniere_activite = time.monotonic()
+
+    def publier(self, message):
+        """
+        Envoie un message a chaque abonne. Les files sont bornees : si un
+        abonne est trop lent, son plus ancien message est abandonne.
+        """
+        for file in self.abonnes:
+            if file.full():
+                file.get_nowait()
+            file.put_nowait(message)
+
+
+class ServeurCombats:
+    """Serveur de combats : stockage des sessions et traitement des requetes."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS, delai_inactivite=DELAI_INACTIVITE,
+                 capacite_journal=CAPACITE_JOURNAL, taille_file=TAILLE_FILE):
+        """
+        Args:
+            max_sessions: nombre maximal de sessions en memoire
+            delai_inactivite: secondes sans requete avant expulsion d'une session
+            capacite_journal: taille du journal de chaque combat
+            taille_file: nombre de messages en attente par abonne
+        """
+        self.max_sessions = max_sessions
+        self.delai_inactivite = delai_inactivite
+        self.capacite_journal = capacite_journal
+        self.taille_file = taille_file
+        # Sessions par joueur, de la moins a la plus recemment utilisee
+        self.sessions = OrderedDict()
+        self.expulsions = 0
+        self._nettoyage = None
+
+    # --- Sessions ------------------------------------------------------
+
+    def get_session(self, joueur):
+        """Retourne la session d'un joueur (creee si besoin) et la marque active."""
+        session = self.sessions.get(joueur)
+        if session is None:
+            session = Session(joueur)
+            self.sessions[joueur] = session
+            while len(self.sessions) > self.max_sessions:
+                self._expulser(next(iter(self.sessions)))
+        else:
+            self.sessions.move_to_end(joueur)
+        session.derniere_activite = time.monotonic()
+        return session
+
+    def _expulser(self, joueur):
+        session = self.sessions.pop(joueur)
+        session.publier({"joueur": joueur, "expiree": True})
+        self.expulsions += 1
+
+    def expulser_inactives(self, maintenant=None):
+        """Expulse les sessions inactives. Retourne le nombre de sessions expulsees."""
+        if maintenant is None:
+            maintenant = time.monotonic()
+        limite = maintenant - self.delai_inactivite
+        expulsees = 0
+        # Les sessions sont dans l'ordre d'utilisation : on s'arrete a la premiere active
+        while self.sessions:
+            joueur, session = next(iter(self.sessions.items()))
+            if session.derniere_activite > limite:
+                break
+            self._expulser(joueur)
+            expulsees += 1
+        return expulsees
+
+    # --- Requetes ------------------------------------------------------
+
+    def traiter(self, requete):
+        """Traite une requete (dict) et retourne la reponse (dict)."""
+        reponse = {"id": requete.get("id")}
+        try:
+            reponse.update(self._traiter(requete))
+            reponse["ok"] = True
+        except ErreurRequete as erreur:
+            reponse["ok"] = False
+            reponse["erreur"] = str(erreur)
+        except Exception as erreur:
+            # Une requete ne doit jamais couper la connexion du client
+            reponse["ok"] = False
+            reponse["erreur"] = f"Erreur interne : {type(erreur).__name__}"
+        return reponse
+
+    def _traiter(self, requete):
+        joueur = requete.get("joueur")
+        if not isinstance(joueur, str):
+            raise ErreurRequete("Champ 'joueur' manquant.")
+        action = requete.get("action")
+        session = self.get_session(joueur)
+
+        if action == "combat":
+            return self._nouveau_combat(session, requete)
+        if action == "etat":
+            return {
+                "etat": session.combat.get_etat() if session.combat else None,
+                "pokedex": session.pokedex.get_stats(),
+                "inventaire": {nom: qte for nom, (_, qte) in session.inventaire.capturer_etat()},
+            }
+        if action not in ACTIONS_COMBAT:
+            raise ErreurRequete(f"Action inconnue : {action}")
+        if session.combat is None:
+            raise ErreurRequete("Aucun combat en cours.")
+
+        argument = None
+        if action in ("capture", "objet"):
+            nom_objet = requete.get("objet")
+            argument = OBJETS.get(nom_objet) if isinstance(nom_objet, str) else None
+            if argument is None:
+                raise ErreurRequete(f"Objet inconnu : {requete.get('objet')}")
+            if (argument.categorie == "ball") != (action == "capture"):
+                raise ErreurRequete(f"{argument.nom} ne peut pas servir a : {action}")
+        messages = session.combat.jouer_action(ACTIONS_COMBAT[action], argument)
+        return {"messages": messages, "etat": self._publier_etat(session)}
+
+    def _nouveau_combat(self, session, requete):
+        graine = requete.get("graine")
+        if graine is not None and (not isinstance(graine, int) or isinstance(graine, bool) or graine < 0):
+            raise ErreurRequete(f"Graine invalide : {graine!r} (entier positif attendu)")
+        try:
+            niveaux = int(requete.get("niveau", 5)), int(requete.get("niveau_adverse", 5))
+            for niveau in niveaux:
+                if not 1 <= niveau <= 100:
+                    raise ValueError(f"niveau {niveau} hors de 1..100")
+            joueur = Pokemon.depuis_json(resoudre_espece(requete["espece"]), niveau=niveaux[0])
+            adverse = Pokemon.depuis_json(resoudre_espece(requete["espece_adverse"]), niveau=niveaux[1])
+            combat = Combat(
+                joueur, adverse, session.inventaire, session.pokedex,
+                capacite_journal=self.capacite_journal,
+                rng=FluxAleatoire(graine, taille_bloc=TAILLE_BLOC_RNG),
+            )
+        except (KeyError, ValueError, TypeError) as erreur:
+            raise ErreurRequete(f"Combat invalide : {erreur}") from None
+        session.combat = combat
+        return {"etat": self._publier_etat(session)}
+
+    @staticmethod
+    def _publier_etat(session):
+        etat = session.combat.get_etat()
+        if session.abonnes:
+            session.publier({"joueur": session.joueur, "etat": etat})
+        return etat
+
+    # --- Reseau --------------------------------------------------------
+
+    async def _gerer_client(self, lecteur, ecrivain):
+        """Boucle d'une connexion : requetes en entree, reponses et etats en sortie."""
+        # File bornee : un client lent ralentit la lecture de ses requetes
+        # et fait deborder ses abonnements (voir Session.publier)
+        sortie = asyncio.Queue(maxsize=self.taille_file)
+        abonnements = []
+
+        async def ecrire():
+            connecte = True
+            while True:
+                message = await sortie.get()
+                if message is None:
+                    break
+                if not connecte:
+                    # Client parti : les messages sont jetes jusqu'a la fin
+                    continue
+                try:
+                    ecrivain.write(json.dumps(message).encode() + b"\n")
+                    await ecrivain.drain()
+                except ConnectionError:
+                    connecte = False
+
+        async def relayer(file):
+            while True:
+                await sortie.put(await file.get())
+
+        ecriture = asyncio.create_task(ecrire())
+        relais = []
+        try:
+            while True:
+                try:
+                    ligne = await lecteur.readline()
+                except ValueError:
+                    # Ligne plus longue que TAILLE_LIGNE_MAX
+                    await sortie.put({"id": None, "ok": False, "erreur": "Ligne trop longue."})
+                    break
+                if not ligne:
+                    break
+                try:
+                    requete = json.loads(ligne)
+                    if not isinstance(requete, dict):
+                        raise ValueError
+                except ValueError:
+                    await sortie.put({"id": None, "ok": False, "erreur": "JSON invalide."})
+                    continue
+
+                if requete.get("action") == "suivre" and isinstance(requete.get("joueur"), str):
+                    file = asyncio.Queue(maxsize=self.taille_file)
+                    session = self.get_session(requete["joueur"])
+                    session.abonnes.add(file)
+                    abonnements.append((session, file))
+                    relais.append(asyncio.create_task(relayer(file)))
+                    await sortie.put({"id": requete.get("id"), "ok": True})
+                    continue
+                await sortie.put(self.traiter(requete))
+        finally:
+            for session, file in abonnements:
+                session.abonnes.discard(file)
+            for tache in relais:
+                tache.cancel()
+            # Envoyer les reponses deja calculees avant de fermer
+            await sortie.put(None)
+            await ecriture
+            ecrivain.close()
+
+    async def _nettoyer(self, periode):
+        while True:
+            await asyncio.sleep(periode)
+            self.expulser_inactives()
+
+    async def demarrer(self, hote="127.0.0.1", port=0, chemin_unix=None):
+        """
+        Demarre le serveur (socket Unix si chemin_unix, sinon TCP) et la
+        tache d'expulsion des sessions inactives. Retourne l'asyncio.Server.
+        """
+        if chemin_unix is not None:
+            serveur = await asyncio.start_unix_server(
+                self._gerer_client, chemin_unix, limit=TAILLE_LIGNE_MAX, backlog=BACKLOG
+            )
+        else:
+            serveur = await asyncio.start_server(
+                self._gerer_client, hote, port, limit=TAILLE_LIGNE_MAX, backlog=BACKLOG
+            )
+        nettoyage = asyncio.create_task(self._nettoyer(max(0.1, self.delai_inactivite / 4)))
+        self._nettoyage = nettoyage
+        return serveur
+
+    def arreter(self):
+        """Arrete la tache d'expulsion (le serveur se ferme avec server.close())."""
+        if self._nettoyage is not None:
+            self._nettoyage.cancel()
+
+
+# =====================================================
+# GENERATEUR DE CHARGE
+# =====================================================
+
+async def ouvrir_connexion(hote="127.0.0.1", port=0, chemin_unix=None):
+    """Ouvre une connexion vers le serveur (socket Unix si chemin_unix)."""
+    if chemin_unix is not None:
+        return await asyncio.open_unix_connection(chemin_unix, limit=TAILLE_LIGNE_MAX)
+    return await asyncio.open_connection(hote, port, limit=TAILLE_LIGNE_MAX)
+
+
+def centile(valeurs_triees, q):
+    """Centile q (0-100) d'une liste triee (rang le plus proche)."""
+    if not valeurs_triees:
+        return 0.0
+    rang = max(0, min(len(valeurs_triees) - 1, round(q / 100 * len(valeurs_triees)) - 1))
+    return valeurs_triees[rang]
+
+
+async def _client_charge(numero, nb_actions, latences, hote, port, chemin_unix):
+    lecteur, ecrivain = await ouvrir_connexion(hote, port, chemin_unix)
+    joueur = f"charge-{numero}"
+    nouveau_combat = {
+        "joueur": joueur, "action": "combat", "espece": "Pikachu", "niveau": 20,
+        "espece_adverse": "Salameche", "niveau_adverse": 20, "graine": numero,
+    }
+    termine = True
+    try:
+        for i in range(nb_actions):
+            if termine:
+                requete = nouveau_combat
+            elif i % 10 == 5:
+                requete = {"joueur": joueur, "action": "objet", "objet": "Potion"}
+            else:
+                requete = {"joueur": joueur, "action": "attaque"}
+            debut = time.perf_counter()
+            ecrivain.write(json.dumps(dict(requete, id=i)).encode() + b"\n")
+            await ecrivain.drain()
+            reponse = json.loads(await lecteur.readline())
+            latences.append(time.perf_counter() - debut)
+            if not reponse["ok"]:
+                raise RuntimeError(reponse["erreur"])
+            termine = reponse["etat"]["termine"]
+    finally:
+        ecrivain.close()
+        await ecrivain.wait_closed()
+
+
+async def generer_charge(nb_clients=100, nb_actions=100, hote="127.0.0.1", port=0,
+                         chemin_unix=None):
+    """
+    Lance nb_clients clients simultanes qui jouent chacun nb_actions actions.
+    Retourne un dict : actions, duree (s), actions_par_seconde, p50 et p99 (ms).
+    """
+    latences = []
+    debut = time.perf_counter()
+    await asyncio.gather(*(
+        _client_charge(numero, nb_actions, latences, hote, port, chemin_unix)
+        for numero in range(nb_clients)
+    ))
+    duree = time.perf_counter() - debut
+    latences.sort()
+    return {
+        "actions": len(latences),
+        "duree": duree,
+        "actions_par_seconde": len(latences) / duree if duree > 0 else 0.0,
+        "p50": centile(latences, 50) * 1000,
+        "p99": centile(latences, 99) * 1000,
+    }
+
+
+async def _principal(arguments):
+    serveur_combats = ServeurCombats(
+        max_sessions=arguments.max_sessions, delai_inactivite=arguments.inactivite
+    )
+    serveur = await serveur_combats.demarrer(arguments.hote, arguments.port, arguments.unix)
+    if arguments.unix is None:
+        port = serveur.sockets[0].getsockname()[1]
+        print(f"Serveur de combats sur {arguments.hote}:{port}")
+    else:
+        port = None
+        print(f"Serveur de combats sur {arguments.unix}")
+
+    async with serveur:
+        if arguments.charge is None:
+            await serveur.serve_forever()
+            return
+        resultat = await generer_charge(
+            arguments.charge, arguments.actions, arguments.hote, port, arguments.unix
+        )
+        serveur_combats.arreter()
+    print(f"{resultat['actions']} actions en {resultat['duree']:.2f} s "
+          f"({resultat['actions_par_seconde']:.0f}/s) : "
+          f"p50 {resultat['p50']:.2f} ms, p99 {resultat['p99']:.2f} ms")
+
+
+if __name__ == "__main__":
+    parseur = argparse.ArgumentParser(description="Serveur de combats Pokemon")
+    parseur.add_argument("--hote", default="127.0.0.1")
+    parseur.add_argument("--port", type=int, default=8765)
+    parseur.add_argument("--unix", help="chemin d'un socket Unix (au lieu de TCP)")
+    parseur.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    parseur.add_argument("--inactivite", type=float, default=DELAI_INACTIVITE)
+    parseur.add_argument("--charge", type=int, metavar="CLIENTS",
+                         help="lance le generateur de charge avec CLIENTS clients puis s'arrete")
+    parseur.add_argument("--actions", type=int, default=100, help="actions par client de charge")
+    asyncio.run(_principal(parseur.parse_args()))
@@ -0,0 +1,164 @@
+"""
+Module Simulation - Estimation Monte Carlo de la probabilite de victoire.
+Les combats sont joues en mode silencieux par lots repartis sur un
+ProcessPoolExecutor. Chaque lot a son propre FluxAleatoire, dont la graine est
+derivee de (graine, numero du lot) : le resultat ne depend que de la graine,
+pas du nombre de processus.
+"""
+
+import math
+import os
+import random
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+from catalogue import Catalogue
+from combat import Combat
+from pokemon import Pokemon
+from rng import FluxAleatoire
+
+
+# Resultat d'une estimation (voir estimer_victoire)
+# intervalle : (borne basse, borne haute) de Wilson sur taux_victoire
+ResultatEstimation = namedtuple("ResultatEstimation", [
+    "combats", "victoires", "nuls", "taux_victoire", "tours_moyens", "intervalle",
+])
+
+
+TAILLE_LOT_DEFAUT = 250
+TOURS_MAX = 1000
+
+
+def resoudre_espece(espece):
+    """Retourne le dict pokemon.json d'une espece (numero, nom ou dict)."""
+    if isinstance(espece, dict):
+        return espece
+    catalogue = Catalogue.get()
+    if isinstance(espece, int):
+        donnees = catalogue.get_par_numero(espece)
+    else:
+        donnees = catalogue.get_par_nom(espece)
+    if donnees is None:
+        raise ValueError(f"Espece inconnue : {espece}")
+    return donnees
+
+
+def graine_lot(graine, index_lot):
+    """Graine d'un lot, derivee de la graine globale et du numero du lot."""
+    return random.Random(f"{graine}:{index_lot}").getrandbits(64)
+
+
+def intervalle_wilson(victoires, combats, confiance=0.95):
+    """Intervalle de confiance de Wilson pour une proportion."""
+    if combats == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf((1 + confiance) / 2)
+    p = victoires / combats
+    denominateur = 1 + z * z / combats
+    centre = (p + z * z / (2 * combats)) / denominateur
+    marge = z * math.sqrt(p * (1 - p) / combats + z * z / (4 * combats * combats)) / denominateur
+    return max(0.0, centre - marge), min(1.0, centre + marge)
+
+
+def simuler_lot(donnees_joueur, niveau_joueur, donnees_adverse, niveau_adverse,
+                nb_combats, graine, tours_max=TOURS_MAX):
+    """
+    Joue `nb_combats` combats independants (execute dans un processus de travail).
+    Retourne (victoires, nuls, total des tours).
+    """
+    flux = FluxAleatoire(graine)
+    joueur = Pokemon.depuis_json(donnees_joueur, niveau=niveau_joueur)
+    adverse = Pokemon.depuis_json(donnees_adverse, niveau=niveau_adverse)
+    etat_joueur = joueur.capturer_etat()
+    etat_adverse = adverse.capturer_etat()
+
+    victoires = 0
+    nuls = 0
+    total_tours = 0
+    for _ in range(nb_combats):
+        joueur.restaurer_etat(etat_joueur)
+        adverse.restaurer_etat(etat_adverse)
+        combat = Combat(joueur, adverse, silencieux=True, capacite_journal=0, rng=flux)
+        vainqueur = combat.simuler_jusqu_a_fin(tours_max=tours_max)
+        if vainqueur is joueur:
+            victoires += 1
+        elif vainqueur is None:
+            nuls += 1
+        total_tours += combat.tour
+    return victoires, nuls, total_tours
+
+
+def estimer_victoire(espece_joueur, niveau_joueur, espece_adverse, niveau_adverse,
+                     nb_combats=10000, graine=0, nb_processus=None,
+                     taille_lot=TAILLE_LOT_DEFAUT, demi_largeur=None, confiance=0.95):
+    """
+    Estime la probabilite que le Pokemon du joueur gagne le combat.
+
+    Args:
+        espece_joueur, espece_adverse: numero, nom ou dict pokemon.json
+        nb_combats: nombre maximal de combats simules
+        graine: graine globale (meme graine = meme resultat)
+        nb_processus: nombre de processus (defaut : nombre de coeurs)
+        taille_lot: nombre de combats par tache
+        demi_largeur: si fourni, arret des que l'intervalle de confiance est
+                      plus etroit que +/- demi_largeur
+        confiance: niveau de confiance de l'intervalle
+
+    Retourne un ResultatEstimation. Les lots sont comptabilises dans leur
+    ordre de soumission : l'arret anticipe est lui aussi reproductible.
+    """
+    donnees_joueur = resoudre_espece(espece_joueur)
+    donnees_adverse = resoudre_espece(espece_adverse)
+    if nb_processus is None:
+        nb_processus = os.cpu_count() or 1
+    nb_lots = (nb_combats + taille_lot - 1) // taille_lot
+
+    combats = victoires = nuls = total_tours = 0
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        en_cours = deque()
+        prochain = 0
+        while True:
+            # Garder tous les processus occupes sans soumettre tous les lots
+            while prochain < nb_lots and len(en_cours) < 2 * nb_processus:
+                taille = min(taille_lot, nb_combats - prochain * taille_lot)
+                en_cours.append((taille, executeur.submit(
+                    simuler_lot, donnees_joueur, niveau_joueur,
+                    donnees_adverse, niveau_adverse, taille, graine_lot(graine, prochain),
+                )))
+                prochain += 1
+            if not en_cours:
+                break
+
+            taille, futur = en_cours.popleft()
+            v, n, t = futur.result()
+            combats += taille
+            victoires += v
+            nuls += n
+            total_tours += t
+
+            if demi_largeur is not None:
+                bas, haut = intervalle_wilson(victoires, combats, confiance)
+                if (haut - bas) / 2 <= demi_largeur:
+                    for _, reste in en_cours:
+                        reste.cancel()
+                    break
+
+    return ResultatEstimation(
+        combats,
+        victoires,
+        nuls,
+        victoires / combats if combats else 0.0,
+        total_tours / combats if combats else 0.0,
+        intervalle_wilson(victoires, combats, confiance),
+    )
+
+
+if __name__ == "__main__":
+    resultat = estimer_victoire("Pikachu", 10, "Salameche", 10, demi_largeur=0.01)
+    bas, haut = resultat.intervalle
+    print(
+        f"Pikachu Niv.10 vs Salameche Niv.10 : {resultat.taux_victoire:.1%} de victoires "
+        f"[{bas:.1%} - {haut:.1%}] sur {resultat.combats} combats, "
+        f"{resultat.tours_moyens:.1f} tours en moyenne"
+    )
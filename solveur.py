@@ -0,0 +1,255 @@
+"""
+Module Solveur - Probabilite exacte de victoire d'un combat (attaques seules).
+Programmation dynamique sur les etats (pv_joueur, pv_adverse, statut et
+compteurs de chaque camp), avec les memes transitions que Combat.tour_attaque :
+ordre par vitesse, attaque ratee a 10%, Statut.peut_agir (sommeil, gel,
+paralysie, confusion), loi exacte des degats (CalculDegats) et degats de fin
+de tour (Statut.get_degats_fin_tour).
+"""
+
+from statut import Statut
+from calcul_degats import CalculDegats
+from type_chart import TypeChart
+
+
+# Issues terminales d'un demi-tour
+VICTOIRE_JOUEUR = 1.0
+VICTOIRE_ADVERSE = 0.0
+
+
+class SolveurCombat:
+    """
+    Solveur exact du combat joueur contre adverse (Combat.simuler_jusqu_a_fin
+    sans policy). Un etat est (pv_joueur, pv_adverse, statut_joueur,
+    statut_adverse), ou un statut est le tuple (statut_principal,
+    tours_restants, confusion, tours_confusion) de Statut.capturer_etat().
+
+    Les PV et les compteurs ne font que diminuer : le seul cycle possible est
+    un tour sans aucun changement (boucle sur soi), resolu analytiquement.
+    Le combat n'a pas de limite de tours (tours_max de Combat ignore).
+    """
+
+    # Tables de transposition partagees : cle du duel -> {noeud: valeur}
+    _tables = {}
+
+    def __init__(self, pokemon_joueur, pokemon_adverse):
+        self.pokemons = (pokemon_joueur, pokemon_adverse)
+        self._lois = ({}, {})
+        self._fin_tour = tuple(
+            {
+                None: 0,
+                Statut.POISON: max(1, p.pv_max // 8),
+                Statut.BRULURE: max(1, p.pv_max // 16),
+            }
+            for p in self.pokemons
+        )
+        self._cle = tuple(
+            (p.niveau, p.pv_max, p.attaque, p.defense, p.vitesse, tuple(p.types))
+            for p in self.pokemons
+        )
+        self.table = SolveurCombat._tables.setdefault(self._cle, {})
+
+    @classmethod
+    def vider_tables(cls):
+        """Oublie tous les resultats memorises."""
+        cls._tables.clear()
+
+    def etat_initial(self):
+        """Etat courant des deux Pokemon."""
+        joueur, adverse = self.pokemons
+        return (joueur.pv, adverse.pv, joueur.statut.capturer_etat(), adverse.statut.capturer_etat())
+
+    def probabilite_victoire(self, etat=None):
+        """
+        Probabilite exacte que le joueur gagne depuis `etat`
+        (defaut : l'etat actuel des deux Pokemon).
+        """
+        if etat is None:
+            etat = self.etat_initial()
+        return self._evaluer(("V", etat))
+
+    # --- Transitions ---------------------------------------------------
+
+    def _loi_degats(self, camp, brule):
+        """Loi (liste de (degats, p)) d'une attaque qui touche du camp `camp`."""
+        loi = self._lois[camp].get(brule)
+        if loi is None:
+            attaquant = self.pokemons[camp]
+            defenseur = self.pokemons[1 - camp]
+            touche = CalculDegats.distribution_touche(
+                attaquant.niveau,
+                attaquant.attaque,
+                defenseur.defense,
+                TypeChart.get_multiplicateur_attaque(attaquant.types, defenseur.types),
+                brule,
+            )
+            loi = [(degats, float(p)) for degats, p in sorted(touche.items())]
+            self._lois[camp][brule] = loi
+        return loi
+
+    @staticmethod
+    def _branches_agir(statut):
+        """
+        Issues de Statut.peut_agir() : liste de (action, nouveau_statut, p) ou
+        action vaut True (attaque), False (ne fait rien) ou "CONFUSION".
+        """
+        principal, tours_restants, confusion, tours_confusion = statut
+        if principal == Statut.SOMMEIL and tours_restants > 0:
+            tours_restants -= 1
+            if tours_restants == 0:
+                return [(True, (None, 0, confusion, tours_confusion), 1.0)]
+            return [(False, (principal, tours_restants, confusion, tours_confusion), 1.0)]
+        if principal == Statut.GEL:
+            return [(True, (None, 0, confusion, tours_confusion), 0.20), (False, statut, 0.80)]
+
+        branches = []
+        poids = 1.0
+        if principal == Statut.PARALYSIE:
+            branches.append((False, statut, 0.25))
+            poids = 0.75
+        if confusion:
+            tours_confusion -= 1
+            if tours_confusion <= 0:
+                branches.append((True, (principal, tours_restants, False, 0), poids))
+                return branches
+            confus = (principal, tours_restants, confusion, tours_confusion)
+            branches.append(("CONFUSION", confus, poids * 0.33))
+            branches.append((True, confus, poids * 0.67))
+            return branches
+        branches.append((True, statut, poids))
+        return branches
+
+    def _demi_tour(self, camp, etat):
+        """
+        Attaque du camp `camp` puis ses degats de fin de tour.
+        Retourne un dict {issue: probabilite}, ou une issue est un etat ou
+        VICTOIRE_JOUEUR / VICTOIRE_ADVERSE.
+        """
+        pv = [etat[0], etat[1]]
+        statuts = [etat[2], etat[3]]
+        victoire_camp = VICTOIRE_JOUEUR if camp == 0 else VICTOIRE_ADVERSE
+        defaite_camp = VICTOIRE_ADVERSE if camp == 0 else VICTOIRE_JOUEUR
+        attaquant = self.pokemons[camp]
+        issues = {}
+
+        def fin_de_tour(pv_attaquant, pv_defenseur, statut, p):
+            # Degats de statut de l'attaquant, puis verification de son KO
+            pv_attaquant = max(0, pv_attaquant - self._fin_tour[camp].get(statut[0], 0))
+            if pv_attaquant <= 0:
+                cle = defaite_camp
+            else:
+                nouveaux_pv = [0, 0]
+                nouveaux_pv[camp] = pv_attaquant
+                nouveaux_pv[1 - camp] = pv_defenseur
+                nouveaux_statuts = list(statuts)
+                nouveaux_statuts[camp] = statut
+                cle = (nouveaux_pv[0], nouveaux_pv[1], nouveaux_statuts[0], nouveaux_statuts[1])
+            issues[cle] = issues.get(cle, 0.0) + p
+
+        pv_att, pv_def = pv[camp], pv[1 - camp]
+
+        # Attaque ratee (10%) : peut_agir n'est pas appele
+        fin_de_tour(pv_att, pv_def, statuts[camp], 0.10)
+
+        for action, statut, p in self._branches_agir(statuts[camp]):
+            p *= 0.90
+            if action is False:
+                fin_de_tour(pv_att, pv_def, statut, p)
+            elif action == "CONFUSION":
+                degats = max(1, attaquant.attaque // 4)
+                fin_de_tour(max(0, pv_att - degats), pv_def, statut, p)
+            else:
+                for degats, q in self._loi_degats(camp, statut[0] == Statut.BRULURE):
+                    reste = pv_def - degats
+                    if reste <= 0:
+                        issues[victoire_camp] = issues.get(victoire_camp, 0.0) + p * q
+                    else:
+                        fin_de_tour(pv_att, reste, statut, p * q)
+        return issues
+
+    def _ordres(self, etat):
+        """Retourne [(premier camp, probabilite)] selon les vitesses effectives."""
+        vitesses = []
+        for camp in (0, 1):
+            modificateur = 0.5 if etat[2 + camp][0] == Statut.PARALYSIE else 1.0
+            vitesses.append(int(self.pokemons[camp].vitesse * modificateur))
+        if vitesses[0] > vitesses[1]:
+            return [(0, 1.0)]
+        if vitesses[1] > vitesses[0]:
+            return [(1, 1.0)]
+        return [(0, 0.5), (1, 0.5)]
+
+    # --- Evaluation ----------------------------------------------------
+
+    def _dependances(self, noeud):
+        """
+        Calcule les transitions d'un noeud.
+        Noeud ("V", etat) : debut de tour. Noeud ("W", second, etat) : apres
+        le demi-tour du premier camp, avant celui de `second`.
+        Retourne (transitions, noeuds necessaires) ; une transition est
+        (noeud ou valeur terminale, p), ou (None, p) pour un retour a `etat`.
+        """
+        if noeud[0] == "W":
+            _, second, etat = noeud
+            transitions = [
+                (("V", issue) if isinstance(issue, tuple) else issue, p)
+                for issue, p in self._demi_tour(second, etat).items()
+            ]
+            return transitions, [n for n, _ in transitions if isinstance(n, tuple)]
+
+        etat = noeud[1]
+        transitions = []
+        requis = []
+        for premier, p_ordre in self._ordres(etat):
+            second = 1 - premier
+            for milieu, p1 in self._demi_tour(premier, etat).items():
+                if milieu == etat:
+                    # Premier demi-tour sans effet : le second peut revenir a `etat`
+                    for fin, p2 in self._demi_tour(second, etat).items():
+                        if fin == etat:
+                            transitions.append((None, p_ordre * p1 * p2))
+                        elif isinstance(fin, tuple):
+                            transitions.append((("V", fin), p_ordre * p1 * p2))
+                            requis.append(("V", fin))
+                        else:
+                            transitions.append((fin, p_ordre * p1 * p2))
+                elif isinstance(milieu, tuple):
+                    transitions.append((("W", second, milieu), p_ordre * p1))
+                    requis.append(("W", second, milieu))
+                else:
+                    transitions.append((milieu, p_ordre * p1))
+        return transitions, requis
+
+    def _evaluer(self, racine):
+        """Evalue un noeud (ordre topologique iteratif, sans recursion)."""
+        table = self.table
+        if racine in table:
+            return table[racine]
+        en_attente = {}
+        pile = [racine]
+        while pile:
+            noeud = pile[-1]
+            if noeud in table:
+                pile.pop()
+                continue
+            if noeud not in en_attente:
+                en_attente[noeud] = self._dependances(noeud)
+            transitions, requis = en_attente[noeud]
+            manquants = [n for n in requis if n not in table]
+            if manquants:
+                pile.extend(manquants)
+                continue
+
+            pile.pop()
+            del en_attente[noeud]
+            total = 0.0
+            boucle = 0.0
+            for issue, p in transitions:
+                if issue is None:
+                    boucle += p
+                elif isinstance(issue, tuple):
+                    total += p * table[issue]
+                else:
+                    total += p * issue
+            table[noeud] = total / (1.0 - boucle)
+        return table[racine]
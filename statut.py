@@ -39,15 +39,27 @@ class Statut:
         PARALYSIE: 1.5,
     }
 
+    # Pas de __dict__ par instance : chaque Pokemon possede son Statut
+    __slots__ = ("statut_principal", "tours_restants", "confusion", "tours_confusion")
+
     def __init__(self):
         self.statut_principal = None
         self.tours_restants = 0  # Pour sommeil et confusion
         self.confusion = False
         self.tours_confusion = 0
 
-    def appliquer_statut_principal(self, statut, types_pokemon):
+    def capturer_etat(self):
+        """Retourne l'etat courant sous forme de tuple immuable."""
+        return (self.statut_principal, self.tours_restants, self.confusion, self.tours_confusion)
+
+    def restaurer_etat(self, etat):
+        """Restaure en place un etat retourne par capturer_etat()."""
+        self.statut_principal, self.tours_restants, self.confusion, self.tours_confusion = etat
+
+    def appliquer_statut_principal(self, statut, types_pokemon, rng=random):
         """
         Tente d'appliquer un statut principal.
+        `rng` : source des tirages (module random par defaut, ou FluxAleatoire).
         Retourne True si le statut a ete applique, False sinon.
         """
         # Verifier si deja un statut principal
@@ -64,18 +76,18 @@ class Statut:
 
         # Definir la duree pour les statuts temporaires
         if statut == self.SOMMEIL:
-            self.tours_restants = random.randint(1, 3)
+            self.tours_restants = rng.randint(1, 3)
         elif statut == self.GEL:
             self.tours_restants = 0  # Gere par chance de degel
 
         return True
 
-    def appliquer_confusion(self):
+    def appliquer_confusion(self, rng=random):
         """Applique la confusion (statut volatil, cumulable avec un statut principal)."""
         if self.confusion:
             return False
         self.confusion = True
-        self.tours_confusion = random.randint(1, 4)
+        self.tours_confusion = rng.randint(1, 4)
         return True
 
     def retirer_statut_principal(self):
@@ -93,9 +105,9 @@ class Statut:
         self.retirer_statut_principal()
         self.retirer_confusion()
 
-    def peut_agir(self):
+    def peut_agir(self, rng=random):
         """
-        Verifie si le Pokemon peut agir ce tour.
+        Verifie si le Pokemon peut agir ce tour (tirages dans `rng`).
         Retourne (peut_agir: bool, message: str ou None).
         """
         # Sommeil
@@ -109,14 +121,14 @@ class Statut:
 
         # Gel
         if self.statut_principal == self.GEL:
-            if random.random() < 0.20:
+            if rng.random() < 0.20:
                 self.retirer_statut_principal()
                 return True, "Le Pokemon est degivre !"
             return False, "Le Pokemon est gele et ne peut pas bouger !"
 
         # Paralysie (25% de ne pas agir)
         if self.statut_principal == self.PARALYSIE:
-            if random.random() < 0.25:
+            if rng.random() < 0.25:
                 return False, "Le Pokemon est paralyse ! Il ne peut pas attaquer !"
 
         # Confusion
@@ -126,22 +138,30 @@ class Statut:
                 self.retirer_confusion()
                 return True, "Le Pokemon n'est plus confus !"
 
-            if random.random() < 0.33:
+            if rng.random() < 0.33:
                 return False, "CONFUSION"  # Signal special : le Pokemon se frappe
 
         return True, None
 
+    def get_degats_fin_tour(self, pv_max):
+        """Retourne les degats de statut de fin de tour (sans message)."""
+        if self.statut_principal == self.POISON:
+            return max(1, pv_max // 8)
+        if self.statut_principal == self.BRULURE:
+            return max(1, pv_max // 16)
+        return 0
+
     def appliquer_degats_fin_tour(self, pv_max):
         """
         Applique les degats de statut en fin de tour.
         Retourne (degats: int, message: str ou None).
         """
+        degats = self.get_degats_fin_tour(pv_max)
+
         if self.statut_principal == self.POISON:
-            degats = max(1, pv_max // 8)
             return degats, f"Le Pokemon souffre du poison ! (-{degats} PV)"
 
         if self.statut_principal == self.BRULURE:
-            degats = max(1, pv_max // 16)
             return degats, f"Le Pokemon souffre de sa brulure ! (-{degats} PV)"
 
         return 0, None
@@ -5,6 +5,7 @@ Tests unitaires pour tous les modules du projet Pokemon.
 import os
 import sys
 import json
+import math
 import tempfile
 
 # Ajouter le dossier courant au path
@@ -51,6 +52,32 @@ assert TypeChart.get_multiplicateur("Sol", ["Electrik", "Acier"]) == 4, "Sol vs
 assert TypeChart.get_multiplicateur("Electrik", ["Sol", "Roche"]) == 0, "Electrik vs Sol/Roche = x0"
 print("[OK] Double type")
 
+# Test table precompilee (18 types x 171 combinaisons)
+assert len(TypeChart.COMBINAISONS) == 171
+id_eau_vol = TypeChart.get_combinaison_id(["Eau", "Vol"])
+assert id_eau_vol == TypeChart.get_combinaison_id(["Vol", "Eau"])
+assert TypeChart.get_multiplicateur_ids(TypeChart.get_index("Electrik"), id_eau_vol) == 4
+assert TypeChart.get_combinaison_id(["Lave"]) == -1
+assert TypeChart.get_multiplicateur("Feu", ["Lave"]) == 1.0
+assert TypeChart.get_multiplicateur_attaque(["Normal", "Vol"], ["Plante"]) == 2, "Premier type non neutre"
+assert TypeChart.get_multiplicateur_attaque(["Normal"], ["Eau"]) == 1.0
+print("[OK] Table de multiplicateurs precompilee")
+
+# Test matrice vectorisee N attaquants x M defenseurs (NumPy optionnel)
+try:
+    liste_att = [["Electrik"], ["Normal", "Vol"], ["Sol", "Roche"]]
+    liste_def = [["Eau", "Vol"], ["Plante"], ["Spectre"], ["Sol"]]
+    matrice = TypeChart.get_matrice_multiplicateurs(
+        TypeChart.encoder_types(liste_att), TypeChart.encoder_types(liste_def)
+    )
+    assert matrice.shape == (3, 4)
+    for i, types_att in enumerate(liste_att):
+        for j, types_def in enumerate(liste_def):
+            assert matrice[i, j] == TypeChart.get_multiplicateur_attaque(types_att, types_def)
+    print("[OK] Matrice de multiplicateurs vectorisee")
+except ImportError:
+    print("[SKIP] NumPy non installe (matrice vectorisee)")
+
 # Test faiblesses/resistances/immunites
 faiblesses_feu = TypeChart.get_faiblesses("Feu")
 assert "Eau" in faiblesses_feu, "Feu devrait avoir Eau en faiblesse"
@@ -61,6 +88,15 @@ assert "Normal" in immunites_spectre, "Spectre devrait etre immune a Normal"
 assert "Combat" in immunites_spectre, "Spectre devrait etre immune a Combat"
 print("[OK] Faiblesses, resistances, immunites")
 
+# Test profil defensif double type (Bulbizarre : Plante/Poison)
+profil_bulbi = TypeChart.get_profil_defensif(["Plante", "Poison"])
+assert profil_bulbi[2] == ("Feu", "Glace", "Vol", "Psy")
+assert profil_bulbi[0.25] == ("Plante",)
+assert TypeChart.get_profil_defensif(["Poison", "Plante"]) is profil_bulbi, "Profil memoise"
+assert TypeChart.get_profil_defensif(["Eau", "Vol"])[4] == ("Electrik",)
+assert TypeChart.get_profil_defensif(["Lave"]) is None
+print("[OK] Profil defensif double type")
+
 # Test messages
 assert TypeChart.get_message_efficacite(2) == "C'est super efficace !"
 assert TypeChart.get_message_efficacite(0) == "Ca n'affecte pas le Pokemon..."
@@ -250,6 +286,74 @@ assert cara.pv < cara.pv_max or degats == 0  # Degats infliges (sauf si rate par
 print(f"[OK] Combat : {sal.nom} attaque {cara.nom} -> {degats} degats")
 
 
+# Test creation depuis le registre des especes (stats precalculees)
+try:
+    from registre import RegistreEspeces
+
+    registre = RegistreEspeces.par_defaut()
+    id_bulbi = registre.get_id(1)
+    bulbi_registre = Pokemon.depuis_json(id_bulbi, niveau=20)
+    bulbi_json = Pokemon.depuis_json(registre.get_donnees(id_bulbi), niveau=20)
+    assert bulbi_registre.to_dict() == bulbi_json.to_dict()
+    assert registre.get_stats(id_bulbi, 20) == (
+        bulbi_json.pv_max, bulbi_json.attaque, bulbi_json.defense,
+        bulbi_json.attaque_speciale, bulbi_json.defense_speciale, bulbi_json.vitesse,
+    )
+    bulbi_registre.gagner_xp(Experience.xp_pour_niveau(30))
+    bulbi_json.gagner_xp(Experience.xp_pour_niveau(30))
+    assert bulbi_registre.to_dict() == bulbi_json.to_dict(), "Level up via la table"
+    assert RegistreEspeces.par_defaut() is registre
+    from catalogue import Catalogue
+    catalogue_defaut = Catalogue.get()
+    catalogue_defaut._charger(catalogue_defaut._signature)  # comme si pokemon.json avait change
+    assert RegistreEspeces.par_defaut() is not registre, "Reconstruit apres un rechargement"
+    assert bulbi_registre._registre is registre, "Un Pokemon garde le registre qui l'a cree"
+    bulbi_registre.gagner_xp(Experience.xp_pour_niveau(40))
+    bulbi_json.gagner_xp(Experience.xp_pour_niveau(40))
+    assert bulbi_registre.to_dict() == bulbi_json.to_dict()
+    print("[OK] Registre des especes (table de stats par niveau)")
+except FileNotFoundError:
+    print("[SKIP] pokemon.json non trouve (normal si pas dans le bon dossier)")
+
+# Test variante compacte (__slots__, tuples partages)
+from pokemon_compact import PokemonCompact
+
+compact = PokemonCompact.depuis_json(donnees_test, niveau=16)
+classique = Pokemon.depuis_json(donnees_test, niveau=16)
+assert compact.to_dict() == classique.to_dict(), "to_dict identique a Pokemon"
+assert not hasattr(compact, "__dict__") and not hasattr(compact.statut, "__dict__")
+assert PokemonCompact.depuis_json(donnees_test, niveau=5).types is compact.types, "Types partages"
+assert compact.peut_evoluer() == True
+degats, msgs = compact.attaquer(cara)
+succes, msg = compact.evoluer(dict(donnees_test, numero=5, nom="Reptincel", evolution_niveau=36))
+assert succes and compact.nom == "Reptincel" and compact.pv == compact.pv_max
+print("[OK] PokemonCompact (slots, to_dict compatible, combat, evolution)")
+
+
+# Test population en colonnes (NumPy optionnel)
+try:
+    from population import PokemonArray
+
+    population = PokemonArray.depuis_especes([donnees_test, donnees_cara] * 3, niveaux=5)
+    assert len(population) == 6
+    population.monter_niveau([10, 20, 30, 40, 50, 60])
+    reference = Pokemon.depuis_json(donnees_test, niveau=5)
+    reference.niveau = 30
+    reference._recalculer_stats()
+    assert population.vers_pokemon(2).attaque == reference.attaque
+    assert population.vers_pokemon(2).pv == reference.pv
+    vue = population[0:2]
+    vue.subir_degats(9999)
+    assert list(population.est_ko()) == [True, True, False, False, False, False], "Vue sans copie"
+    population.soigner_tout()
+    assert (population.pv == population.pv_max).all()
+    copie = PokemonArray.depuis_pokemon([salameche3, cara])
+    assert copie.vers_pokemon(1).to_dict() == cara.to_dict()
+    print("[OK] PokemonArray (generation, level up, degats, soins, vues)")
+except ImportError:
+    print("[SKIP] NumPy non installe (PokemonArray)")
+
+
 # =====================================================
 # TESTS POKEDEX
 # =====================================================
@@ -371,6 +475,22 @@ assert len(msgs) > 0
 assert combat.tour == 1
 print(f"[OK] Tour 1 joue ({len(msgs)} messages)")
 
+# Test instantane / restauration (analyse "what-if")
+etat_combat = combat.capturer_etat()
+etat_pv = (joueur.pv, adverse.pv)
+joueur.statut.appliquer_confusion()
+if joueur.pv < joueur.pv_max:
+    combat.utiliser_objet(POTION)
+else:
+    combat.tour_attaque()
+combat.tour_attaque()
+combat.restaurer_etat(etat_combat)
+assert (joueur.pv, adverse.pv) == etat_pv
+assert combat.tour == 1 and not joueur.statut.confusion
+assert inv_combat.get_quantite("Potion") == 10
+assert combat.capturer_etat() == etat_combat
+print("[OK] Instantane et restauration du combat")
+
 # Jouer jusqu'a la fin
 tours_max = 50
 while not combat.termine and combat.tour < tours_max:
@@ -380,6 +500,71 @@ assert combat.termine or combat.tour >= tours_max
 resultat = combat.get_resultat()
 print(f"[OK] Combat termine en {combat.tour} tours : {resultat}")
 
+# Test mode silencieux (aucun message, resultats structures)
+from combat import ResultatTour
+
+joueur_s = Pokemon.depuis_json(donnees_cara, niveau=15)
+adverse_s = Pokemon.depuis_json(donnees_test, niveau=10)
+inv_s = Inventaire()
+inv_s.creer_inventaire_depart()
+combat_s = Combat(joueur_s, adverse_s, inv_s, silencieux=True)
+resultat_tour = combat_s.tour_attaque()
+assert isinstance(resultat_tour, ResultatTour) and resultat_tour.succes
+assert adverse_s.pv == max(0, adverse_s.pv_max - resultat_tour.degats_joueur)
+assert len(combat_s.log) == 0
+joueur_s.pv = max(1, joueur_s.pv - 10)
+if not combat_s.termine:
+    assert combat_s.jouer_action(Combat.ACTION_OBJET, POTION).succes
+    assert inv_s.get_quantite("Potion") == 9
+
+def policy_test(c):
+    return (Combat.ACTION_CAPTURE, POKE_BALL) if c.tour == 3 else None
+
+combat_s.simuler_jusqu_a_fin(policy_test)
+assert combat_s.termine and len(combat_s.log) == 0
+assert combat_s.silencieux
+print(f"[OK] Mode silencieux et simulation jusqu'a la fin ({combat_s.tour} tours)")
+
+# Test journal de combat (evenements types, tampon borne, rendu a l'affichage)
+from journal import JournalCombat
+
+assert len(combat.log) > 0
+debuts = combat.log.evenements(JournalCombat.DEBUT_TOUR)
+assert len(debuts) == combat.tour and debuts[-1][1] == combat.tour
+assert all(isinstance(texte, str) for texte in combat.log)
+assert combat.log[0] == f"\n{'='*40}\nTour 1\n{'='*40}"
+for evenement in combat.log.evenements(JournalCombat.DEGATS):
+    assert JournalCombat.rendre(evenement).endswith(f"{evenement[4]} degats a {evenement[3]} !")
+
+assert combat.log[-3:] == list(combat.log)[-3:] and combat.log[:] == list(combat.log)
+
+# Rendu identique aux messages du combat : capture (Master Ball) et XP avec evolution
+combat_m = Combat(Pokemon.depuis_json(donnees_cara, niveau=15), Pokemon.depuis_json(donnees_test, niveau=5),
+                  inv_capture, graine=3)
+messages_m = combat_m.jouer_action(Combat.ACTION_CAPTURE, MASTER_BALL)
+rendu_m = combat_m.log.evenements(JournalCombat.CAPTURE)[0]
+assert JournalCombat.rendre(rendu_m).split("\n") == messages_m[:3]
+assert "La Master Ball ne rate jamais !" in messages_m
+bulbi_m = Pokemon.depuis_json(Catalogue.get().get_par_numero(1), niveau=15)
+combat_m = Combat(bulbi_m, Pokemon.depuis_json(donnees_test, niveau=5), graine=3)
+messages_m = bulbi_m.gagner_xp(Experience.xp_pour_niveau(17))
+combat_m._journaliser_xp(Experience.xp_pour_niveau(17), 15)
+assert combat_m.log[-1].split("\n") == messages_m and "peut evoluer" in messages_m[-1]
+
+journal_court = JournalCombat(capacite=5)
+for i in range(100):
+    journal_court.ajouter(JournalCombat.DEBUT_TOUR, i)
+assert len(journal_court) == 5 and journal_court.evenements()[0][1] == 95
+journal_court.tronquer(97)
+assert [e[1] for e in journal_court.evenements()] == [95, 96, 97]
+combat_sans_journal = Combat(
+    Pokemon.depuis_json(donnees_cara, niveau=15), Pokemon.depuis_json(donnees_test, niveau=10),
+    capacite_journal=0,
+)
+combat_sans_journal.tour_attaque()
+assert len(combat_sans_journal.log) == 0
+print(f"[OK] Journal de combat : {len(combat.log)} evenements, capacite bornee")
+
 # Test etat du combat
 etat = combat.get_etat()
 assert "joueur" in etat
@@ -416,6 +601,839 @@ except FileNotFoundError:
     print("[SKIP] pokemon.json non trouve (normal si pas dans le bon dossier)")
 
 
+# =====================================================
+# TESTS CATALOGUE
+# =====================================================
+test_separator("TESTS CATALOGUE")
+
+from catalogue import Catalogue
+
+with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as tmp:
+    json.dump({"pokemons": [dict(donnees_test, nom="Salamèche")]}, tmp)
+    tmp_catalogue = tmp.name
+
+catalogue = Catalogue.get(tmp_catalogue)
+assert catalogue.get_par_numero(4)["nom"] == "Salamèche"
+assert catalogue.get_par_nom("Salamèche") is catalogue.get_par_numero(4)
+assert catalogue.get_par_nom("salameche") is catalogue.get_par_numero(4), "Recherche sans accents"
+assert catalogue.get_par_nom("Pikachu") is None
+assert Catalogue.get(tmp_catalogue) is catalogue
+assert catalogue.get_statistiques()["misses"] == 1
+assert catalogue.get_statistiques()["hits"] == 1
+print("[OK] Index par numero et par nom, compteurs hits/misses")
+
+with open(tmp_catalogue, "w", encoding="utf-8") as f:
+    json.dump({"pokemons": [donnees_test, donnees_cara]}, f)
+assert len(Pokemon.charger_tous(tmp_catalogue)) == 2, "Rechargement si le fichier change"
+copies_especes = Pokemon.charger_tous(tmp_catalogue)
+copies_especes[1]["nom"] = "Modifie"
+copies_especes[1]["types"].append("Feu")
+assert Catalogue.get(tmp_catalogue).get_par_numero(7) == donnees_cara, "Copies independantes du Catalogue"
+assert catalogue.get_statistiques()["misses"] == 2
+assert catalogue.get_par_numero(7)["nom"] == "Carapuce"
+print("[OK] Rechargement automatique (mtime/taille)")
+
+# Test pack binaire projete en memoire (mmap)
+from pack_especes import PackEspeces
+
+tmp_pack = tmp_catalogue + ".pack"
+with PackEspeces.ouvrir(tmp_catalogue, tmp_pack) as pack:
+    assert len(pack) == 2
+    assert list(pack) == Catalogue.get(tmp_catalogue).get_especes()
+    assert pack.get_par_numero(7)["evolution_nom"] == "Carabaffe"
+    assert pack.get_par_numero(25) is None
+print("[OK] Pack binaire compile et lu par mmap")
+
+with open(tmp_catalogue, "w", encoding="utf-8") as f:
+    json.dump({"pokemons": [donnees_test, donnees_cara, dict(donnees_cara, numero=8, nom="Carabaffe")]}, f)
+with PackEspeces.ouvrir(tmp_catalogue, tmp_pack) as pack:
+    assert len(pack) == 3, "Pack recompile quand le JSON change"
+    assert pack[-1]["nom"] == "Carabaffe"
+print("[OK] Pack recompile apres modification du JSON")
+
+# Pack tronque (entete ou enregistrements) : refuse, puis recompile par ouvrir()
+with open(tmp_pack, "rb") as f:
+    brut_pack = f.read()
+for longueur in (10, len(brut_pack) - 40):
+    with open(tmp_pack, "wb") as f:
+        f.write(brut_pack[:longueur])
+    try:
+        PackEspeces(tmp_pack)
+        assert False, f"Pack tronque a {longueur} octets accepte"
+    except ValueError:
+        pass
+    with PackEspeces.ouvrir(tmp_catalogue, tmp_pack) as pack:
+        assert len(pack) == 3 and pack[-1]["nom"] == "Carabaffe"
+print("[OK] Pack tronque refuse et recompile")
+
+os.unlink(tmp_pack)
+os.unlink(tmp_catalogue)
+
+
+# =====================================================
+# TESTS EVOLUTION
+# =====================================================
+test_separator("TESTS EVOLUTION")
+
+from evolution import GrapheEvolution
+
+graphe = GrapheEvolution([donnees_test, dict(donnees_test, numero=5, nom="Reptincel",
+                                             evolution_id=6, evolution_niveau=36),
+                          dict(donnees_test, numero=6, nom="Dracaufeu", evolution_id=None,
+                               evolution_niveau=None), donnees_cara])
+assert graphe.get_suivant(4) == 5
+assert graphe.get_suivant(6) is None
+assert graphe.get_racine(6) == 4
+assert graphe.get_chaine(5) == (4, 5, 6)
+assert graphe.get_precedents(5) == (4,)
+assert graphe.get_chaine(7) == (7,), "Evolution absente du pool ignoree"
+assert graphe.especes_evoluant_avant(16) == [4]
+assert graphe.especes_evoluant_avant(40) == [4, 5]
+print("[OK] Graphe d'evolution (suivant, racine, chaine, par niveau)")
+
+try:
+    bulbi_evo = Pokemon.depuis_json(Pokemon.charger_tous()[0], niveau=16)
+    succes, msg = bulbi_evo.evoluer()
+    assert succes and bulbi_evo.nom == "Herbizarre", msg
+    herbi = Pokemon.depuis_json(Pokemon.charger_tous()[1], niveau=16)
+    assert bulbi_evo.attaque == herbi.attaque and bulbi_evo.pv == bulbi_evo.pv_max
+    assert GrapheEvolution.par_defaut().get_chaine(2) == (1, 2, 3)
+    print("[OK] Evolution par identifiant (sans donnees a fournir)")
+except FileNotFoundError:
+    print("[SKIP] pokemon.json non trouve (normal si pas dans le bon dossier)")
+
+
+# =====================================================
+# TESTS EQUIPE
+# =====================================================
+test_separator("TESTS EQUIPE")
+
+from equipe import OptimiseurEquipe
+
+couv_feu, faib_feu = OptimiseurEquipe.calculer_signature(["Feu"])
+assert OptimiseurEquipe.masque_vers_types(couv_feu) == ["Plante", "Glace", "Insecte", "Acier"]
+assert OptimiseurEquipe.masque_vers_types(faib_feu) == ["Eau", "Sol", "Roche"]
+print("[OK] Signature couverture/faiblesses")
+
+pool_test = [donnees_test, donnees_cara, {
+    "numero": 25, "nom": "Pikachu", "types": ["Electrik"],
+    "pv": 35, "attaque": 55, "defense": 40,
+    "attaque_speciale": 50, "defense_speciale": 50, "vitesse": 90,
+}]
+resultat_equipe = OptimiseurEquipe(pool_test).meilleure_equipe(2)
+noms_equipe = sorted(d["nom"] for d in resultat_equipe["equipe"])
+assert noms_equipe == ["Carapuce", "Salameche"], f"Equipe inattendue : {noms_equipe}"
+assert OptimiseurEquipe(pool_test).meilleure_equipe(4) is None
+print(f"[OK] Meilleure equipe de 2 : {noms_equipe}")
+
+try:
+    equipe_complete = OptimiseurEquipe().meilleure_equipe(6)
+    assert len(equipe_complete["equipe"]) == 6
+    assert len(equipe_complete["couverture"]) == 18
+    print(f"[OK] Equipe de 6 sur 1025 especes : couverture {len(equipe_complete['couverture'])}/18, "
+          f"{len(equipe_complete['faiblesses_communes'])} faiblesse(s) commune(s)")
+except FileNotFoundError:
+    print("[SKIP] pokemon.json non trouve (normal si pas dans le bon dossier)")
+
+
+# =====================================================
+# TESTS SIMULATION
+# =====================================================
+test_separator("TESTS SIMULATION")
+
+from simulation import estimer_victoire, intervalle_wilson
+
+bas, haut = intervalle_wilson(50, 100)
+assert bas < 0.5 < haut and abs((0.5 - bas) - (haut - 0.5)) < 1e-9
+assert intervalle_wilson(0, 10)[0] < 1e-12
+print("[OK] Intervalle de Wilson")
+
+estimation_1 = estimer_victoire(donnees_cara, 6, donnees_test, 10,
+                                nb_combats=600, graine=7, nb_processus=1, taille_lot=100)
+estimation_2 = estimer_victoire(donnees_cara, 6, donnees_test, 10,
+                                nb_combats=600, graine=7, nb_processus=2, taille_lot=100)
+assert estimation_1 == estimation_2, "Meme graine : meme resultat quel que soit le nombre de processus"
+assert estimation_1.combats == 600
+assert estimation_1.intervalle[0] <= estimation_1.taux_victoire <= estimation_1.intervalle[1]
+assert 0.5 < estimation_1.taux_victoire < 1, "Carapuce Niv.6 bat le plus souvent Salameche Niv.10"
+print(f"[OK] Estimation reproductible : {estimation_1.taux_victoire:.1%} de victoires, "
+      f"{estimation_1.tours_moyens:.1f} tours en moyenne")
+
+estimation_courte = estimer_victoire(donnees_cara, 6, donnees_test, 10, nb_combats=100000,
+                                     graine=7, nb_processus=2, taille_lot=100, demi_largeur=0.05)
+assert estimation_courte.combats < 100000
+assert (estimation_courte.intervalle[1] - estimation_courte.intervalle[0]) / 2 <= 0.05
+print(f"[OK] Arret anticipe apres {estimation_courte.combats} combats")
+
+# Test moteur vectorise : meme loi que le moteur scalaire (NumPy optionnel)
+try:
+    import random
+    from combat_vectorise import simuler_combats, JOUEUR, ADVERSE
+    from population import PokemonArray, CODES_STATUT
+
+    # Meme espece (egalite de vitesse), joueur empoisonne, adverse brule
+    n_vecto = 40000
+    joueurs_v = PokemonArray.depuis_especes([donnees_cara] * n_vecto, 12)
+    adverses_v = PokemonArray.depuis_especes([donnees_cara] * n_vecto, 12)
+    joueurs_v.statut[:] = CODES_STATUT[Statut.POISON]
+    adverses_v.statut[:] = CODES_STATUT[Statut.BRULURE]
+    resultat_v = simuler_combats(joueurs_v, adverses_v, graine=3)
+    assert ((resultat_v.vainqueur == JOUEUR) | (resultat_v.vainqueur == ADVERSE)).all()
+    assert (joueurs_v.pv == joueurs_v.pv_max).all(), "Les populations d'entree ne sont pas modifiees"
+
+    random.seed(3)
+    n_scalaire = 4000
+    victoires_s = 0
+    tours_s = 0
+    for _ in range(n_scalaire):
+        joueur_v = Pokemon.depuis_json(donnees_cara, niveau=12)
+        adverse_v = Pokemon.depuis_json(donnees_cara, niveau=12)
+        joueur_v.statut.appliquer_statut_principal(Statut.POISON, joueur_v.types)
+        adverse_v.statut.appliquer_statut_principal(Statut.BRULURE, adverse_v.types)
+        combat_v = Combat(joueur_v, adverse_v, silencieux=True)
+        victoires_s += combat_v.simuler_jusqu_a_fin() is joueur_v
+        tours_s += combat_v.tour
+
+    p_s = victoires_s / n_scalaire
+    p_v = float((resultat_v.vainqueur == JOUEUR).mean())
+    ecart_type = math.sqrt(p_s * (1 - p_s) / n_scalaire + p_v * (1 - p_v) / n_vecto)
+    assert abs(p_s - p_v) < 4 * ecart_type, f"Scalaire {p_s:.3f} vs vectorise {p_v:.3f}"
+    assert abs(tours_s / n_scalaire - float(resultat_v.tours.mean())) < 0.15
+    print(f"[OK] Moteur vectorise conforme au moteur scalaire "
+          f"({p_v:.1%} vs {p_s:.1%} de victoires)")
+except ImportError:
+    print("[SKIP] NumPy non installe (moteur vectorise)")
+
+
+# =====================================================
+# TESTS RNG
+# =====================================================
+test_separator("TESTS RNG")
+
+import random
+from rng import FluxAleatoire, np as numpy_rng
+
+flux_a = FluxAleatoire(42, taille_bloc=16)
+flux_b = FluxAleatoire(42, taille_bloc=16)
+tirages_a = [flux_a.random() for _ in range(100)]
+assert tirages_a == [flux_b.random() for _ in range(100)], "Meme graine : meme suite"
+assert all(0.0 <= x < 1.0 for x in tirages_a)
+assert tirages_a != [FluxAleatoire(43).random() for _ in range(100)]
+entiers = [flux_a.randint(1, 3) for _ in range(300)]
+assert set(entiers) == {1, 2, 3}
+# Blocs croissants : la suite ne depend pas de la taille des blocs
+flux_grand = FluxAleatoire(42)
+assert tirages_a == [flux_grand.random() for _ in range(100)]
+for graine_invalide in ("abc", -1, 1.5):
+    try:
+        FluxAleatoire(graine_invalide)
+        assert numpy_rng is None, f"Graine {graine_invalide!r} refusee des la construction"
+    except (TypeError, ValueError):
+        pass
+print("[OK] Flux aleatoire reproductible, par blocs")
+
+
+def combat_rejoue(graine):
+    """Combat non silencieux avec statuts et actions fixes, rejoue depuis une graine."""
+    joueur_r = Pokemon.depuis_json(donnees_cara, niveau=12)
+    adverse_r = Pokemon.depuis_json(donnees_test, niveau=12)
+    inv_r = Inventaire()
+    inv_r.creer_inventaire_depart()
+    combat_r = Combat(joueur_r, adverse_r, inv_r, graine=graine)
+    adverse_r.statut.appliquer_confusion(combat_r.rng)
+    joueur_r.statut.appliquer_statut_principal(Statut.PARALYSIE, joueur_r.types, combat_r.rng)
+    messages_r = []
+    actions = [(Combat.ACTION_CAPTURE, POKE_BALL), (Combat.ACTION_OBJET, POTION)]
+    while not combat_r.termine and combat_r.tour < 40:
+        action = actions[combat_r.tour] if combat_r.tour < len(actions) else (None, None)
+        messages_r.append(combat_r.jouer_action(*action))
+    return messages_r, combat_r.log.evenements(), joueur_r.capturer_etat(), adverse_r.capturer_etat()
+
+
+# Les tirages globaux ne doivent pas influencer un combat avec son propre flux
+random.seed(1)
+rejeu_1 = combat_rejoue(2024)
+random.seed(2)
+rejeu_2 = combat_rejoue(2024)
+assert rejeu_1 == rejeu_2, "Meme graine et memes actions : combat identique"
+assert any(combat_rejoue(g) != rejeu_1 for g in (1, 2, 3))
+print(f"[OK] Combat rejoue a l'identique depuis sa graine ({len(rejeu_1[1])} evenements)")
+
+# Copie et pickle d'un combat en cours : le flux reprend au meme tirage
+import copy
+import pickle
+
+for graine_c in (7, None):
+    combat_c = Combat(Pokemon.depuis_json(donnees_cara, niveau=12),
+                      Pokemon.depuis_json(donnees_test, niveau=12), rng=FluxAleatoire(graine_c, taille_bloc=16))
+    combat_c.tour_attaque()
+    copies_c = [copy.deepcopy(combat_c), pickle.loads(pickle.dumps(combat_c))]
+    suite_c = [combat_c.rng.random() for _ in range(200)]
+    for copie_c in copies_c:
+        assert copie_c.rng.nb_tirages == combat_c.rng.nb_tirages - 200
+        assert [copie_c.rng.random() for _ in range(200)] == suite_c
+print("[OK] Combat copie et picklable, flux repris au meme tirage")
+
+
+# =====================================================
+# TESTS CALCUL DEGATS
+# =====================================================
+test_separator("TESTS CALCUL DEGATS")
+
+from fractions import Fraction
+from calcul_degats import CalculDegats
+
+attaquant_d = Pokemon.depuis_json(donnees_cara, niveau=20)
+defenseur_d = Pokemon.depuis_json(donnees_test, niveau=20)
+attaquant_d.statut.appliquer_statut_principal(Statut.BRULURE, attaquant_d.types)
+loi_degats = attaquant_d.distribution_degats(defenseur_d)
+assert abs(sum(p for _, p in loi_degats) - 1) < 1e-12
+assert loi_degats[0] == (0, 0.1), "10% d'attaques ratees"
+assert CalculDegats.distribution(20, 50, 50, 0) == ((0, 0.1), (1, 0.9)), "Immunite : 1 degat minimum"
+
+# Comparaison avec des tirages de Pokemon.resoudre_attaque
+flux_d = FluxAleatoire(5)
+n_tirages = 40000
+frequences = {}
+for _ in range(n_tirages):
+    defenseur_d.pv = defenseur_d.pv_max
+    degats_d = 0 if flux_d.random() < 0.10 else attaquant_d.resoudre_attaque(defenseur_d, rng=flux_d).degats
+    frequences[degats_d] = frequences.get(degats_d, 0) + 1
+ecart_total = sum(abs(frequences.get(d, 0) / n_tirages - p) for d, p in loi_degats) / 2
+assert ecart_total < 0.02, f"Ecart avec l'echantillonnage : {ecart_total:.4f}"
+assert set(frequences) <= {d for d, _ in loi_degats}
+print(f"[OK] Distribution exacte des degats ({len(loi_degats)} valeurs, ecart {ecart_total:.4f})")
+
+# probabilite_agir contre Statut.peut_agir (reveil et degel sans jet de confusion)
+statut_d = Statut()
+for etat_d, attendu_d in (((Statut.GEL, 0, True, 3), Fraction(20, 100)),
+                          ((Statut.SOMMEIL, 1, True, 3), Fraction(1)),
+                          ((Statut.SOMMEIL, 2, True, 3), Fraction(0)),
+                          ((Statut.PARALYSIE, 0, True, 3), Fraction(75, 100) * Fraction(67, 100))):
+    statut_d.restaurer_etat(etat_d)
+    assert CalculDegats.probabilite_agir(statut_d) == attendu_d, etat_d
+    agit_d = 0
+    for _ in range(20000):
+        statut_d.restaurer_etat(etat_d)
+        agit_d += statut_d.peut_agir(flux_d)[0]
+    assert abs(agit_d / 20000 - attendu_d) < 0.015, (etat_d, agit_d / 20000)
+print("[OK] Probabilite d'agir conforme a Statut.peut_agir (gel, sommeil, confusion)")
+
+defenseur_d.pv = defenseur_d.pv_max
+probas_ko = CalculDegats.probabilites_ko(attaquant_d, defenseur_d, 6)
+assert all(p1 <= p2 for p1, p2 in zip(probas_ko, probas_ko[1:]))
+assert abs(CalculDegats.probabilite_ko(attaquant_d, defenseur_d, 1, pv=1) - 0.9) < 1e-12
+assert CalculDegats.probabilite_ko(attaquant_d, defenseur_d, 3) == probas_ko[2]
+assert CalculDegats.distribution.cache_info().hits > 0, "Distributions memoisees"
+print(f"[OK] Probabilites de KO en 1..6 coups : {[round(p, 3) for p in probas_ko]}")
+
+
+# =====================================================
+# TESTS SOLVEUR
+# =====================================================
+test_separator("TESTS SOLVEUR")
+
+from solveur import SolveurCombat
+
+
+def preparer_duel():
+    """Carapuce paralyse et confus contre Salameche endormi pour 2 tours."""
+    joueur_m = Pokemon.depuis_json(donnees_cara, niveau=12)
+    adverse_m = Pokemon.depuis_json(donnees_test, niveau=13)
+    joueur_m.statut.statut_principal = Statut.PARALYSIE
+    joueur_m.statut.confusion = True
+    joueur_m.statut.tours_confusion = 3
+    adverse_m.statut.statut_principal = Statut.SOMMEIL
+    adverse_m.statut.tours_restants = 2
+    return joueur_m, adverse_m
+
+
+SolveurCombat.vider_tables()
+joueur_m, adverse_m = preparer_duel()
+solveur = SolveurCombat(joueur_m, adverse_m)
+p_exacte = solveur.probabilite_victoire()
+assert 0 < p_exacte < 1
+nb_noeuds = len(solveur.table)
+
+flux_m = FluxAleatoire(11)
+n_combats_m = 20000
+victoires_m = 0
+for _ in range(n_combats_m):
+    joueur_m, adverse_m = preparer_duel()
+    combat_m = Combat(joueur_m, adverse_m, silencieux=True, capacite_journal=0, rng=flux_m)
+    victoires_m += combat_m.simuler_jusqu_a_fin() is joueur_m
+p_simulee = victoires_m / n_combats_m
+ecart_type_m = math.sqrt(p_exacte * (1 - p_exacte) / n_combats_m)
+assert abs(p_simulee - p_exacte) < 4 * ecart_type_m, f"Exact {p_exacte:.4f} vs simule {p_simulee:.4f}"
+print(f"[OK] Probabilite exacte {p_exacte:.4f} (simulation : {p_simulee:.4f})")
+
+# Meme duel : la table de transposition est reutilisee
+autre_solveur = SolveurCombat(*preparer_duel())
+assert autre_solveur.table is solveur.table
+assert autre_solveur.probabilite_victoire() == p_exacte
+assert len(autre_solveur.table) == nb_noeuds
+etat_milieu = (joueur_m.pv_max // 2, adverse_m.pv_max // 2, (None, 0, False, 0), (None, 0, False, 0))
+assert 0 <= autre_solveur.probabilite_victoire(etat_milieu) <= 1
+print(f"[OK] Table de transposition partagee ({nb_noeuds} noeuds)")
+
+
+# =====================================================
+# TESTS TOURNOI
+# =====================================================
+test_separator("TESTS TOURNOI")
+
+try:
+    from tournoi import Tournoi
+
+    especes_t = Catalogue.get().get_especes()[:12]
+    with tempfile.TemporaryDirectory() as dossier_t:
+        dossier_a = os.path.join(dossier_t, "interrompu")
+        tournoi_a = Tournoi(dossier_a, niveau=15, nb_combats=10, graine=4, especes=especes_t)
+        partiel = tournoi_a.executer(nb_processus=2, lignes_par_tache=2, limite_lignes=5)
+        assert partiel.paires_jouees == 5 * 12
+        assert len(tournoi_a.lignes_restantes()) == 7 and not tournoi_a.est_termine()
+        del tournoi_a
+
+        # Reprise depuis les fichiers : seules les lignes manquantes sont jouees
+        tournoi_a = Tournoi(dossier_a, niveau=15, nb_combats=10, graine=4, especes=especes_t)
+        reprise = tournoi_a.executer(nb_processus=2, lignes_par_tache=2)
+        assert reprise.paires_jouees == 7 * 12 and tournoi_a.est_termine()
+
+        tournoi_b = Tournoi(os.path.join(dossier_t, "complet"), niveau=15, nb_combats=10,
+                            graine=4, especes=especes_t)
+        complet = tournoi_b.executer(nb_processus=1)
+        assert (complet.matrice == reprise.matrice).all(), "Reprise identique a un tournoi complet"
+        assert ((complet.matrice >= 0) & (complet.matrice <= 1)).all()
+
+        classement_t = complet.classement
+        assert len(classement_t) == 12
+        assert all(a[2] >= b[2] for a, b in zip(classement_t, classement_t[1:]))
+        assert complet.paires_par_seconde_par_coeur > 0
+
+        try:
+            Tournoi(dossier_a, niveau=20, nb_combats=10, graine=4, especes=especes_t)
+            assert False, "Parametres differents : erreur attendue"
+        except ValueError:
+            pass
+
+        # Tout le Catalogue : les processus lisent les especes dans le pack
+        tournoi_p = Tournoi(os.path.join(dossier_t, "pack"), niveau=15, nb_combats=2, graine=4)
+        tournoi_c = Tournoi(os.path.join(dossier_t, "catalogue"), niveau=15, nb_combats=2,
+                            graine=4, especes=Catalogue.get().get_especes())
+        assert tournoi_p.especes == tournoi_c.especes
+        ligne_p = tournoi_p.executer(nb_processus=2, limite_lignes=1).matrice[0]
+        ligne_c = tournoi_c.executer(nb_processus=1, limite_lignes=1).matrice[0]
+        assert (ligne_p == ligne_c).all(), "Memes resultats avec le pack des especes"
+    print(f"[OK] Tournoi 12x12 reprenable, premier : {classement_t[0][1]} "
+          f"({complet.paires_par_seconde:.0f} paires/s)")
+except ImportError:
+    print("[SKIP] NumPy non installe (tournoi)")
+
+
+# =====================================================
+# TESTS SERVEUR
+# =====================================================
+test_separator("TESTS SERVEUR")
+
+import asyncio
+from serveur import ServeurCombats, ouvrir_connexion, generer_charge, centile
+
+serveur_c = ServeurCombats(max_sessions=3, delai_inactivite=60)
+demande = {"id": 1, "joueur": "sacha", "action": "combat", "espece": "Carapuce", "niveau": 12,
+           "espece_adverse": "Salameche", "niveau_adverse": 12, "graine": 8}
+reponse_c = serveur_c.traiter(demande)
+assert reponse_c["ok"] and reponse_c["id"] == 1 and reponse_c["etat"]["tour"] == 0
+reponse_c = serveur_c.traiter({"joueur": "sacha", "action": "capture", "objet": "Poke Ball"})
+assert reponse_c["ok"] and reponse_c["messages"]
+etat_c = serveur_c.traiter({"joueur": "sacha", "action": "etat"})
+assert etat_c["inventaire"]["Poke Ball"] == 19, "La ball est consommee dans l'inventaire de la session"
+assert etat_c["pokedex"]["vus"] == 1
+assert not serveur_c.traiter({"joueur": "sacha", "action": "objet", "objet": "Poke Ball"})["ok"]
+assert not serveur_c.traiter({"joueur": "sacha", "action": "danse"})["ok"]
+assert not serveur_c.traiter({"joueur": "ondine", "action": "attaque"})["ok"]
+print("[OK] Sessions : combat, capture, inventaire et Pokedex par joueur")
+
+# Requetes invalides : refusees sans casser la session
+serveur_e = ServeurCombats()
+for champs in ({"graine": "abc"}, {"graine": -1}, {"graine": 1.5}, {"graine": True},
+               {"niveau": -5}, {"niveau": 0}, {"niveau_adverse": 1000}):
+    reponse_e = serveur_e.traiter(dict(demande, **champs))
+    assert not reponse_e["ok"] and "invalide" in reponse_e["erreur"], champs
+assert serveur_e.get_session("sacha").combat is None
+assert serveur_e.traiter(demande)["ok"]
+assert not serveur_e.traiter({"joueur": "sacha", "action": "capture", "objet": ["x"]})["ok"]
+assert serveur_e.traiter({"joueur": "sacha", "action": "attaque"})["ok"]
+serveur_e.get_session("sacha").combat = object()
+assert serveur_e.traiter({"id": 7, "joueur": "sacha", "action": "attaque"}) == {
+    "id": 7, "ok": False, "erreur": "Erreur interne : AttributeError"}
+print("[OK] Requetes invalides refusees (graine, niveau, objet, erreur interne)")
+
+# Meme graine et memes actions : meme combat
+etats_rejoues = []
+for _ in range(2):
+    serveur_d = ServeurCombats()
+    serveur_d.traiter(demande)
+    etats_rejoues.append([serveur_d.traiter({"joueur": "sacha", "action": "attaque"})
+                          for _ in range(3)])
+assert etats_rejoues[0] == etats_rejoues[1]
+
+# Expulsion : la moins recemment utilisee au-dela de max_sessions, puis les inactives
+for nom in ("ondine", "pierre", "sacha", "regis"):
+    serveur_c.traiter({"joueur": nom, "action": "etat"})
+assert list(serveur_c.sessions) == ["pierre", "sacha", "regis"], "ondine expulsee (LRU)"
+serveur_c.sessions["pierre"].derniere_activite -= 120
+assert serveur_c.expulser_inactives() == 1 and "pierre" not in serveur_c.sessions
+assert serveur_c.traiter({"joueur": "sacha", "action": "etat"})["etat"] is not None
+print("[OK] Expulsion des sessions (LRU et inactivite)")
+
+
+async def dialogue_serveur():
+    """Un joueur et un spectateur abonne, sur TCP."""
+    serveur_reseau = ServeurCombats()
+    serveur_tcp = await serveur_reseau.demarrer(port=0)
+    port = serveur_tcp.sockets[0].getsockname()[1]
+    async with serveur_tcp:
+        lecteur_s, ecrivain_s = await ouvrir_connexion(port=port)
+        ecrivain_s.write(b'{"id": 0, "joueur": "sacha", "action": "suivre"}\n')
+        assert json.loads(await lecteur_s.readline())["ok"]
+
+        lecteur_j, ecrivain_j = await ouvrir_connexion(port=port)
+        ecrivain_j.write(json.dumps(demande).encode() + b"\n")
+        ecrivain_j.write(b"pas du json\n")
+        ecrivain_j.write(b'{"id": 2, "joueur": "sacha", "action": "attaque"}\n')
+        reponses = [json.loads(await lecteur_j.readline()) for _ in range(3)]
+        assert [r["ok"] for r in reponses] == [True, False, True]
+        diffusions = [json.loads(await lecteur_s.readline()) for _ in range(2)]
+        assert diffusions[1]["etat"] == reponses[2]["etat"], "Le spectateur recoit chaque etat"
+
+        for ecrivain in (ecrivain_s, ecrivain_j):
+            ecrivain.close()
+            await ecrivain.wait_closed()
+        charge = await generer_charge(nb_clients=20, nb_actions=20, port=port)
+        serveur_reseau.arreter()
+    return charge
+
+
+charge = asyncio.run(dialogue_serveur())
+assert charge["actions"] == 400 and 0 < charge["p50"] <= charge["p99"]
+assert centile([1, 2, 3, 4], 50) == 2 and centile([1, 2, 3, 4], 99) == 4
+print(f"[OK] Serveur TCP, abonnement et charge (p50 {charge['p50']:.2f} ms, "
+      f"p99 {charge['p99']:.2f} ms)")
+
+
+# =====================================================
+# TESTS REPLAY
+# =====================================================
+test_separator("TESTS REPLAY")
+
+from replay import (
+    Enregistreur, FichierReplays, encoder, decoder, decoder_action, rejouer,
+    avancer_jusqu_au_tour,
+)
+
+
+def resume_combat(combat):
+    """Etat comparable de deux combats distincts (le vainqueur est un objet Pokemon)."""
+    return (combat.capturer_etat()._replace(vainqueur=None),
+            combat.vainqueur is combat.pokemon_joueur, combat.vainqueur is None)
+
+
+# Les replays recreent les Pokemon depuis le Catalogue
+especes_r = (Catalogue.get().get_par_numero(7), Catalogue.get().get_par_numero(8))
+
+
+def combat_enregistre(graine):
+    """Combat non silencieux joue avec des actions variees, et son enregistreur."""
+    inv_e = Inventaire()
+    inv_e.creer_inventaire_depart()
+    combat_e = Combat(Pokemon.depuis_json(especes_r[0], niveau=30),
+                      Pokemon.depuis_json(especes_r[1], niveau=30), inv_e, graine=graine)
+    enregistreur = Enregistreur(combat_e)
+    actions_e = [(Combat.ACTION_OBJET, POTION), (Combat.ACTION_CAPTURE, POKE_BALL)]
+    while not combat_e.termine:
+        enregistreur.jouer_action(*actions_e[combat_e.tour % 7 - 5] if combat_e.tour % 7 >= 5 else ())
+    return combat_e, enregistreur
+
+
+combat_e, enregistreur = combat_enregistre(77)
+enregistrement = enregistreur.enregistrement(1)
+assert decoder(encoder(enregistrement)) == enregistrement
+for silencieux_e in (True, False):
+    assert resume_combat(rejouer(enregistrement, silencieux_e)) == resume_combat(combat_e)
+assert list(rejouer(enregistrement, silencieux=False).log) == list(combat_e.log), "Journal regenere"
+taille_texte = len("\n".join(combat_e.log).encode())
+print(f"[OK] Rejeu identique ({len(enregistrement.actions)} actions, "
+      f"{len(encoder(enregistrement))} octets contre {taille_texte} pour le journal)")
+
+tour_cible = len(enregistrement.actions) // 2
+combat_t, jouees = avancer_jusqu_au_tour(enregistrement, tour_cible)
+assert combat_t.tour == tour_cible and not combat_t.silencieux
+for code in enregistrement.actions[jouees:]:
+    combat_t.jouer_action(*decoder_action(code))
+assert resume_combat(combat_t) == resume_combat(combat_e)
+try:
+    Enregistreur(Combat(Pokemon.depuis_json(especes_r[0], niveau=5),
+                        Pokemon.depuis_json(especes_r[1], niveau=5)))
+    assert False, "Un combat sans graine ne peut pas etre enregistre"
+except ValueError:
+    pass
+print(f"[OK] Avance rapide jusqu'au tour {tour_cible} puis reprise")
+
+with tempfile.TemporaryDirectory() as dossier_r:
+    chemin_r = os.path.join(dossier_r, "combats.rpl")
+    fichier_r = FichierReplays(chemin_r)
+    enregistrements = [combat_enregistre(g)[1].enregistrement(100 + g) for g in range(20)]
+    for enr in enregistrements:
+        fichier_r.ajouter(enr)
+    assert FichierReplays(chemin_r).lire(107) == enregistrements[7]
+
+    # Index perdu ou incomplet : reconstruit depuis le fichier de donnees
+    with open(chemin_r + ".idx", "r+b") as f:
+        f.truncate(5 * 16 + 3)
+    fichier_r = FichierReplays(chemin_r)
+    assert len(fichier_r) == 20 and fichier_r.lire(119) == enregistrements[19]
+    os.remove(chemin_r + ".idx")
+    fichier_r = FichierReplays(chemin_r)
+    assert sorted(fichier_r) == [100 + g for g in range(20)] and 105 in fichier_r
+    # Enregistrement tronque (ecriture interrompue) : coupe avant les ajouts suivants
+    for index_perdu in (False, True):
+        chemin_t = os.path.join(dossier_r, f"tronque_{index_perdu}.rpl")
+        fichier_t = FichierReplays(chemin_t)
+        fichier_t.ajouter(enregistrements[1])
+        with open(chemin_t, "ab") as f:
+            f.write(b"\x40\x00")
+        fichier_t = FichierReplays(chemin_t)
+        for enr in enregistrements[2:4]:
+            fichier_t.ajouter(enr)
+        if index_perdu:
+            os.remove(chemin_t + ".idx")
+        fichier_t = FichierReplays(chemin_t)
+        assert sorted(fichier_t) == [101, 102, 103], sorted(fichier_t)
+        assert fichier_t.lire(103) == enregistrements[3]
+print("[OK] Fichier de replays en ajout seul, index reconstruit")
+
+# Version des regles et generateur : un replay d'une autre version est refuse
+import replay
+ancien_r = enregistrement._replace(version=replay.VERSION - 1)
+for lecture in (lambda: decoder(encoder(ancien_r)), lambda: rejouer(ancien_r),
+                lambda: rejouer(enregistrement._replace(generateur=1 - replay.GENERATEUR))):
+    try:
+        lecture()
+        assert False, "Version differente refusee"
+    except ValueError:
+        pass
+print(f"[OK] Replays refuses d'une autre version (version {replay.VERSION})")
+
+
+# =====================================================
+# TESTS IA
+# =====================================================
+test_separator("TESTS IA")
+
+import time
+from ia import IACombat
+from inventaire import SUPER_POTION
+
+
+def duel_ia(graine):
+    """Carapuce Niv.30 contre Carabaffe Niv.31 : perdu d'avance en attaquant seulement."""
+    inv_ia = Inventaire()
+    inv_ia.creer_inventaire_depart()
+    return Combat(Pokemon.depuis_json(especes_r[0], niveau=30),
+                  Pokemon.depuis_json(especes_r[1], niveau=31), inv_ia,
+                  silencieux=True, graine=graine)
+
+
+ia = IACombat(valeur_capture=0.0)
+combat_ia = duel_ia(0)
+assert set(ia.evaluer_actions(combat_ia, 1)) == {(Combat.ACTION_ATTAQUE, None)} | {
+    (Combat.ACTION_CAPTURE, ball) for ball, _ in combat_ia.inventaire.get_balls()
+}, "Pas de soin a PV pleins"
+combat_ia.pokemon_joueur.pv = 5
+valeurs_ia = ia.evaluer_actions(combat_ia, 2)
+assert valeurs_ia[(Combat.ACTION_OBJET, SUPER_POTION)] > valeurs_ia[(Combat.ACTION_ATTAQUE, None)]
+assert all(0.0 <= v <= 1.0 for v in valeurs_ia.values())
+
+# La probabilite de capture correspond aux tirages de Capture.resoudre_capture
+adverse_ia = combat_ia.pokemon_adverse
+adverse_ia.pv = adverse_ia.pv_max // 3
+ia._preparer(combat_ia)
+p_capture = ia._probabilite_capture(POKE_BALL, adverse_ia.pv, (Statut.SOMMEIL, 2, False, 0), False)
+adverse_ia.statut.appliquer_statut_principal(Statut.SOMMEIL, adverse_ia.types)
+flux_ia = FluxAleatoire(3)
+n_lancers = 20000
+captures = sum(
+    Capture.resoudre_capture(adverse_ia, POKE_BALL, combat_ia.inventaire, tour_combat=2, rng=flux_ia)[0]
+    for _ in range(n_lancers)
+)
+assert abs(captures / n_lancers - p_capture) < 4 * math.sqrt(p_capture * (1 - p_capture) / n_lancers)
+print(f"[OK] Valeur des actions et probabilite de capture ({p_capture:.3f})")
+
+victoires_ia = 0
+durees = []
+for graine in range(3):
+    combat_ia = duel_ia(graine)
+    while not combat_ia.termine:
+        debut = time.perf_counter()
+        action_ia = ia.choisir_action(combat_ia)
+        durees.append(time.perf_counter() - debut)
+        combat_ia.jouer_action(*action_ia)
+    victoires_ia += combat_ia.vainqueur is combat_ia.pokemon_joueur
+    # Sans IA (attaque seule), le meme duel est perdu
+    combat_seul = duel_ia(graine)
+    assert combat_seul.simuler_jusqu_a_fin() is not combat_seul.pokemon_joueur
+assert victoires_ia >= 2, "L'IA gere ses potions pour gagner"
+# L'horloge est lue a chaque noeud : le depassement se limite au dernier noeud
+# evalue, la marge ne couvre que la charge de la machine
+assert max(durees) < 2 * ia.budget, f"Budget depasse : {max(durees) * 1000:.0f} ms"
+print(f"[OK] IA : {victoires_ia}/3 victoires, decisions en {max(durees) * 1000:.0f} ms au plus "
+      f"(profondeur {ia.profondeur_atteinte})")
+
+
+# =====================================================
+# TESTS PROFILAGE
+# =====================================================
+test_separator("TESTS PROFILAGE")
+
+from profilage import Profileur
+
+peut_agir_original = Statut.__dict__["peut_agir"]
+multiplicateur_original = TypeChart.__dict__["get_multiplicateur_attaque"]
+profileur = Profileur()
+with profileur:
+    assert Statut.__dict__["peut_agir"] is not peut_agir_original
+    for graine in range(20):
+        combat_p = combat_enregistre(graine)[0]
+    try:
+        combat_p.jouer_action("danse")
+    except ValueError:
+        pass
+    combat_s = Combat(Pokemon.depuis_json(especes_r[0], niveau=10),
+                      Pokemon.depuis_json(especes_r[1], niveau=10), silencieux=True, graine=1)
+    combat_s.simuler_jusqu_a_fin()
+assert Statut.__dict__["peut_agir"] is peut_agir_original, "Methodes originales remises"
+assert TypeChart.__dict__["get_multiplicateur_attaque"] is multiplicateur_original
+
+appels_p = profileur.appels
+assert appels_p["Statut.peut_agir"] == appels_p["Pokemon.resoudre_attaque"]
+assert appels_p["Combat.jouer_action"] == sum(len(combat_enregistre(g)[1].actions) for g in range(20)) + 1
+assert appels_p["Combat._tour_attaque_silencieux"] == combat_s.tour
+assert not profileur._pile, "Pile videe meme apres une exception"
+for nom, propre in profileur.propre.items():
+    assert 0 <= propre <= profileur.inclusif[nom]
+assert profileur.par_phase()["capture"][0] > 0 and "Statut.peut_agir" in profileur.rapport()
+lignes_piles = profileur.piles_repliees()
+assert sum(int(ligne.rsplit(" ", 1)[1]) for ligne in lignes_piles) == sum(profileur.propre.values())
+assert any(ligne.startswith("Combat.jouer_action;Combat.tour_attaque;") for ligne in lignes_piles)
+print(f"[OK] Profilage par phase ({sum(appels_p.values())} appels, {len(lignes_piles)} piles)")
+
+
+# =====================================================
+# TESTS BENCHMARKS
+# =====================================================
+test_separator("TESTS BENCHMARKS")
+
+import benchmarks
+
+mesures_b = benchmarks.executer_benchmarks(["multiplicateur_type", "tenter_capture"],
+                                          repetitions=1, echelle=0.01)
+assert list(mesures_b) == ["etalon", "multiplicateur_type", "tenter_capture"], "Etalon toujours mesure"
+for mesure in mesures_b.values():
+    assert mesure["operations"] >= 1 and mesure["ns_par_operation"] > 0
+assert {"date", "python", "plateforme", "coeurs", "commit"} <= set(benchmarks.infos_machine())
+
+def mesure_b(ns):
+    return {"ns_par_operation": ns}
+
+reference_b = {"etalon": mesure_b(100), "a": mesure_b(1000), "b": mesure_b(1000)}
+# Machine deux fois plus lente : seul "b" ralentit vraiment (+50 %)
+actuel_b = {"etalon": mesure_b(200), "a": mesure_b(2000), "b": mesure_b(3000), "nouveau": mesure_b(5)}
+comparaison_b = {nom: (ratio, regression)
+                 for nom, ratio, regression in benchmarks.comparer(actuel_b, reference_b, 0.20)}
+assert set(comparaison_b) == {"a", "b"}, "Etalon et benchmarks absents de la baseline ignores"
+assert comparaison_b["a"] == (1.0, False) and comparaison_b["b"] == (1.5, True)
+brut_b = dict((nom, regression) for nom, _, regression
+              in benchmarks.comparer(actuel_b, reference_b, 0.20, normaliser=False))
+assert brut_b == {"etalon": True, "a": True, "b": True}
+
+# Nettoyage des benchmarks et baseline exigee
+import argparse
+import contextlib
+import io
+dossiers_tmp = set(os.listdir(tempfile.gettempdir()))
+benchmarks.executer_benchmarks(["pokedex_sauvegarder_charger"], repetitions=1, echelle=0.1)
+assert set(os.listdir(tempfile.gettempdir())) <= dossiers_tmp, "Dossier temporaire supprime"
+with tempfile.TemporaryDirectory() as dossier_b:
+    arguments_b = argparse.Namespace(
+        benchmarks=["multiplicateur_type"], repetitions=1, echelle=0.01, seuil=0.20,
+        baseline=os.path.join(dossier_b, "baseline.json"), enregistrer_baseline=False,
+        exiger_baseline=False, sans_normalisation=False, sortie=None,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert benchmarks._principal(arguments_b) == 0
+        arguments_b.exiger_baseline = True
+        assert benchmarks._principal(arguments_b) == 1, "Baseline manquante : erreur"
+        arguments_b.enregistrer_baseline = True
+        assert benchmarks._principal(arguments_b) == 0
+        arguments_b.enregistrer_baseline = False
+        arguments_b.seuil = 100.0
+        assert benchmarks._principal(arguments_b) == 0
+print("[OK] Benchmarks : mesures, comparaison normalisee par l'etalon")
+
+
+# =====================================================
+# TESTS CAPTURE EXACTE
+# =====================================================
+test_separator("TESTS CAPTURE EXACTE")
+
+# Meme resultat que l'ancien calcul : (ceil(b) / 65536)^4
+for taux_c, ratio_c in ((3, 1 / 3), (45, 0.5), (190, 0.9), (255, 1 / 3)):
+    b_c = 65536 / ((255 / (ratio_c * taux_c)) ** 0.1875)
+    attendu_c = (min(65536, math.ceil(b_c)) / 65536) ** 4
+    assert abs(Capture.probabilite_capture(taux_c, 1.0, 1.0, ratio_c) - attendu_c) < 1e-12
+assert Capture.probabilite_capture(3, 255) == 1.0, "Master Ball garantie"
+assert Capture.probabilite_capture(255, 1.0, 2.5, 1.0) == 1.0, "a >= 255 garanti"
+assert Capture.calculer_probabilite(poke_plein, 1.0) == round(
+    100 * Capture.probabilite_capture(poke_plein.taux_capture, 1.0, 1.0, 1 / 3), 1)
+
+# Un seul tirage par lancer, et loi exacte du nombre de secousses
+class FluxCompte(FluxAleatoire):
+    tirages = 0
+
+    def __init__(self, graine):
+        super().__init__(graine)
+        tirer = self.random
+
+        def compter():
+            FluxCompte.tirages += 1
+            return tirer()
+        self.random = compter
+
+cible_c = Pokemon.depuis_json(Catalogue.get().get_par_numero(7), niveau=20)
+cible_c.pv = cible_c.pv_max // 2
+flux_c = FluxCompte(5)
+n_c = 40000
+comptes_c = [0] * 5
+for _ in range(n_c):
+    capture_c, secousses_c = Capture.resoudre_capture(cible_c, POKE_BALL, inv_capture, rng=flux_c)
+    assert capture_c == (secousses_c == 4)
+    comptes_c[secousses_c] += 1
+assert FluxCompte.tirages == n_c, "Un seul appel au generateur par lancer"
+ratio_c = (3 * cible_c.pv_max - 2 * cible_c.pv) / (3 * cible_c.pv_max)
+p_c = Capture.probabilite_capture(cible_c.taux_capture, 1.0, 1.0, ratio_c) ** 0.25
+for k in range(5):
+    attendu_k = p_c ** k * (1 - p_c) if k < 4 else p_c ** 4
+    assert abs(comptes_c[k] / n_c - attendu_k) < 4 * math.sqrt(attendu_k * (1 - attendu_k) / n_c) + 1e-9
+
+# Cache : un meme ratio de PV (PV max differents, PV pleins) reutilise la meme entree
+Capture._loi_secousses.cache_clear()
+poke_c1 = Pokemon.depuis_json(donnees_test, niveau=5)
+poke_c2 = Pokemon.depuis_json(donnees_test, niveau=50)
+assert Capture.calculer_probabilite(poke_c1, 1.5) == Capture.calculer_probabilite(poke_c2, 1.5)
+assert Capture._loi_secousses.cache_info().hits == 1
+print(f"[OK] Capture exacte : loi des secousses en un tirage ({comptes_c[4] / n_c:.3f} captures)")
+
+
 # =====================================================
 # RESUME
 # =====================================================
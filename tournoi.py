@@ -0,0 +1,222 @@
+"""
+Module Tournoi - Tournoi toutes especes contre toutes, parallele et reprenable.
+Chaque ligne de la matrice (une espece contre toutes les autres) est jouee
+avec le moteur vectorise, par paquets de lignes repartis sur un
+ProcessPoolExecutor. Les resultats sont ecrits au fur et a mesure dans une
+matrice sur disque (.npy projete en memoire) avec un drapeau par ligne
+terminee : un tournoi interrompu reprend la ou il s'etait arrete.
+
+Pour un tournoi sur tout le Catalogue, chaque processus ouvre le pack binaire
+des especes (PackEspeces, projete en memoire et partage entre processus) a
+son demarrage : les taches n'ont plus a transporter les 1025 especes.
+"""
+
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from combat_vectorise import simuler_combats, JOUEUR
+from pack_especes import PackEspeces
+from population import PokemonArray
+
+
+# Resultat d'un tournoi (voir Tournoi.executer)
+# matrice[i, j] : taux de victoire de l'espece i contre l'espece j
+# classement : liste de (numero, nom, taux moyen) triee par taux decroissant
+ResultatTournoi = namedtuple("ResultatTournoi", [
+    "matrice", "classement", "paires_jouees", "duree",
+    "paires_par_seconde", "paires_par_seconde_par_coeur",
+])
+
+
+FICHIER_META = "tournoi.json"
+FICHIER_MATRICE = "matrice.npy"
+FICHIER_FAIT = "lignes_faites.npy"
+
+# Population de toutes les especes, construite une fois par processus
+_population = None
+# Pack des especes, ouvert au demarrage d'un processus (voir _ouvrir_pack)
+_pack = None
+
+
+def _ouvrir_pack(chemin_json=None):
+    """Initialisation d'un processus de travail : ouvre le pack des especes."""
+    global _pack
+    _pack = PackEspeces.ouvrir(chemin_json)
+
+
+def _population_especes(especes, niveau):
+    global _population
+    if especes is None:
+        cle = ("pack", _pack.signature_json, niveau)
+    else:
+        cle = (tuple(donnees["numero"] for donnees in especes), niveau)
+    if _population is None or _population[0] != cle:
+        especes = list(_pack) if especes is None else especes
+        _population = (cle, PokemonArray.depuis_especes(especes, niveau))
+    return _population[1]
+
+
+def jouer_lignes(lignes, especes, niveau, nb_combats, graine):
+    """
+    Joue les lignes `lignes` de la matrice (execute dans un processus de travail).
+    `especes` : liste de dicts pokemon.json, ou None pour les especes du pack
+    ouvert par _ouvrir_pack.
+    Retourne une liste de (ligne, taux de victoire contre chaque espece).
+    """
+    toutes = _population_especes(especes, niveau)
+    n = len(toutes)
+    adversaires = np.tile(np.arange(n), nb_combats)
+    resultats = []
+    for ligne in lignes:
+        rng = np.random.default_rng([graine, ligne])
+        joueurs = toutes[np.full(n * nb_combats, ligne)]
+        resultat = simuler_combats(joueurs, toutes[adversaires], graine=rng)
+        victoires = (resultat.vainqueur == JOUEUR).reshape(nb_combats, n)
+        resultats.append((ligne, victoires.mean(axis=0, dtype=np.float64).astype(np.float32)))
+    return resultats
+
+
+class Tournoi:
+    """Tournoi toutes especes contre toutes, stocke dans un dossier."""
+
+    def __init__(self, dossier, niveau=50, nb_combats=20, graine=0, especes=None):
+        """
+        Args:
+            dossier: dossier des fichiers du tournoi (cree si besoin)
+            niveau: niveau commun de tous les Pokemon
+            nb_combats: nombre de combats par paire
+            graine: graine du tournoi (une graine derivee par ligne)
+            especes: liste de dicts pokemon.json (defaut : tout le Catalogue,
+                     lu par les processus dans le pack des especes)
+        """
+        self.dossier = dossier
+        self.niveau = niveau
+        self.nb_combats = nb_combats
+        self.graine = graine
+        self._depuis_pack = especes is None
+        if especes is None:
+            # Compile le pack si besoin avant le demarrage des processus
+            with PackEspeces.ouvrir() as pack:
+                especes = list(pack)
+        self.especes = list(especes)
+        os.makedirs(dossier, exist_ok=True)
+        self._ouvrir()
+
+    def _ouvrir(self):
+        """Ouvre la matrice et les drapeaux existants, ou les cree."""
+        n = len(self.especes)
+        meta = {
+            "niveau": self.niveau,
+            "nb_combats": self.nb_combats,
+            "graine": self.graine,
+            "numeros": [donnees["numero"] for donnees in self.especes],
+        }
+        chemin_meta = os.path.join(self.dossier, FICHIER_META)
+        chemin_matrice = os.path.join(self.dossier, FICHIER_MATRICE)
+        chemin_fait = os.path.join(self.dossier, FICHIER_FAIT)
+
+        if os.path.exists(chemin_meta):
+            with open(chemin_meta, "r", encoding="utf-8") as f:
+                if json.load(f) != meta:
+                    raise ValueError(f"{self.dossier} contient un tournoi avec d'autres parametres.")
+            self.matrice = np.lib.format.open_memmap(chemin_matrice, mode="r+")
+            self.fait = np.lib.format.open_memmap(chemin_fait, mode="r+")
+        else:
+            self.matrice = np.lib.format.open_memmap(
+                chemin_matrice, mode="w+", dtype=np.float32, shape=(n, n)
+            )
+            self.fait = np.lib.format.open_memmap(chemin_fait, mode="w+", dtype=np.bool_, shape=(n,))
+            self.matrice.flush()
+            self.fait.flush()
+            # Les metadonnees sont ecrites en dernier : elles valident les fichiers
+            with open(chemin_meta, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+    def lignes_restantes(self):
+        """Indices des lignes pas encore jouees."""
+        return np.flatnonzero(~self.fait).tolist()
+
+    def executer(self, nb_processus=None, lignes_par_tache=8, limite_lignes=None):
+        """
+        Joue les lignes restantes et retourne un ResultatTournoi.
+
+        Args:
+            nb_processus: nombre de processus (defaut : nombre de coeurs)
+            lignes_par_tache: nombre de lignes par tache envoyee aux processus
+            limite_lignes: nombre maximal de lignes jouees lors de cet appel
+        """
+        if nb_processus is None:
+            nb_processus = os.cpu_count() or 1
+        restantes = self.lignes_restantes()
+        if limite_lignes is not None:
+            restantes = restantes[:limite_lignes]
+        paquets = [
+            restantes[i:i + lignes_par_tache] for i in range(0, len(restantes), lignes_par_tache)
+        ]
+
+        debut = time.perf_counter()
+        lignes_jouees = 0
+        if self._depuis_pack:
+            options, especes = {"initializer": _ouvrir_pack}, None
+        else:
+            options, especes = {}, self.especes
+        with ProcessPoolExecutor(max_workers=nb_processus, **options) as executeur:
+            futurs = [
+                executeur.submit(jouer_lignes, paquet, especes, self.niveau,
+                                 self.nb_combats, self.graine)
+                for paquet in paquets
+            ]
+            for futur in as_completed(futurs):
+                resultats = futur.result()
+                for ligne, taux in resultats:
+                    self.matrice[ligne] = taux
+                # La matrice est ecrite sur disque avant les drapeaux
+                self.matrice.flush()
+                for ligne, _ in resultats:
+                    self.fait[ligne] = True
+                self.fait.flush()
+                lignes_jouees += len(resultats)
+        duree = time.perf_counter() - debut
+
+        paires = lignes_jouees * len(self.especes)
+        debit = paires / duree if duree > 0 else 0.0
+        return ResultatTournoi(
+            self.matrice, self.classement(), paires, duree, debit, debit / nb_processus
+        )
+
+    def classement(self):
+        """
+        Classement des especes par taux de victoire moyen (lignes terminees,
+        sans le duel contre soi-meme).
+        """
+        n = len(self.especes)
+        classement = []
+        for i in np.flatnonzero(self.fait):
+            ligne = np.delete(self.matrice[i], i) if n > 1 else self.matrice[i]
+            donnees = self.especes[i]
+            classement.append((donnees["numero"], donnees["nom"], float(ligne.mean())))
+        classement.sort(key=lambda e: (-e[2], e[0]))
+        return classement
+
+    def est_termine(self):
+        """Retourne True si toutes les lignes ont ete jouees."""
+        return bool(self.fait.all())
+
+
+if __name__ == "__main__":
+    dossier = sys.argv[1] if len(sys.argv) > 1 else "tournoi"
+    niveau = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    tournoi = Tournoi(dossier, niveau=niveau)
+    print(f"{len(tournoi.lignes_restantes())} lignes restantes sur {len(tournoi.especes)}")
+    resultat = tournoi.executer()
+    print(f"{resultat.paires_jouees} paires en {resultat.duree:.1f} s : "
+          f"{resultat.paires_par_seconde:.0f} paires/s, "
+          f"{resultat.paires_par_seconde_par_coeur:.0f} paires/s par coeur")
+    for rang, (numero, nom, taux) in enumerate(resultat.classement[:10], 1):
+        print(f"{rang:2d}. #{numero:04d} {nom:15s} {taux:.1%}")
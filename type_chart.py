@@ -55,13 +55,34 @@ class TypeChart:
         [1,    0.5, 1,   1,   1,   1,   2,   0.5, 1,   1,   1,   1,   1,   1,   2,   2,   0.5, 1],
     ]
 
+    # Identifiants entiers des types (index dans TYPES)
+    TYPE_IDS = {type_name: i for i, type_name in enumerate(TYPES)}
+
+    # Combinaisons defensives (simples puis doubles) et table precompilee
+    # MULTIPLICATEURS[id_type_attaquant][id_combinaison], voir _compiler_table()
+    COMBINAISONS = []
+    COMBINAISON_IDS = {}
+    MULTIPLICATEURS = []
+    _TABLES_NUMPY = None
+    _PROFILS_DEFENSIFS = None
+
     @classmethod
     def get_index(cls, type_name):
         """Retourne l'index d'un type dans la matrice."""
-        try:
-            return cls.TYPES.index(type_name)
-        except ValueError:
-            return -1
+        return cls.TYPE_IDS.get(type_name, -1)
+
+    @classmethod
+    def get_combinaison_id(cls, types_defenseur):
+        """
+        Retourne l'identifiant de la combinaison de types d'un defenseur
+        (un ou deux types, dans n'importe quel ordre), ou -1 si inconnue.
+        """
+        return cls.COMBINAISON_IDS.get(tuple(types_defenseur), -1)
+
+    @classmethod
+    def get_multiplicateur_ids(cls, id_attaquant, id_combinaison):
+        """Retourne le multiplicateur precompile pour des identifiants de type/combinaison."""
+        return cls.MULTIPLICATEURS[id_attaquant][id_combinaison]
 
     @classmethod
     def get_efficacite(cls, type_attaquant, type_defenseur):
@@ -80,46 +101,168 @@ class TypeChart:
         En cas de double type, les multiplicateurs sont multiplies entre eux.
         Ex: Electrik vs Eau/Vol = 2 * 2 = 4
         """
+        idx_att = cls.TYPE_IDS.get(type_attaquant, -1)
+        id_combi = cls.COMBINAISON_IDS.get(tuple(types_defenseur), -1)
+        if idx_att >= 0 and id_combi >= 0:
+            return cls.MULTIPLICATEURS[idx_att][id_combi]
+
+        # Type inconnu ou combinaison hors table : calcul type par type
         mult = 1.0
         for type_def in types_defenseur:
             mult *= cls.get_efficacite(type_attaquant, type_def)
         return mult
 
+    @classmethod
+    def get_multiplicateur_attaque(cls, types_attaquant, types_defenseur):
+        """
+        Retourne le multiplicateur applique par Pokemon.attaquer : celui du
+        premier type de l'attaquant qui n'est pas neutre contre le defenseur.
+        """
+        id_combi = cls.COMBINAISON_IDS.get(tuple(types_defenseur), -1)
+        for type_att in types_attaquant:
+            idx_att = cls.TYPE_IDS.get(type_att, -1)
+            if idx_att >= 0 and id_combi >= 0:
+                m = cls.MULTIPLICATEURS[idx_att][id_combi]
+            else:
+                m = cls.get_multiplicateur(type_att, types_defenseur)
+            if m != 1.0:
+                return m
+        return 1.0
+
+    @classmethod
+    def encoder_types(cls, liste_types):
+        """
+        Convertit une liste de listes de types (noms) en tableau NumPy (K, 2)
+        d'identifiants de type. Un second type absent ou inconnu vaut -1.
+        """
+        import numpy as np
+
+        ids = np.full((len(liste_types), 2), -1, dtype=np.int8)
+        for i, types in enumerate(liste_types):
+            for j, type_name in enumerate(types[:2]):
+                ids[i, j] = cls.TYPE_IDS.get(type_name, -1)
+        return ids
+
+    @classmethod
+    def get_matrice_multiplicateurs(cls, ids_attaquants, ids_defenseurs):
+        """
+        Calcule en une fois les multiplicateurs de N attaquants contre M defenseurs.
+
+        Args:
+            ids_attaquants: tableau (N, 2) d'identifiants de type (-1 si absent)
+            ids_defenseurs: tableau (M, 2) d'identifiants de type (-1 si absent)
+
+        Returns:
+            Matrice NumPy (N, M) de float, avec la meme regle que Pokemon.attaquer
+            (premier type de l'attaquant dont le multiplicateur n'est pas neutre).
+        """
+        import numpy as np
+
+        ids_attaquants = np.asarray(ids_attaquants)
+        combis = cls.get_combinaisons_numpy(ids_defenseurs)
+        return cls._multiplicateurs_numpy(ids_attaquants[:, None, :], combis[None, :])
+
+    @classmethod
+    def get_combinaisons_numpy(cls, ids_types):
+        """Convertit un tableau (..., 2) d'identifiants de type en identifiants de combinaison."""
+        import numpy as np
+
+        ids_types = np.asarray(ids_types)
+        _, combis = cls._tables_numpy()
+        nb_types = len(cls.TYPES)
+        t1 = np.where(ids_types[..., 0] < 0, nb_types, ids_types[..., 0])
+        t2 = np.where(ids_types[..., 1] < 0, nb_types, ids_types[..., 1])
+        return combis[t1, t2]
+
+    @classmethod
+    def _multiplicateurs_numpy(cls, ids_attaquants, combis):
+        """Applique la regle du premier type non neutre sur des tableaux diffusables."""
+        import numpy as np
+
+        table, _ = cls._tables_numpy()
+        nb_types = len(cls.TYPES)
+        a1 = np.where(ids_attaquants[..., 0] < 0, nb_types, ids_attaquants[..., 0])
+        a2 = np.where(ids_attaquants[..., 1] < 0, nb_types, ids_attaquants[..., 1])
+        m1 = table[a1, combis]
+        m2 = table[a2, combis]
+        return np.where(m1 != 1.0, m1, m2)
+
+    @classmethod
+    def _tables_numpy(cls):
+        """
+        Construit (une seule fois) les versions NumPy de la table :
+        - multiplicateurs (19, 172) : ligne 18 = attaquant sans type, colonne 171 = defenseur sans type
+        - combinaisons (19, 19) : paire d'identifiants de type -> identifiant de combinaison
+        """
+        if cls._TABLES_NUMPY is None:
+            import numpy as np
+
+            nb_types = len(cls.TYPES)
+            nb_combis = len(cls.COMBINAISONS)
+            table = np.ones((nb_types + 1, nb_combis + 1), dtype=np.float64)
+            table[:nb_types, :nb_combis] = cls.MULTIPLICATEURS
+
+            combis = np.full((nb_types + 1, nb_types + 1), nb_combis, dtype=np.int16)
+            for id_combi, combi in enumerate(cls.COMBINAISONS):
+                t1 = combi[0]
+                t2 = combi[1] if len(combi) > 1 else nb_types
+                combis[t1, t2] = id_combi
+                combis[t2, t1] = id_combi
+            for t in range(nb_types):
+                combis[t, t] = t
+
+            cls._TABLES_NUMPY = (table, combis)
+        return cls._TABLES_NUMPY
+
+    @classmethod
+    def get_profil_defensif(cls, types_defenseur):
+        """
+        Retourne le profil defensif d'un type ou d'une combinaison de deux types :
+        {4: (...), 2: (...), 0.5: (...), 0.25: (...), 0: (...)}, chaque entree
+        listant les types attaquants concernes. None si la combinaison est inconnue.
+
+        Les profils des 171 combinaisons sont calcules au premier appel puis
+        partages : ne pas les modifier.
+        """
+        if isinstance(types_defenseur, str):
+            types_defenseur = (types_defenseur,)
+        id_combi = cls.COMBINAISON_IDS.get(tuple(types_defenseur), -1)
+        if id_combi < 0:
+            return None
+        if cls._PROFILS_DEFENSIFS is None:
+            cls._PROFILS_DEFENSIFS = [
+                cls._calculer_profil_defensif(id_combi)
+                for id_combi in range(len(cls.COMBINAISONS))
+            ]
+        return cls._PROFILS_DEFENSIFS[id_combi]
+
+    @classmethod
+    def _calculer_profil_defensif(cls, id_combi):
+        """Repartit les 18 types attaquants selon leur multiplicateur contre une combinaison."""
+        profil = {4: [], 2: [], 0.5: [], 0.25: [], 0: []}
+        for idx_att, type_att in enumerate(cls.TYPES):
+            mult = cls.MULTIPLICATEURS[idx_att][id_combi]
+            if mult in profil:
+                profil[mult].append(type_att)
+        return {mult: tuple(types) for mult, types in profil.items()}
+
     @classmethod
     def get_faiblesses(cls, type_name):
         """Retourne la liste des types super efficaces (x2) contre ce type."""
-        idx_def = cls.get_index(type_name)
-        if idx_def < 0:
-            return []
-        faiblesses = []
-        for i, type_att in enumerate(cls.TYPES):
-            if cls.CHART[i][idx_def] == 2:
-                faiblesses.append(type_att)
-        return faiblesses
+        profil = cls.get_profil_defensif(type_name)
+        return list(profil[2]) if profil else []
 
     @classmethod
     def get_resistances(cls, type_name):
         """Retourne la liste des types peu efficaces (x0.5) contre ce type."""
-        idx_def = cls.get_index(type_name)
-        if idx_def < 0:
-            return []
-        resistances = []
-        for i, type_att in enumerate(cls.TYPES):
-            if cls.CHART[i][idx_def] == 0.5:
-                resistances.append(type_att)
-        return resistances
+        profil = cls.get_profil_defensif(type_name)
+        return list(profil[0.5]) if profil else []
 
     @classmethod
     def get_immunites(cls, type_name):
         """Retourne la liste des types sans effet (x0) contre ce type."""
-        idx_def = cls.get_index(type_name)
-        if idx_def < 0:
-            return []
-        immunites = []
-        for i, type_att in enumerate(cls.TYPES):
-            if cls.CHART[i][idx_def] == 0:
-                immunites.append(type_att)
-        return immunites
+        profil = cls.get_profil_defensif(type_name)
+        return list(profil[0]) if profil else []
 
     @classmethod
     def get_message_efficacite(cls, multiplicateur):
@@ -142,3 +285,36 @@ class TypeChart:
     def est_type_valide(cls, type_name):
         """Verifie si un type existe dans le tableau."""
         return type_name in cls.TYPES
+
+
+def _compiler_table():
+    """
+    Compile les 171 combinaisons defensives (18 simples + 153 doubles)
+    et la table 18 x 171 des multiplicateurs correspondants.
+    """
+    nb_types = len(TypeChart.TYPES)
+    combinaisons = [(i,) for i in range(nb_types)]
+    combinaisons += [(i, j) for i in range(nb_types) for j in range(i + 1, nb_types)]
+
+    combinaison_ids = {}
+    for id_combi, combi in enumerate(combinaisons):
+        noms = tuple(TypeChart.TYPES[i] for i in combi)
+        combinaison_ids[noms] = id_combi
+        combinaison_ids[noms[::-1]] = id_combi
+
+    multiplicateurs = []
+    for idx_att in range(nb_types):
+        ligne = []
+        for combi in combinaisons:
+            mult = 1.0
+            for idx_def in combi:
+                mult *= TypeChart.CHART[idx_att][idx_def]
+            ligne.append(mult)
+        multiplicateurs.append(ligne)
+
+    TypeChart.COMBINAISONS = combinaisons
+    TypeChart.COMBINAISON_IDS = combinaison_ids
+    TypeChart.MULTIPLICATEURS = multiplicateurs
+
+
+_compiler_table()